@@ -0,0 +1,83 @@
+"""
+Loading generated CV JSON into the stores: the per-resume path
+cv_processor uses after extraction (store_profile + one add_documents per
+resume) vs. cv_processing.json_loader's batched transactions and batched
+embedding requests.
+
+Embeddings are fake, with a per-request and a per-text latency that stand
+in for the OpenAI round trip; SQLite is real. The per-resume path is timed
+on a sample and extrapolated.
+
+Usage (from the api folder):
+    python -m benchmarks.bulk_load --candidates 100000 --sample 1000
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from benchmarks import fakes
+from db.sql_store import store_profile
+from cv_processing.cv_chunker import build_docs_from_profile
+from cv_processing.json_loader import bulk_load, read_cv_json, cv_json_to_profile, cv_json_text
+
+
+def write_json(json_dir: str, n: int):
+    os.makedirs(json_dir, exist_ok=True)
+    for cv in fakes.synthetic_cv_json(n):
+        with open(os.path.join(json_dir, f"{cv['id']}.json"), "w", encoding="utf-8") as fh:
+            json.dump(cv, fh, ensure_ascii=False)
+
+
+def per_resume(json_dir: str, db_path: str, sample: int, store) -> float:
+    paths = sorted(os.path.join(json_dir, f) for f in os.listdir(json_dir))[:sample]
+    t0 = time.perf_counter()
+    for path in paths:
+        cv = read_cv_json(path)
+        profile = cv_json_to_profile(cv)
+        text = cv_json_text(cv)
+        cid = store_profile(db_path, profile, source_file=f"file://{path}", candidate_id=cv["id"], resume_text=text)
+        store.add_documents(build_docs_from_profile(text, cid, profile, pdf_path=f"file://{path}"))
+    return time.perf_counter() - t0
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="cv_rag_bulk_")
+    json_dir = os.path.join(tmp, "json")
+    t = time.perf_counter()
+    write_json(json_dir, args.candidates)
+    print(f"Wrote {args.candidates} JSON files in {time.perf_counter() - t:.1f}s")
+
+    def fake_store():
+        emb = fakes.FakeEmbeddings(latency=args.request_latency, per_text_latency=args.per_text_latency)
+        return fakes.FakeVectorStore(latency=0.0, embeddings=emb), emb
+
+    store, emb = fake_store()
+    sample = min(args.sample, args.candidates)
+    old_s = per_resume(json_dir, os.path.join(tmp, "per_resume.db"), sample, store)
+    old_rate = sample / old_s
+
+    store, emb = fake_store()
+    stats = bulk_load(json_dir, os.path.join(tmp, "bulk.db"), pdf_dir=os.path.join(tmp, "pdf"), batch=args.batch,
+                      store=store, sections=False, embed_workers=args.workers)
+    new_rate = stats["loaded"] / stats["seconds"]
+
+    print(f"\n{'path':<12} {'candidates':>10} {'seconds':>8} {'cand/s':>8} {'embed calls':>11} {'100k est.':>10}")
+    print(f"{'per resume':<12} {sample:>10} {old_s:>8.1f} {old_rate:>8.0f} {sample:>11} "
+          f"{100_000 / old_rate / 60:>8.1f} m")
+    print(f"{'bulk':<12} {stats['loaded']:>10} {stats['seconds']:>8.1f} {new_rate:>8.0f} {emb.calls:>11} "
+          f"{100_000 / new_rate / 60:>8.1f} m")
+    print(f"bulk SQLite time {stats['sql_seconds']:.1f}s; embedding latency {args.request_latency}s/request "
+          f"+ {args.per_text_latency * 1000:.1f}ms/text, {args.workers} workers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=20000)
+    parser.add_argument("--sample", type=int, default=500, help="resumes timed on the per-resume path")
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--request-latency", type=float, default=0.25)
+    parser.add_argument("--per-text-latency", type=float, default=0.0005)
+    main(parser.parse_args())
@@ -0,0 +1,120 @@
+"""
+Embedding requests per 1k resumes: one add_documents per resume (the old
+process_single_resume / pipeline embed stage) vs. the cross-resume vector
+writer (db.vector_writer) with the persistent embedding cache
+(db.embedding_cache).
+
+Three passes over the same corpus: a first ingest, a re-ingest of every
+resume (e.g. after an INGEST_PIPELINE_VERSION bump), and a re-ingest where
+EDITED_SHARE of the resumes changed one job description. Embeddings are
+fake with a per-request and a per-text latency; nothing else is timed.
+
+Usage (from the api folder):
+    python -m benchmarks.embedding_batching --resumes 1000 --mode sections
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import fakes
+from db.embedding_cache import CachedEmbeddings
+from db.vector_writer import VectorWriter
+from cv_processing.cv_chunker import build_docs_from_profile, build_section_docs
+from cv_processing.json_loader import cv_json_to_profile, cv_json_text
+
+
+def corpus(n: int, mode: str, edited_share: float = 0.0):
+    """[(candidate_id, docs)] for n generated resumes; edited_share of them with one changed job description."""
+    edit_every = round(1 / edited_share) if edited_share > 0 else 0
+    out = []
+    for i, cv in enumerate(fakes.synthetic_cv_json(n)):
+        if edit_every and i % edit_every == 0 and cv["experience"]:
+            cv["experience"][0]["summary"] = (cv["experience"][0].get("summary") or "") + " Led the migration to a new platform."
+        profile, uri = cv_json_to_profile(cv), f"file:///resumes/{cv['id']}.pdf"
+        docs = build_section_docs(cv["id"], profile, pdf_path=uri) if mode == "sections" else \
+            build_docs_from_profile(cv_json_text(cv), cv["id"], profile, pdf_path=uri)
+        out.append((cv["id"], docs))
+    return out
+
+
+def per_resume(resumes, store, concurrency: int, replace: bool):
+    def one(item):
+        cid, docs = item
+        if replace:
+            store.delete(where={"candidate_id": cid})
+        store.add_documents(docs)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, resumes))
+
+
+def batched(resumes, store, in_flight: int, replace: bool, batch: int, flush: float):
+    writer = VectorWriter(store, batch_size=batch, flush_interval=flush).start()
+
+    async def run():
+        sem = asyncio.Semaphore(in_flight)
+
+        async def one(cid, docs):
+            async with sem:
+                await asyncio.wrap_future(writer.submit(docs, replace_candidate_id=cid if replace else None))
+        await asyncio.gather(*(one(cid, docs) for cid, docs in resumes))
+    asyncio.run(run())
+    writer.close()
+
+
+def measure(label, fn, emb):
+    calls, texts = emb.calls, emb.texts
+    t = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t
+    return label, emb.calls - calls, emb.texts - texts, elapsed
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="cv_rag_embed_")
+    first = corpus(args.resumes, args.mode)
+    edited = corpus(args.resumes, args.mode, args.edited_share)
+    n_docs = sum(len(d) for _, d in first)
+
+    def fake():
+        return fakes.FakeEmbeddings(latency=args.request_latency, per_text_latency=args.per_text_latency)
+
+    rows = []
+    old_emb = fake()
+    old_store = fakes.FakeVectorStore(latency=0.0, embeddings=old_emb)
+    rows.append(measure("per-resume: ingest", lambda: per_resume(first, old_store, args.concurrency, False), old_emb))
+    rows.append(measure("per-resume: re-ingest", lambda: per_resume(first, old_store, args.concurrency, True), old_emb))
+    rows.append(measure("per-resume: edited", lambda: per_resume(edited, old_store, args.concurrency, True), old_emb))
+
+    new_emb = fake()
+    cached = CachedEmbeddings(new_emb, os.path.join(tmp, "embedding_cache.db"), model="fake")
+    new_store = fakes.FakeVectorStore(latency=0.0, embeddings=cached)
+    run = lambda resumes, replace: lambda: batched(resumes, new_store, args.in_flight, replace, args.batch, args.flush)
+    rows.append(measure("batched+cache: ingest", run(first, False), new_emb))
+    rows.append(measure("batched+cache: re-ingest", run(first, True), new_emb))
+    rows.append(measure("batched+cache: edited", run(edited, True), new_emb))
+    cached.close()
+
+    per_1k = 1000 / args.resumes
+    print(f"{args.resumes} resumes, {n_docs} documents ({args.mode}), embeddings "
+          f"{args.request_latency}s/request + {args.per_text_latency * 1000:.1f}ms/text")
+    print(f"{'pass':<26} {'calls/1k':>9} {'texts/1k':>9} {'s/1k':>7}")
+    for label, calls, texts, elapsed in rows:
+        print(f"{label:<26} {calls * per_1k:>9.0f} {texts * per_1k:>9.0f} {elapsed * per_1k:>7.1f}")
+    print(f"docs in stores: per-resume {len(old_store.docs)}, batched {len(new_store.docs)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--mode", choices=("resume", "sections"), default="sections")
+    parser.add_argument("--request-latency", type=float, default=0.2)
+    parser.add_argument("--per-text-latency", type=float, default=0.0005)
+    parser.add_argument("--concurrency", type=int, default=4, help="per-resume path threads (old EMBED_CONCURRENCY)")
+    parser.add_argument("--in-flight", type=int, default=256)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--flush", type=float, default=0.5)
+    parser.add_argument("--edited-share", type=float, default=0.1)
+    main(parser.parse_args())
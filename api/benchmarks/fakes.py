@@ -0,0 +1,492 @@
+"""
+Local stand-ins for the OpenAI chat/embedding backends and Chroma, plus a
+synthetic candidate corpus, so benchmarks run offline and deterministically.
+
+Import this module before anything from query_processing/db: it sets a dummy
+OPENAI_API_KEY so the real modules can be imported without credentials.
+"""
+import os
+import time
+import threading
+import random
+import asyncio
+import hashlib
+import sqlite3
+from typing import Iterator, List, Optional
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-local-benchmark")
+
+from langchain_core.documents import Document
+from model.CandidateProfile import CandidateProfile, EducationItem, ExperienceItem, LinkItem, CertificationItem
+from model.QueryRoute import QueryRoute
+
+SKILLS = [
+    "Python", "Java", "Go", "TypeScript", "JavaScript", "React", "Vue", "Node.js", "Django", "FastAPI",
+    "Spring", "PostgreSQL", "MySQL", "MongoDB", "Redis", "Kafka", "Spark", "Airflow", "dbt", "Pandas",
+    "TensorFlow", "PyTorch", "Scikit-learn", "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform",
+    "GraphQL", "REST APIs", "CI/CD", "Jest", "Pytest", "Swift", "Kotlin", "Rust", "C++", "Scala", "Snowflake",
+]
+COMPANIES = [
+    "Amazon", "Google", "Microsoft", "Meta", "Apple", "Netflix", "Spotify", "Shopify", "Stripe", "Uber",
+    "Airbnb", "Booking.com", "Zalando", "SAP", "Siemens", "Accenture", "Deloitte", "IBM", "Oracle", "Salesforce",
+    "Atlassian", "Adyen", "Klarna", "Revolut", "N26", "Delivery Hero", "Careem", "Noon", "Talabat", "Vodafone",
+]
+INSTITUTIONS = [
+    "MIT", "Stanford University", "Harvard University", "University of Cambridge", "University of Oxford",
+    "ETH Zurich", "Technical University of Munich", "Cairo University", "American University in Cairo",
+    "University of Toronto", "National University of Singapore", "Imperial College London",
+    "University of California, Berkeley", "Carnegie Mellon University", "Delft University of Technology",
+]
+TITLES = [
+    "Software Engineer", "Senior Software Engineer", "Data Engineer", "Data Scientist", "Tech Lead",
+    "Engineering Manager", "DevOps Engineer", "Full Stack Engineer", "Data Analyst", "Backend Engineer",
+]
+FIRST_NAMES = [
+    "Amanda", "Omar", "Sara", "John", "Mona", "Ahmed", "Laura", "David", "Nour", "Kevin",
+    "Fatma", "Lucas", "Emma", "Youssef", "Maria", "Daniel", "Hana", "Peter", "Salma", "Chris",
+]
+LAST_NAMES = [
+    "Lawrence", "Hassan", "Smith", "Ibrahim", "Garcia", "Mahmoud", "Nguyen", "Brown", "Soliman", "Miller",
+    "Fischer", "Khalil", "Taylor", "Mostafa", "Rossi", "Wilson", "Farouk", "Novak", "Adel", "Moore",
+]
+
+# Fixed query set with the route an accurate router would return for each.
+SAMPLE_ROUTES = {
+    "who knows Python and React": QueryRoute(mode="hybrid", target_sections=["skills"], skills=["python", "react"], confidence=0.9),
+    "who worked at Amazon": QueryRoute(mode="hybrid", target_sections=["experience"], company="Amazon", confidence=0.9),
+    "candidates who studied at MIT": QueryRoute(mode="hybrid", target_sections=["education"], institution="MIT", confidence=0.9),
+    "find engineers with Kubernetes and AWS": QueryRoute(mode="hybrid", target_sections=["skills"], skills=["kubernetes", "aws"], confidence=0.9),
+    "people with fintech startup experience": QueryRoute(mode="vector", target_sections=["experience"], confidence=0.8),
+    "summarize Amanda Lawrence": QueryRoute(mode="vector", target_sections=["summary", "experience", "education", "skills"],
+                                            candidate_name="Amanda Lawrence", need_summarization=True, confidence=0.9),
+    "data scientists with healthcare background": QueryRoute(mode="vector", target_sections=["experience"], confidence=0.7),
+    "who has experience at Google with Go": QueryRoute(mode="hybrid", target_sections=["skills", "experience"],
+                                                       skills=["go"], company="Google", confidence=0.85),
+}
+
+
+# ---- Fake LLMs ----
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeChatModel:
+    """
+    Chat model with a fixed latency. invoke() blocks like the real client,
+    ainvoke()/astream() yield to the event loop.
+    """
+    def __init__(self, latency: float = 0.8, answer: Optional[str] = None, tokens_per_second: float = 200.0):
+        self.latency = latency
+        self.answer = answer or ("Found 3 matching candidates.\n\n"
+                                 "1. **Amanda Lawrence** — [resume](file:///data/pdf/Amanda_Lawrence.pdf)\n"
+                                 "   - Why: Python and React at Shopify (2019–2023).\n")
+        self.tokens_per_second = tokens_per_second
+        self.calls = 0
+
+    def _tokens(self) -> List[str]:
+        words = self.answer.split(" ")
+        return [w + (" " if i < len(words) - 1 else "") for i, w in enumerate(words)]
+
+    def invoke(self, messages):
+        self.calls += 1
+        time.sleep(self.latency)
+        return FakeMessage(self.answer)
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return FakeMessage(self.answer)
+
+    async def astream(self, messages):
+        self.calls += 1
+        tokens = self._tokens()
+        # Time to first token, then a steady token rate
+        await asyncio.sleep(self.latency / 4)
+        for tok in tokens:
+            await asyncio.sleep(1.0 / self.tokens_per_second)
+            yield FakeMessage(tok)
+
+
+class FakeStructuredRouter:
+    """Stands in for router_llm.with_structured_output(QueryRoute)."""
+    def __init__(self, latency: float = 0.3, routes: Optional[dict] = None):
+        self.latency = latency
+        self.routes = routes or SAMPLE_ROUTES
+        self.calls = 0
+
+    def _route_for(self, messages) -> QueryRoute:
+        text = messages[-1].content
+        for query, route in self.routes.items():
+            if query in text:
+                return route.model_copy(deep=True)
+        return QueryRoute(mode="vector", target_sections=["experience"], confidence=0.6)
+
+    def invoke(self, messages):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._route_for(messages)
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._route_for(messages)
+
+
+class FakeExtractionLLM:
+    """Stands in for build_llm() in cv_extractor: with_structured_output(...).invoke() after a fixed latency."""
+    def __init__(self, latency: float = 4.0):
+        self.latency = latency
+        self.calls = 0
+
+    def with_structured_output(self, schema):
+        self.schema = schema
+        return self
+
+    def invoke(self, messages):
+        self.calls += 1
+        time.sleep(self.latency)
+        first_line = messages[-1].content.split("Résumé text:")[-1].strip().splitlines()[0]
+        return self.schema(full_name=first_line.strip())
+
+
+# ---- Fake embeddings / vector store ----
+
+class FakeEmbeddings:
+    """Deterministic hash-based embeddings with per-call latency and call counters."""
+    def __init__(self, dim: int = 64, latency: float = 0.0, per_text_latency: float = 0.0):
+        self.dim = dim
+        self.latency = latency
+        self.per_text_latency = per_text_latency
+        self.calls = 0
+        self.texts = 0
+
+    def _vector(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        rnd = random.Random(digest)
+        return [rnd.uniform(-1.0, 1.0) for _ in range(self.dim)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.texts += len(texts)
+        time.sleep(self.latency + self.per_text_latency * len(texts))
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class FakeVectorStore:
+    """
+    Minimal Chroma replacement: blocking similarity search with a fixed latency
+    over a pool of synthetic documents.
+    """
+    def __init__(self, latency: float = 0.05, docs: Optional[List[Document]] = None,
+                 embeddings: Optional[FakeEmbeddings] = None):
+        self.latency = latency
+        self.docs = docs or []
+        self.embeddings = embeddings
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def add_documents(self, docs: List[Document]):
+        if self.embeddings is not None:
+            self.embeddings.embed_documents([d.page_content for d in docs])
+        with self._lock:
+            self.docs.extend(docs)
+        return [str(i) for i in range(len(docs))]
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[dict] = None):
+        if where:
+            with self._lock:
+                self.docs = [d for d in self.docs if not self._matches(d.metadata, where)]
+
+    @classmethod
+    def _matches(cls, metadata: dict, filter: dict) -> bool:
+        # The subset of Chroma's where syntax the pipeline uses: $and, $in and plain equality
+        if "$and" in filter:
+            return all(cls._matches(metadata, clause) for clause in filter["$and"])
+        return all(metadata.get(key) in cond.get("$in", []) if isinstance(cond, dict) else metadata.get(key) == cond
+                   for key, cond in filter.items())
+
+    def similarity_search_with_score(self, query: str, k: int = 8, filter: Optional[dict] = None):
+        self.calls += 1
+        time.sleep(self.latency)
+        pool = [d for d in self.docs if self._matches(d.metadata, filter)] if filter else self.docs
+        rnd = random.Random(query)
+        picked = rnd.sample(pool, min(k, len(pool))) if pool else []
+        return sorted(((d, round(rnd.uniform(0.1, 0.6), 4)) for d in picked), key=lambda t: t[1])
+
+
+# ---- Synthetic corpus ----
+
+def synthetic_profiles(n: int, seed: int = 7) -> Iterator[CandidateProfile]:
+    rnd = random.Random(seed)
+    for i in range(n):
+        name = f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}"
+        year = rnd.randint(2004, 2016)
+        experience = []
+        for j, company in enumerate(rnd.sample(COMPANIES, rnd.randint(2, 4))):
+            start = year + 2 + j * 2
+            end = None if j == 0 else start + 2
+            experience.append(ExperienceItem(
+                company=company, title=rnd.choice(TITLES), start=f"{start}-0{rnd.randint(1, 9)}",
+                end=f"{end}-0{rnd.randint(1, 9)}" if end else None,
+                description=f"Built {rnd.choice(SKILLS)} services and {rnd.choice(SKILLS)} pipelines at {company}.",
+            ))
+        yield CandidateProfile(
+            full_name=name,
+            email=f"{name.lower().replace(' ', '.')}{i}@example.com",
+            phone=f"+1-555-{i:07d}",
+            location="Berlin, Germany",
+            links=[LinkItem(type="github", url=f"https://github.com/cand{i}")],
+            summary=f"{rnd.choice(TITLES)} with {rnd.randint(2, 15)} years of experience.",
+            skills=rnd.sample(SKILLS, rnd.randint(6, 12)),
+            education=[EducationItem(institution=rnd.choice(INSTITUTIONS), degree="BSc", field="Computer Science",
+                                     start_year=year, end_year=year + 4)],
+            experience=experience,
+            certifications=[CertificationItem(name="AWS Certified Developer", year=year + 8, issuer="Amazon Web Services")],
+        )
+
+
+def profile_text(profile: CandidateProfile) -> str:
+    lines = [profile.full_name or "", profile.summary or "", "Skills: " + ", ".join(profile.skills)]
+    for ex in profile.experience:
+        lines.append(f"{ex.title} at {ex.company} ({ex.start} – {ex.end or 'Present'}). {ex.description or ''}")
+    for ed in profile.education:
+        lines.append(f"{ed.degree} {ed.field}, {ed.institution} ({ed.start_year}–{ed.end_year})")
+    return "\n".join(lines)
+
+
+def build_synthetic_db(db_path: str, n: int, seed: int = 7) -> List[str]:
+    """Create (or extend) a candidates DB with n synthetic profiles. Returns candidate ids."""
+    from db.sql_store import (init_db, upsert_candidate, insert_links, insert_education, insert_experience, insert_skills,
+                              insert_certifications, upsert_resume_text)
+
+    con = init_db(db_path)
+    ids = []
+    try:
+        with con:
+            for i, profile in enumerate(synthetic_profiles(n, seed)):
+                cid = f"synthetic-{seed}-{i:08d}"
+                upsert_candidate(con, cid, profile, f"file:///data/pdf/{cid}.pdf")
+                insert_links(con, cid, profile.links)
+                insert_education(con, cid, profile.education)
+                insert_experience(con, cid, profile.experience)
+                insert_skills(con, cid, profile.skills)
+                insert_certifications(con, cid, profile.certifications)
+                upsert_resume_text(con, cid, profile_text(profile))
+                ids.append(cid)
+    finally:
+        con.close()
+    return ids
+
+
+def synthetic_docs(db_path: str, limit: int = 2000) -> List[Document]:
+    """One whole-resume document per candidate, shaped like build_docs_from_profile output."""
+    con = sqlite3.connect(db_path)
+    try:
+        rows = con.execute("SELECT id, full_name, summary, source_file FROM candidates LIMIT ?", (limit,)).fetchall()
+    finally:
+        con.close()
+    return [Document(page_content=f"{name}\n{summary}",
+                     metadata={"candidate_id": cid, "candidate_name": name, "summary": summary or "", "source_file": src})
+            for cid, name, summary, src in rows]
+
+
+# ---- Synthetic resume PDFs ----
+
+HIGHLIGHTS = [
+    "Cut p95 latency of the checkout API by 40% by moving hot paths to async workers",
+    "Led the migration of batch jobs to a streaming pipeline",
+    "Mentored four engineers and ran the weekly design review",
+    "Introduced contract tests that removed a class of integration failures",
+    "Designed the data model for multi-tenant billing",
+]
+CERTIFICATIONS = ["AWS Certified Developer (2021)", "Certified Kubernetes Administrator (2022)",
+                  "Google Professional Data Engineer", "Scrum Master (PSM I) (2019)"]
+
+
+def synthetic_cv_json(n: int, seed: int = 11) -> Iterator[dict]:
+    """CVs shaped like cv_generation.cv_generator output (the data/json files)."""
+    rnd = random.Random(seed)
+    for i in range(n):
+        name = f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}"
+        year = rnd.randint(2004, 2016)
+        experience = []
+        for j, company in enumerate(rnd.sample(COMPANIES, rnd.randint(2, 4))):
+            start = year + 2 + j * 2
+            experience.append({
+                "company": company, "title": rnd.choice(TITLES),
+                "start_date": f"{start}-0{rnd.randint(1, 9)}",
+                "end_date": None if j == 0 else f"{start + 2}-0{rnd.randint(1, 9)}",
+                "summary": f"Built {rnd.choice(SKILLS)} services and {rnd.choice(SKILLS)} pipelines for the "
+                           f"{rnd.choice(['payments', 'search', 'logistics', 'ads'])} team at {company}.",
+                "highlights": rnd.sample(HIGHLIGHTS, rnd.randint(0, 3)),
+            })
+        yield {
+            "id": f"cv-{seed}-{i:06d}",
+            "full_name": name,
+            "email": f"{name.lower().replace(' ', '.')}{i}@example.com",
+            "phone": f"+1 555 {i:07d}",
+            "location": rnd.choice(["Berlin, Germany", "Cairo, Egypt", "Toronto, Canada", "Lisbon, Portugal"]),
+            "title": rnd.choice(TITLES),
+            "summary": f"{rnd.choice(TITLES)} with {rnd.randint(2, 15)} years of experience building "
+                       f"{rnd.choice(SKILLS)} and {rnd.choice(SKILLS)} systems for high-traffic products.",
+            "skills": rnd.sample(SKILLS, rnd.randint(6, 12)),
+            "experience": experience,
+            "education": [{"institution": rnd.choice(INSTITUTIONS), "degree": "BSc Computer Science",
+                           "start_year": year, "end_year": year + 4}],
+            "languages": [{"language": "English", "level": "C1"}],
+            "certifications": rnd.sample(CERTIFICATIONS, rnd.randint(0, 2)),
+            "synthetic": True,
+        }
+
+
+# Sizes (pt) and page margins of templates/cv-template-{1,2}.html
+TEMPLATE_STYLES = {
+    "cv-template-1": {"margin_x": 57, "margin_y": 68, "name": 22, "body": 12, "h2": 12.5, "split": 0.5},
+    "cv-template-2": {"margin_x": 45, "margin_y": 45, "name": 20, "body": 10.5, "h2": 12, "split": 1.8 / 2.8},
+}
+
+
+DEJAVU_DIR = "/usr/share/fonts/truetype/dejavu"
+
+
+def _template_fonts() -> dict:
+    """DejaVu Sans (what WeasyPrint falls back to on Linux) if installed, else base-14 Helvetica."""
+    import fitz
+    regular, bold = os.path.join(DEJAVU_DIR, "DejaVuSans.ttf"), os.path.join(DEJAVU_DIR, "DejaVuSans-Bold.ttf")
+    if os.path.exists(regular) and os.path.exists(bold):
+        return {"regular": ("dvs", regular, fitz.Font(fontfile=regular)),
+                "bold": ("dvsb", bold, fitz.Font(fontfile=bold))}
+    return {"regular": ("helv", None, fitz.Font("helv")), "bold": ("hebo", None, fitz.Font("hebo"))}
+
+
+def _wrap(text: str, width: float, size: float, font) -> List[str]:
+    lines, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}".strip()
+        if current and font.text_length(candidate, fontsize=size) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    return lines + ([current] if current else [])
+
+
+def render_template_pdf(cv: dict, pdf_path: str, template: str = "cv-template-2"):
+    """
+    Approximate the WeasyPrint rendering of our templates with PyMuPDF (same
+    structure, font sizes and columns) for environments without WeasyPrint's
+    system libraries.
+    """
+    import fitz
+    st = TEMPLATE_STYLES[template]
+    doc = fitz.open()
+    width, height = fitz.paper_size("a4")
+    doc.new_page(width=width, height=height)
+    mx, my = st["margin_x"], st["margin_y"]
+    inner = width - 2 * mx
+    fonts = _template_fonts()
+    reg, bold_font = fonts["regular"][2], fonts["bold"][2]
+    state = {"page": 0, "y": my}
+
+    def text(x, s, size, bold=False, color=(0.07, 0.07, 0.07)):
+        name, fontfile, _ = fonts["bold" if bold else "regular"]
+        page = doc[state["page"]]
+        if fontfile:
+            page.insert_font(fontname=name, fontfile=fontfile)
+        page.insert_text((x, state["y"] + size), s, fontname=name, fontsize=size, color=color)
+
+    def advance(size, gap=0.0):
+        state["y"] += size * 1.35 + gap
+        if state["y"] > height - my:
+            if state["page"] == doc.page_count - 1:
+                doc.new_page(width=width, height=height)
+            state["page"] += 1
+            state["y"] = my
+
+    text(mx, cv["full_name"], st["name"], bold=True)
+    advance(st["name"])
+    text(mx, cv["title"], 11, color=(0.27, 0.27, 0.27))
+    advance(11)
+    text(mx, f"{cv['location']} · {cv['email']} · {cv['phone']}", 10)
+    advance(10, 6)
+    for line in _wrap(cv["summary"], inner, 10.5, reg):
+        text(mx, line, 10.5)
+        advance(10.5)
+    advance(0, 8)
+
+    col_top, col_page = state["y"], state["page"]
+    left_w = inner * st["split"] - 9
+    right_x = mx + inner * st["split"] + 9
+    right_w = mx + inner - right_x
+
+    text(mx, "Experience", st["h2"], bold=True)
+    advance(st["h2"], 4)
+    for job in cv["experience"]:
+        dates = f"{job['start_date']} – {job['end_date'] or 'Present'}"
+        dates_w = bold_font.text_length(dates, fontsize=9.5)
+        for line in _wrap(f"{job['title']} · {job['company']}", left_w - dates_w - 8, 11, bold_font):
+            text(mx, line, 11, bold=True)
+            if dates:
+                text(mx + left_w - dates_w, dates, 9.5, bold=True)
+                dates = ""
+            advance(11)
+        for line in _wrap(job["summary"], left_w, st["body"], reg):
+            text(mx, line, st["body"])
+            advance(st["body"])
+        for h in job["highlights"]:
+            for k, line in enumerate(_wrap(h, left_w - 14, st["body"], reg)):
+                if k == 0:
+                    text(mx + 4, "•", st["body"])
+                text(mx + 14, line, st["body"])
+                advance(st["body"])
+        advance(0, 8)
+
+    state["page"], state["y"] = col_page, col_top
+    text(right_x, "Skills", st["h2"], bold=True)
+    advance(st["h2"], 4)
+    x = right_x
+    for skill in cv["skills"]:
+        w = reg.text_length(skill, fontsize=9)
+        if x + w > right_x + right_w:
+            advance(9, 8)
+            x = right_x
+        text(x + 6, skill, 9)
+        x += w + 12 + 6
+    advance(9, 10)
+    text(right_x, "Education", st["h2"], bold=True)
+    advance(st["h2"], 4)
+    for e in cv["education"]:
+        text(right_x, e["degree"], st["body"], bold=True)
+        advance(st["body"])
+        for line in _wrap(f"{e['institution']} ({e['start_year']}–{e['end_year']})", right_w, st["body"], reg):
+            text(right_x, line, st["body"])
+            advance(st["body"])
+    if cv.get("languages"):
+        advance(0, 6)
+        text(right_x, "Languages", st["h2"], bold=True)
+        advance(st["h2"], 4)
+        for l in cv["languages"]:
+            text(right_x, f"{l['language']} — {l['level']}", st["body"])
+            advance(st["body"])
+    if cv.get("certifications"):
+        advance(0, 6)
+        text(right_x, "Certifications", st["h2"], bold=True)
+        advance(st["h2"], 4)
+        for c in cv["certifications"]:
+            for k, line in enumerate(_wrap(c, right_w - 14, st["body"], reg)):
+                if k == 0:
+                    text(right_x + 4, "•", st["body"])
+                text(right_x + 14, line, st["body"])
+                advance(st["body"])
+
+    state["y"] = height - my
+    state["page"] = doc.page_count - 1
+    text(mx, "This CV is synthetic and generated for testing/training.", 8.5, color=(0.4, 0.4, 0.4))
+    doc.set_metadata({"title": f"{cv['full_name']} – CV", "producer": "fakes.render_template_pdf"})
+    doc.save(pdf_path)
+    doc.close()
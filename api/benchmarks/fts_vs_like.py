@@ -0,0 +1,93 @@
+"""
+Leading-wildcard LIKE scans vs. the FTS5 trigram indexes for the substring
+lookups in db/sql_store.py (company, institution, title, candidate name).
+
+Each size N creates N candidates with one experience and one education row,
+inserted with executemany so the FTS triggers are exercised the way ingest
+uses them.
+
+Usage (from the api folder):
+    python -m benchmarks.fts_vs_like --sizes 10000,100000,1000000
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from benchmarks import fakes
+from db.sql_store import init_db, ids_by_company, ids_by_institution, ids_by_title, id_by_name, _ids_by_like
+
+LOOKUPS = [
+    ("company", "amazon"),
+    ("company", "soft"),
+    ("institution", "university of"),
+    ("title", "data engineer"),
+    ("name", "amanda law"),
+]
+
+
+def populate(con, n: int, seed: int = 7, batch: int = 50_000):
+    rnd = random.Random(seed)
+    for start in range(0, n, batch):
+        ids = [f"c{i:08d}" for i in range(start, min(n, start + batch))]
+        with con:
+            con.executemany(
+                "INSERT INTO candidates(id, full_name) VALUES (?, ?)",
+                [(cid, f"{rnd.choice(fakes.FIRST_NAMES)} {rnd.choice(fakes.LAST_NAMES)}") for cid in ids])
+            con.executemany(
+                "INSERT INTO experience(candidate_id, company, title, start) VALUES (?, ?, ?, ?)",
+                [(cid, f"{rnd.choice(fakes.COMPANIES)} {rnd.randint(1, 500)}", rnd.choice(fakes.TITLES), "2020-01") for cid in ids])
+            con.executemany(
+                "INSERT INTO education(candidate_id, institution, degree) VALUES (?, ?, ?)",
+                [(cid, rnd.choice(fakes.INSTITUTIONS), "BSc") for cid in ids])
+
+
+def like_lookup(con, kind: str, value: str):
+    if kind == "name":
+        return con.execute("SELECT id FROM candidates WHERE lower(full_name) LIKE lower(?) ORDER BY created_at DESC LIMIT 1",
+                           (f"%{value}%",)).fetchone()
+    table, column = {"company": ("experience", "company"), "institution": ("education", "institution"),
+                     "title": ("experience", "title")}[kind]
+    return _ids_by_like(con, table, column, value)
+
+
+def fts_lookup(con, kind: str, value: str):
+    return {"company": ids_by_company, "institution": ids_by_institution,
+            "title": ids_by_title, "name": id_by_name}[kind](con, value)
+
+
+def timeit(fn, reps: int) -> float:
+    samples = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="cv_rag_fts_")
+    print(f"{'rows':>9} {'lookup':<28} {'LIKE ms':>9} {'FTS ms':>9} {'speedup':>8} {'matches':>8}")
+    for n in [int(x) for x in args.sizes.split(",")]:
+        db_path = os.path.join(tmp, f"fts_{n}.db")
+        con = init_db(db_path)
+        t0 = time.perf_counter()
+        populate(con, n)
+        build_s = time.perf_counter() - t0
+        for kind, value in LOOKUPS:
+            like_ms = timeit(lambda: like_lookup(con, kind, value), args.reps)
+            fts_ms = timeit(lambda: fts_lookup(con, kind, value), args.reps)
+            res = fts_lookup(con, kind, value)
+            matches = len(res) if isinstance(res, list) else int(res is not None)
+            print(f"{n:>9} {kind + ' ~ ' + value:<28} {like_ms:>9.2f} {fts_ms:>9.2f} {like_ms / max(fts_ms, 1e-6):>7.1f}x {matches:>8}")
+        print(f"{'':>9} (insert with FTS triggers: {build_s:.1f}s)")
+        con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--reps", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,71 @@
+"""
+Planning an ingestion run over many already-ingested files with the manifest.
+
+Creates N small files, records them all as ingested, then times
+plan_ingestion for: an unchanged re-run (stat only), a run after every file
+was touched (hash only, no re-processing) and a run with a few edited files.
+
+Usage (from the api folder):
+    python -m benchmarks.ingest_manifest --files 50000
+"""
+import os
+import time
+import argparse
+import tempfile
+
+from db.sql_store import init_db, upsert_manifest
+from cv_processing.ingest_manifest import plan_ingestion, manifest_path, file_sha256, INGEST_PIPELINE_VERSION
+
+
+def timed_plan(con, files):
+    t0 = time.perf_counter()
+    plan = plan_ingestion(con, files)
+    return plan, time.perf_counter() - t0
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="cv_rag_manifest_")
+    pdf_dir = os.path.join(tmp, "pdf")
+    os.makedirs(pdf_dir)
+    files = []
+    for i in range(args.files):
+        path = os.path.join(pdf_dir, f"resume_{i:06d}.pdf")
+        with open(path, "wb") as fh:
+            fh.write(os.urandom(args.file_kb * 1024))
+        files.append(path)
+
+    con = init_db(os.path.join(tmp, "candidates.db"))
+    t0 = time.perf_counter()
+    with con:
+        for i, path in enumerate(files):
+            cid = f"cand-{i:06d}"
+            con.execute("INSERT INTO candidates(id, full_name) VALUES (?, ?)", (cid, f"Candidate {i}"))
+            st = os.stat(path)
+            upsert_manifest(con, manifest_path(path), st.st_size, st.st_mtime, file_sha256(path), cid,
+                            INGEST_PIPELINE_VERSION)
+    print(f"Recorded {len(files)} files ({args.file_kb} KB each) as ingested in {time.perf_counter() - t0:.1f}s")
+
+    plan, s = timed_plan(con, files)
+    print(f"unchanged re-run:    {s:6.2f}s  to process {len(plan['todo'])}, skipped {plan['skipped']}")
+
+    for path in files:
+        os.utime(path)
+    plan, s = timed_plan(con, files)
+    print(f"all files touched:   {s:6.2f}s  to process {len(plan['todo'])}, same content {plan['unchanged_content']}")
+
+    for path in files[:args.edited]:
+        with open(path, "ab") as fh:
+            fh.write(b"edit")
+    plan, s = timed_plan(con, files)
+    print(f"{args.edited} files edited:     {s:6.2f}s  to process {len(plan['todo'])} "
+          f"(changed {plan['changed']}, all updating existing candidates: "
+          f"{all(t['candidate_id'] for t in plan['todo'])})")
+    con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--file-kb", type=int, default=40)
+    parser.add_argument("--edited", type=int, default=100)
+    main(parser.parse_args())
@@ -0,0 +1,105 @@
+"""
+Ingestion throughput: the old one-coroutine-per-resume path under a single
+Semaphore(5) vs. the staged pipeline (ingest_pipeline) with per-stage limits.
+
+The corpus mixes resumes rendered from our templates (parsed locally) with
+plain-layout PDFs that need the (fake) LLM extractor; embeddings are fake
+with a per-request latency. SQLite is real.
+
+Usage (from the api folder):
+    python -m benchmarks.ingest_pipeline --resumes 200 --llm-share 0.3 --llm-latency 2
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+from benchmarks import fakes
+from db.sql_store import store_profile
+from cv_processing import cv_extractor
+from cv_processing.pdf_parser import extract_pdf_layout
+from cv_processing.cv_chunker import build_docs_from_profile
+from cv_processing.ingest_pipeline import run_pipeline
+from cv_processing.parse_service import PdfParser
+
+
+def render_plain_pdf(cv: dict, pdf_path: str):
+    """A resume layout the template parser does not know."""
+    import fitz
+    doc = fitz.open()
+    page = doc.new_page()
+    text = f"{cv['full_name']}\n{cv['email']}\n\n{cv['summary']}\n\nSkills: {', '.join(cv['skills'])}"
+    page.insert_textbox(fitz.Rect(60, 60, 540, 780), text, fontsize=10)
+    doc.save(pdf_path)
+    doc.close()
+
+
+async def semaphore_path(pdfs, db_path, store, max_concurrent=5):
+    """process_single_resume as it was: every step of a resume under one semaphore."""
+    sem = asyncio.Semaphore(max_concurrent)
+
+    async def one(path):
+        async with sem:
+            layout = await asyncio.to_thread(extract_pdf_layout, path)
+            profile, _ = await asyncio.to_thread(cv_extractor.extract_profile_from_layout, layout)
+            cid = await asyncio.to_thread(store_profile, db_path, profile, source_file=f"file://{path}",
+                                          resume_text=layout["text"])
+            docs = build_docs_from_profile(layout["text"], cid, profile, pdf_path=f"file://{path}")
+            await asyncio.to_thread(store.add_documents, docs)
+    await asyncio.gather(*(one(p) for p in pdfs))
+
+
+def main(args):
+    llm = fakes.FakeExtractionLLM(latency=args.llm_latency)
+    cv_extractor.build_llm = lambda: llm
+
+    tmp = tempfile.mkdtemp(prefix="cv_rag_pipeline_")
+    pdfs = []
+    llm_every = round(1 / args.llm_share) if args.llm_share > 0 else 0
+    for i, cv in enumerate(fakes.synthetic_cv_json(args.resumes)):
+        path = os.path.join(tmp, f"{cv['id']}.pdf")
+        if llm_every and i % llm_every == 0:
+            render_plain_pdf(cv, path)
+        else:
+            fakes.render_template_pdf(cv, path, list(fakes.TEMPLATE_STYLES)[i % 2])
+        pdfs.append(path)
+
+    def store():
+        return fakes.FakeVectorStore(latency=0.0, embeddings=fakes.FakeEmbeddings(latency=args.embed_latency))
+
+    t0 = time.perf_counter()
+    asyncio.run(semaphore_path(pdfs, os.path.join(tmp, "semaphore.db"), store()))
+    old_s = time.perf_counter() - t0
+
+    tasks = [{"path": p} for p in pdfs]
+    parser = PdfParser(workers=args.parse_workers, cache_dir=None)
+    result = asyncio.run(run_pipeline(tasks, os.path.join(tmp, "pipeline.db"), store=store(), sections=False,
+                                      extract_fn=cv_extractor.extract_structured_profile_from_text,
+                                      parse_workers=args.parse_workers, extract_concurrency=args.extract_concurrency,
+                                      embed_in_flight=args.embed_in_flight, report_seconds=0,
+                                      parser=parser))
+    parser.close()
+    new_s = result["seconds"]
+
+    print(f"\n{len(pdfs)} resumes ({result['extractors']['llm']} via LLM at {args.llm_latency}s, "
+          f"embeddings {args.embed_latency}s/request)")
+    print(f"{'path':<22} {'seconds':>8} {'resumes/s':>10}")
+    print(f"{'semaphore(5)':<22} {old_s:>8.1f} {len(pdfs) / old_s:>10.1f}")
+    print(f"{'staged pipeline':<22} {new_s:>8.1f} {len(pdfs) / new_s:>10.1f}")
+    print(f"\n{'stage':<8} {'workers':>7} {'done':>6} {'failed':>6} {'/s':>7} {'busy s':>7} {'max q':>6}")
+    for name, s in result["stages"].items():
+        print(f"{name:<8} {s['workers']:>7} {s['done']:>6} {s['failed']:>6} {s['per_second']:>7.1f} "
+              f"{s['busy_seconds']:>7.1f} {s['max_queue']:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--llm-share", type=float, default=0.3, help="fraction of PDFs with an unknown layout")
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    parser.add_argument("--embed-latency", type=float, default=0.3)
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--extract-concurrency", type=int, default=16)
+    parser.add_argument("--embed-in-flight", type=int, default=256)
+    main(parser.parse_args())
@@ -0,0 +1,97 @@
+"""
+Load test for the /ask pipeline with stubbed LLM and vector backends.
+
+Runs the same query mix at increasing concurrency through the async pipeline
+(execute_query_async + synthesize_answer_from_docs_async) and, for contrast,
+through the old blocking calls made from inside a coroutine.
+
+Usage (from the api folder):
+    python -m benchmarks.load_test_ask --requests 200 --concurrency 1,8,32,64
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from benchmarks import fakes
+from query_processing import query_router, answer_generator
+from query_processing.query_executor import execute_query, execute_query_async
+from query_processing.answer_generator import synthesize_answer_from_docs, synthesize_answer_from_docs_async
+from db.sql_store import init_db
+
+
+async def run_level(n_requests: int, concurrency: int, one_request) -> dict:
+    queries = list(fakes.SAMPLE_ROUTES)
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def worker(i: int):
+        async with sem:
+            t0 = time.perf_counter()
+            await one_request(queries[i % len(queries)])
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(n_requests)))
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "wall_s": wall,
+        "rps": n_requests / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def print_table(title: str, rows: list[dict]):
+    print(f"\n{title}")
+    print(f"{'concurrency':>12} {'wall s':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for r in rows:
+        print(f"{r['concurrency']:>12} {r['wall_s']:>9.2f} {r['rps']:>9.1f} {r['p50_ms']:>9.0f} {r['p95_ms']:>9.0f}")
+
+
+async def main(args):
+    query_router.structured_router = fakes.FakeStructuredRouter(latency=args.router_latency)
+    answer_generator.llm = fakes.FakeChatModel(latency=args.answer_latency)
+
+    tmp = tempfile.mkdtemp(prefix="cv_rag_load_")
+    db_path = os.path.join(tmp, "candidates.db")
+    fakes.build_synthetic_db(db_path, args.candidates)
+    vs = fakes.FakeVectorStore(latency=args.vector_latency, docs=fakes.synthetic_docs(db_path))
+
+    async def async_request(q: str):
+        result = await execute_query_async(db_path, vs, q)
+        await synthesize_answer_from_docs_async(result, q)
+
+    con = init_db(db_path)
+
+    async def blocking_request(q: str):
+        # What /ask did before: blocking calls straight on the event loop
+        result = execute_query(con, vs, q)
+        synthesize_answer_from_docs(result, q)
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    rows = [await run_level(args.requests, c, async_request) for c in levels]
+    print_table("async pipeline", rows)
+
+    if args.baseline:
+        n = min(args.requests, args.baseline_requests)
+        rows = [await run_level(n, c, blocking_request) for c in levels]
+        print_table(f"blocking pipeline ({n} requests)", rows)
+    con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--router-latency", type=float, default=0.3)
+    parser.add_argument("--answer-latency", type=float, default=0.8)
+    parser.add_argument("--vector-latency", type=float, default=0.05)
+    parser.add_argument("--baseline", action="store_true", help="also run the old blocking path")
+    parser.add_argument("--baseline-requests", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
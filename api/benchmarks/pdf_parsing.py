@@ -0,0 +1,97 @@
+"""
+PDF parsing throughput in pages/second: extract_pdf_layout under
+asyncio.to_thread (the old process_single_resume path) vs. the process-pool
+parse service (cv_processing.parse_service) with 1, 4 and N (= CPU count)
+workers, and a re-run served from the parsed-layout cache.
+
+Two corpora: short resumes rendered from our templates, and long PDFs made
+by concatenating them, which the service splits into page ranges.
+
+Usage (from the api folder):
+    python -m benchmarks.pdf_parsing --resumes 200 --long-pdfs 4 --long-pages 60
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+from benchmarks import fakes
+from cv_processing.pdf_parser import extract_pdf_layout, pdf_page_count
+from cv_processing.parse_service import PdfParser
+
+
+def build_corpus(tmp: str, resumes: int, long_pdfs: int, long_pages: int):
+    import fitz
+    short = []
+    for i, cv in enumerate(fakes.synthetic_cv_json(resumes)):
+        path = os.path.join(tmp, f"{cv['id']}.pdf")
+        fakes.render_template_pdf(cv, path, list(fakes.TEMPLATE_STYLES)[i % 2])
+        short.append(path)
+    long = []
+    for n in range(long_pdfs):
+        doc = fitz.open()
+        i = n
+        while doc.page_count < long_pages:
+            src = fitz.open(short[i % len(short)])
+            doc.insert_pdf(src)
+            src.close()
+            i += long_pdfs
+        path = os.path.join(tmp, f"long_{n}.pdf")
+        doc.save(path)
+        doc.close()
+        long.append(path)
+    return short, long
+
+
+async def threads(paths):
+    await asyncio.gather(*(asyncio.to_thread(extract_pdf_layout, p) for p in paths))
+
+
+async def service(parser: PdfParser, paths):
+    await asyncio.gather(*(parser.parse(p) for p in paths))
+
+
+def timed(fn) -> float:
+    t = time.perf_counter()
+    fn()
+    return time.perf_counter() - t
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="cv_rag_parse_")
+    short, long = build_corpus(tmp, args.resumes, args.long_pdfs, args.long_pages)
+    corpora = {"resumes": short, "long PDFs": long}
+    pages = {name: sum(pdf_page_count(p) for p in paths) for name, paths in corpora.items()}
+    cpus = os.cpu_count() or 1
+    worker_counts = list(dict.fromkeys([1, 4, cpus]))
+    print(f"{len(short)} resumes ({pages['resumes']} pages), {len(long)} long PDFs ({pages['long PDFs']} pages), "
+          f"{cpus} CPUs")
+
+    print(f"{'path':<28} " + " ".join(f"{name + ' p/s':>14}" for name in corpora))
+    row = [pages[n] / timed(lambda: asyncio.run(threads(paths))) for n, paths in corpora.items()]
+    print(f"{'to_thread (default pool)':<28} " + " ".join(f"{r:>14.0f}" for r in row))
+    for workers in worker_counts:
+        row = []
+        for name, paths in corpora.items():
+            parser = PdfParser(workers=workers, cache_dir=None)
+            asyncio.run(service(parser, paths[:1]))     # start the pool outside the timing
+            row.append(pages[name] / timed(lambda: asyncio.run(service(parser, paths))))
+            parser.close()
+        print(f"{f'process pool, {workers} workers':<28} " + " ".join(f"{r:>14.0f}" for r in row))
+
+    row = []
+    for name, paths in corpora.items():
+        parser = PdfParser(workers=cpus, cache_dir=os.path.join(tmp, "cache"))
+        asyncio.run(service(parser, paths))
+        row.append(pages[name] / timed(lambda: asyncio.run(service(parser, paths))))
+        parser.close()
+    print(f"{'re-run, cache hits':<28} " + " ".join(f"{r:>14.0f}" for r in row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--long-pdfs", type=int, default=4)
+    parser.add_argument("--long-pages", type=int, default=60)
+    main(parser.parse_args())
@@ -0,0 +1,178 @@
+"""
+Profile loading for 1k and 10k candidates: the previous per-table loader (six
+IN (...) queries, models built row by row), the single-query JSON loader, and
+the in-process profile cache (cold and warm).
+
+Usage (from the api folder):
+    python -m benchmarks.profile_loader --sizes 1000,10000
+"""
+import os
+import time
+import argparse
+import tempfile
+from typing import Dict, List
+
+from benchmarks import fakes
+from db.sql_store import init_db, load_candidate_profiles, _ph
+from db.profile_cache import ProfileCache
+from model.CandidateProfile import CandidateProfile, EducationItem, ExperienceItem, LinkItem, CertificationItem
+
+
+def load_profiles_per_table(con, candidate_ids: List[str]) -> List[CandidateProfile]:
+    """The previous loader: one SELECT per table, models assembled row by row."""
+    if not candidate_ids:
+        return []
+
+    ph = _ph(len(candidate_ids))
+
+    # --- Base candidates ---
+    base_rows = con.execute(
+        f"""
+        SELECT id, full_name, email, phone, location, summary, source_file
+        FROM candidates
+        WHERE id IN ({ph})
+        """,
+        candidate_ids,
+    ).fetchall()
+    # id -> CandidateProfile (partially filled)
+    by_id: Dict[str, CandidateProfile] = {}
+    for cid, full_name, email, phone, location, summary, source_file in base_rows:
+        by_id[cid] = CandidateProfile(
+            full_name=full_name,
+            email=email,
+            phone=phone,
+            location=location,
+            links=[],
+            summary=summary,
+            skills=[],
+            education=[],
+            experience=[],
+            certifications=[]
+        )
+    if not by_id:
+        return []
+
+    # --- Links ---
+    rows = con.execute(
+        f"""
+        SELECT candidate_id, COALESCE(type,'other') as type, url
+        FROM links
+        WHERE candidate_id IN ({ph})
+        ORDER BY id
+        """,
+        candidate_ids,
+    ).fetchall()
+    for cid, typ, url in rows:
+        if cid in by_id:
+            by_id[cid].links.append(LinkItem(type=typ, url=url))
+
+    # --- Education (most recent first) ---
+    rows = con.execute(
+        f"""
+        SELECT candidate_id, institution, degree, field, start_year, end_year
+        FROM education
+        WHERE candidate_id IN ({ph})
+        ORDER BY COALESCE(end_year, start_year) DESC, institution
+        """,
+        candidate_ids,
+    ).fetchall()
+    for cid, inst, degree, field, sy, ey in rows:
+        if cid in by_id:
+            by_id[cid].education.append(EducationItem(
+                institution=inst, degree=degree, field=field,
+                start_year=sy, end_year=ey
+            ))
+
+    # --- Experience (most recent end/start first) ---
+    rows = con.execute(
+        f"""
+        SELECT candidate_id, company, title, start, "end", description
+        FROM experience
+        WHERE candidate_id IN ({ph})
+        ORDER BY COALESCE(substr("end",1,4),'9999') DESC,
+                 COALESCE(substr(start,1,4),'0000') DESC,
+                 company
+        """,
+        candidate_ids,
+    ).fetchall()
+    for cid, company, title, start, end, desc in rows:
+        if cid in by_id:
+            by_id[cid].experience.append(ExperienceItem(
+                company=company, title=title, start=start, end=end, description=desc,
+                skills=None, highlights=None  # not stored in SQL per your simplified schema
+            ))
+
+    # --- Skills (sorted) ---
+    rows = con.execute(
+        f"""
+        SELECT candidate_id, skill
+        FROM skills
+        WHERE candidate_id IN ({ph})
+        ORDER BY lower(skill)
+        """,
+        candidate_ids,
+    ).fetchall()
+    for cid, skill in rows:
+        if cid in by_id and skill:
+            by_id[cid].skills.append(skill)
+
+    # --- Certifications (recent first, then name) ---
+    rows = con.execute(
+        f"""
+        SELECT candidate_id, name, year, issuer
+        FROM certifications
+        WHERE candidate_id IN ({ph})
+        ORDER BY COALESCE(year, 0) DESC, lower(name)
+        """,
+        candidate_ids,
+    ).fetchall()
+    for cid, name, year, issuer in rows:
+        if cid in by_id:
+            by_id[cid].certifications.append(CertificationItem(
+                name=name, year=year, issuer=issuer
+            ))
+
+    # Preserve input order
+    return [by_id[cid] for cid in candidate_ids if cid in by_id]
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main(args):
+    sizes = [int(s) for s in args.sizes.split(",")]
+    tmp = tempfile.mkdtemp(prefix="cv_rag_profiles_")
+    db_path = os.path.join(tmp, "profiles.db")
+    t0 = time.perf_counter()
+    fakes.build_synthetic_db(db_path, max(sizes))
+    print(f"built {max(sizes)} synthetic profiles in {time.perf_counter() - t0:.1f}s")
+    con = init_db(db_path)
+    all_ids = [r[0] for r in con.execute("SELECT id FROM candidates ORDER BY rowid")]
+
+    # Same profiles, same order, from both loaders
+    sample = all_ids[:200]
+    assert [p.model_dump() for p in load_profiles_per_table(con, sample)] == \
+           [p.model_dump() for p in load_candidate_profiles(con, sample)]
+
+    print(f"\n{'profiles':>9} {'per-table ms':>13} {'json ms':>9} {'cache cold ms':>14} {'cache warm ms':>14}")
+    for n in sizes:
+        ids = all_ids[:n]
+        per_table = timed(lambda: load_profiles_per_table(con, ids))
+        single = timed(lambda: load_candidate_profiles(con, ids))
+        cold = timed(lambda: ProfileCache(max_entries=n).load(con, ids))
+        cache = ProfileCache(max_entries=n)
+        cache.load(con, ids)
+        warm = timed(lambda: cache.load(con, ids))
+        print(f"{n:>9} {per_table:>13.0f} {single:>9.0f} {cold:>14.0f} {warm:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000")
+    main(parser.parse_args())
@@ -0,0 +1,91 @@
+"""
+Router latency before/after the rule-based fast path on a fixed query set.
+
+"before" routes every query through the (fake) LLM router; "after" goes
+through route_query, which only falls back to the LLM when the rule match is
+ambiguous. Also reports which path each query took and whether the rule route
+agrees with the expected route.
+
+Usage (from the api folder):
+    python -m benchmarks.router_latency --router-latency 0.6
+"""
+import os
+import time
+import argparse
+import tempfile
+import statistics
+
+from benchmarks import fakes
+from query_processing import query_router, rule_router
+from db.sql_store import init_db
+
+EXTRA_QUERIES = [
+    "hi there",
+    "who knows Docker, Kubernetes and Terraform",
+    "python developers who worked at Stripe",
+    "alumni of ETH Zurich",
+    "engineers with experience building payment systems",
+    "who has hands-on experience with Kafka in production",
+    "tell me about Omar Hassan",
+    "machine learning researchers in healthcare",
+]
+
+
+def same_slots(a, b) -> bool:
+    return (a.mode == b.mode and sorted(a.skills or []) == sorted(b.skills or [])
+            and (a.company or "").lower() == (b.company or "").lower()
+            and (a.institution or "").lower() == (b.institution or "").lower()
+            and (a.candidate_name or "") == (b.candidate_name or ""))
+
+
+def main(args):
+    query_router.structured_router = fakes.FakeStructuredRouter(latency=args.router_latency)
+
+    tmp = tempfile.mkdtemp(prefix="cv_rag_router_")
+    db_path = os.path.join(tmp, "candidates.db")
+    fakes.build_synthetic_db(db_path, args.candidates)
+    con = init_db(db_path)
+    # Make sure the named candidate in the fixed set exists
+    con.execute("UPDATE candidates SET full_name='Amanda Lawrence' WHERE rowid=1")
+    con.commit()
+
+    queries = list(fakes.SAMPLE_ROUTES) + EXTRA_QUERIES
+
+    t0 = time.perf_counter()
+    vocab = rule_router.get_vocabulary(con)
+    print(f"vocabulary: {len(vocab.skills)} skills, {len(vocab.companies)} companies, "
+          f"{len(vocab.institutions)} institutions, {len(vocab.names)} names "
+          f"(loaded in {(time.perf_counter() - t0) * 1000:.1f} ms)\n")
+
+    before, after = [], []
+    print(f"{'query':<55} {'path':<6} {'conf':>5} {'ms':>8}  agrees")
+    for q in queries:
+        t0 = time.perf_counter()
+        query_router.route_query_llm(q)
+        before.append(time.perf_counter() - t0)
+
+        rule_route = rule_router.route_query_rules(vocab, q)
+        calls = query_router.structured_router.calls
+        t0 = time.perf_counter()
+        route = query_router.route_query(con, q)
+        elapsed = time.perf_counter() - t0
+        after.append(elapsed)
+
+        path = "llm" if query_router.structured_router.calls > calls else "rule"
+        expected = fakes.SAMPLE_ROUTES.get(q)
+        agrees = "-" if expected is None or path == "llm" else ("yes" if same_slots(route, expected) else "NO")
+        conf = f"{rule_route.confidence:.2f}" if rule_route else "  -"
+        print(f"{q:<55} {path:<6} {conf:>5} {elapsed * 1000:>8.2f}  {agrees}")
+
+    print(f"\n{'':<12} {'mean ms':>10} {'p50 ms':>10} {'total s':>10}")
+    for label, xs in (("llm only", before), ("rules+llm", after)):
+        print(f"{label:<12} {statistics.mean(xs) * 1000:>10.2f} {statistics.median(xs) * 1000:>10.2f} {sum(xs):>10.2f}")
+    print("\ncounters:", rule_router.router_stats())
+    con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--router-latency", type=float, default=0.6)
+    main(parser.parse_args())
@@ -0,0 +1,106 @@
+"""
+Multi-skill AND/OR lookups over a synthetic corpus: the original
+lower(skill) IN (...) GROUP BY over the skills table, the same over the
+canonical candidate_skills link table, and the in-memory bitset index. The
+shortlist rows time a whole scored page (ranked_shortlist, top 20) with the
+skill match from SQL and from the bitset index; hits are its total matches.
+
+Usage (from the api folder):
+    python -m benchmarks.skill_queries --candidates 500000 --queries 50
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from benchmarks import fakes
+from db.sql_store import init_db, ids_by_skills as ids_by_skills_sql, ranked_shortlist
+from db.skill_dictionary import resolve_skill_id, canonical_skill
+from db.skill_index import SkillIndex, ids_by_skills as ids_by_skills_index, get_skill_index
+
+
+def populate(con, n: int, seed: int = 7, batch: int = 50_000):
+    rnd = random.Random(seed)
+    # Skewed popularity so 5-skill intersections are neither empty nor huge
+    weights = [1.0 / (i + 1) ** 0.6 for i in range(len(fakes.SKILLS))]
+    with con:
+        skill_ids = {s: resolve_skill_id(con, s) for s in fakes.SKILLS}
+    for start in range(0, n, batch):
+        rows_c, rows_s, rows_cs = [], [], []
+        for i in range(start, min(n, start + batch)):
+            cid = f"c{i:08d}"
+            rows_c.append((cid, f"Candidate {i}"))
+            picked = set(rnd.choices(fakes.SKILLS, weights=weights, k=rnd.randint(6, 14)))
+            for s in picked:
+                rows_s.append((cid, s))
+                rows_cs.append((cid, skill_ids[s]))
+        with con:
+            con.executemany("INSERT INTO candidates(id, full_name) VALUES (?, ?)", rows_c)
+            con.executemany("INSERT INTO skills(candidate_id, skill) VALUES (?, ?)", rows_s)
+            con.executemany("INSERT INTO candidate_skills(candidate_id, skill_id) VALUES (?, ?)", rows_cs)
+        con.execute("UPDATE data_generation SET generation = generation + 1 WHERE id=1")
+        con.commit()
+
+
+def ids_by_skills_legacy(con, skills, mode="and"):
+    # The pre-dictionary query, for comparison
+    skills = sorted({s.lower().strip() for s in skills})
+    qmarks = ",".join("?" for _ in skills)
+    if mode == "or":
+        sql = f"SELECT DISTINCT c.id FROM candidates c JOIN skills s ON s.candidate_id = c.id WHERE lower(s.skill) IN ({qmarks})"
+        return [r[0] for r in con.execute(sql, skills)]
+    sql = (f"SELECT c.id FROM candidates c JOIN skills s ON s.candidate_id = c.id WHERE lower(s.skill) IN ({qmarks}) "
+           f"GROUP BY c.id HAVING COUNT(DISTINCT lower(s.skill)) = ?")
+    return [r[0] for r in con.execute(sql, skills + [len(skills)])]
+
+
+def bench(fn, queries, mode):
+    samples, sizes = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        res = fn(q, mode)
+        samples.append(time.perf_counter() - t0)
+        sizes.append(len(res))
+    return statistics.median(samples) * 1e6, statistics.mean(sizes)
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="cv_rag_skills_")
+    con = init_db(os.path.join(tmp, "skills.db"))
+    t0 = time.perf_counter()
+    populate(con, args.candidates)
+    print(f"populated {args.candidates} candidates in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    index = SkillIndex.build(con)
+    print(f"bitset index built in {time.perf_counter() - t0:.2f}s "
+          f"({sum((b.bit_length() + 7) // 8 for b in index.bitsets.values()) / 1e6:.1f} MB of bitsets)")
+    get_skill_index(con)
+
+    rnd = random.Random(1)
+    queries = [rnd.sample(fakes.SKILLS[:20], 5) for _ in range(args.queries)]
+    # Mixed spellings resolve to the same canonical skills through the alias table
+    assert canonical_skill("python3") == canonical_skill("Python")
+
+    print(f"\n{'lookup':<46} {'median µs':>12} {'mean hits':>10}")
+    for mode in ("and", "or"):
+        for label, fn in (
+            ("legacy lower(skill) IN + GROUP BY", lambda q, m: ids_by_skills_legacy(con, q, m)),
+            ("candidate_skills GROUP BY", lambda q, m: ids_by_skills_sql(con, q, m)),
+            ("bitset index (ids)", lambda q, m: ids_by_skills_index(con, q, m)),
+            ("bitset index (count only)", lambda q, m: range(index.count([resolve_skill_id(con, s, False) for s in q], m))),
+            ("shortlist, SQL skill match", lambda q, m: range(ranked_shortlist(con, q, skill_mode=m)[1])),
+            ("shortlist, bitset skill match",
+             lambda q, m: range(ranked_shortlist(con, q, skill_mode=m, skill_matches=ids_by_skills_index(con, q, m))[1])),
+        ):
+            us, hits = bench(fn, queries, mode)
+            print(f"{'5-skill ' + mode.upper() + ': ' + label:<46} {us:>12.0f} {hits:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,90 @@
+"""
+Snapshot create/restore time (db.snapshot) for a node with --candidates
+candidates and one --dim vector per candidate, split into the SQLite backup,
+the vector export/import and the checksum pass, with a per-1M projection.
+Also checks the restored node answers a vector query like the source.
+
+Vectors are random and added straight to Chroma (no embeddings requests);
+SQLite profiles are synthetic.
+
+Usage (from the api folder):
+    python -m benchmarks.snapshot --candidates 20000 --dim 1536
+"""
+import os
+os.environ.setdefault("OPENAI_API_KEY", "unused")   # chroma_store builds its (unused) OpenAI client on import
+
+import time
+import random
+import argparse
+import tempfile
+
+import numpy as np
+from langchain_chroma import Chroma
+
+from benchmarks import fakes
+from db import snapshot
+from db.chroma_store import store as live_store
+
+
+def chroma(path: str, emb) -> Chroma:
+    # Same collection name as the live store, so restore maps it back
+    return Chroma(collection_name=live_store._collection.name, embedding_function=emb, persist_directory=path)
+
+
+def fill(store: Chroma, ids, dim: int, batch: int = 5000):
+    rng = np.random.default_rng(3)
+    for i in range(0, len(ids), batch):
+        chunk = ids[i:i + batch]
+        vectors = rng.standard_normal((len(chunk), dim), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        store._collection.add(ids=[f"{cid}-0" for cid in chunk], embeddings=vectors,
+                              metadatas=[{"candidate_id": cid, "chunk": 0} for cid in chunk],
+                              documents=[f"resume of {cid}" for cid in chunk])
+
+
+def timed(fn):
+    t = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="cv_rag_snapshot_")
+    src_db, dst_db = os.path.join(tmp, "src.db"), os.path.join(tmp, "dst.db")
+    emb = fakes.FakeEmbeddings(dim=args.dim)
+    ids = fakes.build_synthetic_db(src_db, args.candidates)
+    src = chroma(os.path.join(tmp, "chroma_src"), emb)
+    fill(src, ids, args.dim)
+    print(f"{args.candidates} candidates, {args.dim}-d vectors, {os.cpu_count()} CPUs")
+
+    out = os.path.join(tmp, "snap")
+    (_, t_sql) = timed(lambda: snapshot.backup_sqlite(src_db, os.path.join(tmp, "backup_only.db")))
+    manifest, t_create = timed(lambda: snapshot.create_snapshot(src_db, out, stores=[src]))
+    size = sum(f["bytes"] for f in manifest["files"].values())
+
+    dst = chroma(os.path.join(tmp, "chroma_dst"), emb)
+    (_, t_verify) = timed(lambda: snapshot.read_manifest(out, verify=True))
+    (_, t_restore_sql) = timed(lambda: snapshot.restore_sqlite(os.path.join(out, snapshot.SNAPSHOT_DB), dst_db))
+    meta = next(iter(manifest["collections"].values()))
+    (_, t_restore_vec) = timed(lambda: snapshot.import_vectors(dst, out, meta))
+    t_restore = t_verify + t_restore_sql + t_restore_vec
+
+    per_1m = 1_000_000 / args.candidates
+    print(f"snapshot: {size / 1e6:.0f} MB")
+    print(f"{'step':<28} {'s':>8} {'s per 1M':>10}")
+    for label, t in (("create (total)", t_create), ("  of which SQLite backup", t_sql),
+                     ("restore (total)", t_restore), ("  checksum verify", t_verify),
+                     ("  SQLite restore", t_restore_sql), ("  vector import", t_restore_vec)):
+        print(f"{label:<28} {t:>8.2f} {t * per_1m:>10.0f}")
+
+    probe = src._collection.get(ids=[f"{random.Random(1).choice(ids)}-0"], include=["embeddings"])["embeddings"][0]
+    same = [s._collection.query(query_embeddings=[probe], n_results=5)["ids"][0] for s in (src, dst)]
+    print(f"restored: {dst._collection.count()} vectors, {snapshot.candidate_count(dst_db)} candidates, "
+          f"same top-5 as source: {same[0] == same[1]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    main(parser.parse_args())
@@ -0,0 +1,96 @@
+"""
+SQLite write throughput: the current per-resume path (store_profile through
+asyncio.to_thread: a new connection, one execute per child row and one
+commit per resume) vs. the shared writer thread (db.sql_writer), which
+commits queued profiles in batches with one executemany per table.
+
+Both paths get the same profiles from the same number of concurrent
+coroutines. Rows are every row written: candidate, links, education,
+experience, skills, skill ids, certifications and resume text.
+
+Usage (from the api folder):
+    python -m benchmarks.sql_writer --profiles 10000 --concurrency 8
+"""
+import os
+import time
+import sqlite3
+import asyncio
+import argparse
+import tempfile
+
+from benchmarks import fakes
+from db.sql_store import store_profile, CHILD_TABLES
+from db.sql_writer import SqlWriter
+from cv_processing.json_loader import cv_json_to_profile, cv_json_text
+
+
+def count_rows(db_path: str) -> int:
+    con = sqlite3.connect(db_path)
+    try:
+        return sum(con.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ("candidates",) + CHILD_TABLES)
+    finally:
+        con.close()
+
+
+async def run_concurrently(rows, concurrency: int, write) -> int:
+    """Feed rows to `write` from `concurrency` coroutines; returns the number that failed."""
+    it = iter(rows)
+    failed = 0
+
+    async def worker():
+        nonlocal failed
+        for cid, profile, src, text in it:
+            try:
+                await write(cid, profile, src, text)
+            except sqlite3.OperationalError as e:
+                failed += 1
+                if failed <= 3:
+                    print(f"  {cid}: {e}")
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return failed
+
+
+def bench_store_profile(rows, db_path: str, concurrency: int):
+    async def write(cid, profile, src, text):
+        await asyncio.to_thread(store_profile, db_path, profile, source_file=src, candidate_id=cid, resume_text=text)
+    t = time.perf_counter()
+    failed = asyncio.run(run_concurrently(rows, concurrency, write))
+    return time.perf_counter() - t, failed
+
+
+def bench_writer(rows, db_path: str, concurrency: int, batch: int):
+    writer = SqlWriter(db_path, batch_size=batch).start()
+
+    async def write(cid, profile, src, text):
+        await asyncio.wrap_future(writer.submit(profile, source_file=src, candidate_id=cid, resume_text=text))
+    t = time.perf_counter()
+    failed = asyncio.run(run_concurrently(rows, concurrency, write))
+    elapsed = time.perf_counter() - t
+    writer.close()
+    return elapsed, failed, writer.snapshot()
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="cv_rag_writer_")
+    rows = [(cv["id"], cv_json_to_profile(cv), f"file:///resumes/{cv['id']}.pdf", cv_json_text(cv))
+            for cv in fakes.synthetic_cv_json(args.profiles)]
+
+    old_db, new_db = os.path.join(tmp, "store_profile.db"), os.path.join(tmp, "writer.db")
+    old_s, old_failed = bench_store_profile(rows, old_db, args.concurrency)
+    new_s, new_failed, stats = bench_writer(rows, new_db, args.concurrency, args.batch)
+    old_rows, new_rows = count_rows(old_db), count_rows(new_db)
+
+    print(f"{args.profiles} profiles, {args.concurrency} concurrent writers")
+    print(f"store_profile : {old_s:6.1f}s  {args.profiles / old_s:7.0f} profiles/s  {old_rows / old_s:8.0f} rows/s"
+          f"  ({old_rows} rows, {old_failed} failed)")
+    print(f"SqlWriter     : {new_s:6.1f}s  {args.profiles / new_s:7.0f} profiles/s  {new_rows / new_s:8.0f} rows/s"
+          f"  ({new_rows} rows, {new_failed} failed, {stats['batches']} batches)")
+    print(f"Speedup       : {old_s / new_s:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=200, help="SqlWriter batch size")
+    main(parser.parse_args())
@@ -0,0 +1,53 @@
+"""
+Stage timings of execute_query_async with and without speculative vector search.
+
+The rule router and route cache are disabled so every query pays the (fake)
+LLM router latency. Sequential wall time is ~router + vector; speculative
+should be ~max(router, vector).
+
+Usage (from the api folder):
+    python -m benchmarks.stage_timings --router-latency 0.4 --vector-latency 0.3
+"""
+import os
+os.environ["QUERY_CACHE_ENABLED"] = "0"
+
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from benchmarks import fakes
+from query_processing import query_router, rule_router
+from query_processing.query_executor import execute_query_async
+
+
+async def main(args):
+    rule_router.RULE_ROUTER_ENABLED = False
+    query_router.structured_router = fakes.FakeStructuredRouter(latency=args.router_latency)
+
+    tmp = tempfile.mkdtemp(prefix="cv_rag_stages_")
+    db_path = os.path.join(tmp, "candidates.db")
+    fakes.build_synthetic_db(db_path, args.candidates)
+    vs = fakes.FakeVectorStore(latency=args.vector_latency, docs=fakes.synthetic_docs(db_path))
+
+    print(f"{'query':<45} {'mode':<12} {'route':>7} {'vector':>7} {'sql':>7} {'total':>7}  (ms)")
+    totals = {False: [], True: []}
+    for speculative in (False, True):
+        for q in fakes.SAMPLE_ROUTES:
+            result = await execute_query_async(db_path, vs, q, speculative=speculative)
+            t = result["timings"]
+            totals[speculative].append(t["total_ms"])
+            label = "speculative" if speculative else "sequential"
+            print(f"{q:<45} {label:<12} {t.get('route_ms', 0):>7.0f} {t.get('vector_ms', 0):>7.0f} "
+                  f"{t.get('sql_ms', 0):>7.0f} {t['total_ms']:>7.0f}")
+
+    print(f"\nmean total: sequential {statistics.mean(totals[False]):.0f} ms, "
+          f"speculative {statistics.mean(totals[True]):.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--router-latency", type=float, default=0.4)
+    parser.add_argument("--vector-latency", type=float, default=0.3)
+    asyncio.run(main(parser.parse_args()))
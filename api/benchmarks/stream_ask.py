@@ -0,0 +1,73 @@
+"""
+Perceived latency of /ask/stream vs. /ask with a fake streaming LLM.
+
+Drives the SSE generator behind /ask/stream and reports when the route, the
+evidence, the first answer token and the final event arrive, next to the
+time the buffered /ask handler takes to return anything.
+
+Usage (from the api folder):
+    python -m benchmarks.stream_ask --router-latency 0.3 --answer-latency 2.0
+"""
+import os
+os.environ["QUERY_CACHE_ENABLED"] = "0"
+
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+from benchmarks import fakes
+from query_processing import query_router, answer_generator
+import main as api
+
+
+async def measure_stream(question: str) -> dict:
+    marks = {}
+    t0 = time.perf_counter()
+    answer = ""
+    async for raw in api.ask_stream_events(question):
+        event = raw.split("\n", 1)[0].removeprefix("event: ")
+        data = json.loads(raw.split("data: ", 1)[1])
+        if event == "token":
+            marks.setdefault("first_token", time.perf_counter() - t0)
+        else:
+            marks[event] = time.perf_counter() - t0
+        if event == "done":
+            answer = data["answer"]
+        if event == "error":
+            raise RuntimeError(data["detail"])
+    marks["answer_chars"] = len(answer)
+    return marks
+
+
+async def measure_buffered(question: str) -> float:
+    t0 = time.perf_counter()
+    await api.ask_question(api.AskRequest(question=question))
+    return time.perf_counter() - t0
+
+
+async def main(args):
+    query_router.structured_router = fakes.FakeStructuredRouter(latency=args.router_latency)
+    answer_generator.llm = fakes.FakeChatModel(latency=args.answer_latency, tokens_per_second=args.tokens_per_second)
+
+    tmp = tempfile.mkdtemp(prefix="cv_rag_stream_")
+    api.DB_PATH = os.path.join(tmp, "candidates.db")
+    fakes.build_synthetic_db(api.DB_PATH, args.candidates)
+    api.vs = fakes.FakeVectorStore(latency=args.vector_latency, docs=fakes.synthetic_docs(api.DB_PATH))
+
+    print(f"{'query':<45} {'route':>7} {'evidence':>9} {'1st tok':>8} {'done':>7} {'/ask':>7}  (seconds)")
+    for q in fakes.SAMPLE_ROUTES:
+        s = await measure_stream(q)
+        b = await measure_buffered(q)
+        print(f"{q:<45} {s['route']:>7.2f} {s['evidence']:>9.2f} {s['first_token']:>8.2f} {s['done']:>7.2f} {b:>7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=500)
+    parser.add_argument("--router-latency", type=float, default=0.3)
+    parser.add_argument("--answer-latency", type=float, default=2.0)
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--vector-latency", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,98 @@
+"""
+Resumes/second of profile extraction with and without the template fast path.
+
+Without it every PDF goes to extract_pdf_text + the (fake) LLM extractor; with
+it PDFs rendered from our templates are parsed from their layout and only
+unknown layouts reach the LLM. PDFs come from --pdf-dir if it has any,
+otherwise synthetic CVs are rendered with fakes.render_template_pdf
+(alternating both templates) and the parsed profiles are also checked
+field by field against the source JSON.
+
+Usage (from the api folder):
+    python -m benchmarks.template_extraction --resumes 200 --llm-latency 4
+"""
+import os
+import glob
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import fakes
+from cv_processing import cv_extractor
+from cv_processing.pdf_parser import extract_pdf_text, extract_pdf_layout
+
+
+def llm_path(pdf_path: str):
+    return cv_extractor.extract_structured_profile_from_text(extract_pdf_text(pdf_path)), "llm"
+
+
+def fast_path(pdf_path: str):
+    return cv_extractor.extract_profile_from_layout(extract_pdf_layout(pdf_path))
+
+
+def run(fn, pdfs, concurrency: int):
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fn, pdfs))
+    return results, time.perf_counter() - t0
+
+
+def field_matches(profile, cv: dict) -> dict:
+    return {
+        "header": (profile.full_name, profile.email, profile.phone, profile.location, profile.summary)
+                  == (cv["full_name"], cv["email"], cv["phone"], cv["location"], cv["summary"]),
+        "skills": profile.skills == cv["skills"],
+        "experience": [(e.company, e.title, e.start, e.end, e.description, e.highlights) for e in profile.experience]
+                      == [(e["company"], e["title"], e["start_date"], e["end_date"], e["summary"], e["highlights"] or None)
+                          for e in cv["experience"]],
+        "education": [(e.institution, e.degree, e.start_year, e.end_year) for e in profile.education]
+                     == [(e["institution"], e["degree"], e["start_year"], e["end_year"]) for e in cv["education"]],
+    }
+
+
+def main(args):
+    cv_extractor.build_llm = lambda: fakes.FakeExtractionLLM(latency=args.llm_latency)
+
+    pdfs = sorted(glob.glob(os.path.join(args.pdf_dir, "*.pdf")))[:args.resumes]
+    truth = {}
+    if not pdfs:
+        tmp = tempfile.mkdtemp(prefix="cv_rag_templates_")
+        templates = list(fakes.TEMPLATE_STYLES)
+        for i, cv in enumerate(fakes.synthetic_cv_json(args.resumes)):
+            path = os.path.join(tmp, f"{cv['id']}.pdf")
+            fakes.render_template_pdf(cv, path, templates[i % len(templates)])
+            pdfs.append(path)
+            truth[path] = cv
+        print(f"Rendered {len(pdfs)} synthetic resumes into {tmp}")
+    else:
+        print(f"Using {len(pdfs)} PDFs from {args.pdf_dir}")
+
+    _, llm_s = run(llm_path, pdfs, args.concurrency)
+    results, fast_s = run(fast_path, pdfs, args.concurrency)
+
+    parsed = sum(1 for _, extractor in results if extractor == "template")
+    print(f"\n{'path':<12} {'seconds':>8} {'resumes/s':>10}")
+    print(f"{'llm only':<12} {llm_s:>8.2f} {len(pdfs) / llm_s:>10.1f}")
+    print(f"{'fast path':<12} {fast_s:>8.2f} {len(pdfs) / fast_s:>10.1f}")
+    print(f"\nfast path handled {parsed}/{len(pdfs)} resumes, {len(pdfs) - parsed} fell back to the LLM; "
+          f"speedup {llm_s / fast_s:.0f}x (concurrency {args.concurrency}, LLM latency {args.llm_latency}s)")
+
+    if truth:
+        totals = {}
+        for path, (profile, extractor) in zip(pdfs, results):
+            if extractor != "template":
+                continue
+            for field, ok in field_matches(profile, truth[path]).items():
+                totals[field] = totals.get(field, 0) + ok
+        print("exact field matches vs source JSON: " +
+              ", ".join(f"{field} {n}/{parsed}" for field, n in totals.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf-dir", default="./data/pdf")
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=4.0)
+    parser.add_argument("--concurrency", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,152 @@
+"""
+/ask latency while resumes are uploaded through POST /resumes.
+
+Measures /ask p50/p95 with the API idle, then while a bulk upload of
+--resumes PDFs (sent in requests of --per-request files) is ingested by the
+background queue, once with the parse pool at normal priority and once at
+UPLOAD_PARSE_NICE. Also reports how long the upload requests took to return
+their job ids and how long ingestion took. Router, answer LLM, extraction
+LLM and vector store are fakes; requests go through the ASGI app in-process.
+
+Usage (from the api folder):
+    python -m benchmarks.upload_ask --resumes 200 --ask-concurrency 4
+"""
+import os
+os.environ["QUERY_CACHE_ENABLED"] = "0"
+os.environ["PRECOMPUTED_SUMMARIES"] = "0"
+os.environ["PARSE_CACHE_DIR"] = ""
+
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+import httpx
+
+from benchmarks import fakes
+from benchmarks.ingest_pipeline import render_plain_pdf
+from query_processing import query_router, answer_generator
+from cv_processing.uploads import IngestQueue, UPLOAD_PARSE_NICE
+from model.CandidateProfile import CandidateProfile
+import main as api
+
+
+def build_corpus(folder: str, n: int, seed: int):
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i, cv in enumerate(fakes.synthetic_cv_json(n, seed=seed)):
+        path = os.path.join(folder, f"{cv['id']}.pdf")
+        # Half template layouts (parsed locally), half unknown layouts (LLM extraction)
+        fakes.render_template_pdf(cv, path) if i % 2 else render_plain_pdf(cv, path)
+        paths.append(path)
+    return paths
+
+
+def percentiles(latencies) -> dict:
+    latencies = sorted(latencies)
+    return {"n": len(latencies), "p50_ms": statistics.median(latencies) * 1000,
+            "p95_ms": latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000}
+
+
+async def ask_until(client: httpx.AsyncClient, done: asyncio.Event, concurrency: int, min_requests: int = 0):
+    questions = list(fakes.SAMPLE_ROUTES)
+    latencies = []
+
+    async def worker(w: int):
+        i = w
+        while not done.is_set() or len(latencies) < min_requests:
+            t0 = time.perf_counter()
+            r = await client.post("/ask", json={"question": questions[i % len(questions)]})
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - t0)
+            i += concurrency
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    return latencies
+
+
+async def upload_all(client: httpx.AsyncClient, paths, per_request: int):
+    job_ids, upload_s = [], []
+    for start in range(0, len(paths), per_request):
+        files = [("files", (os.path.basename(p), open(p, "rb"), "application/pdf"))
+                 for p in paths[start:start + per_request]]
+        t0 = time.perf_counter()
+        r = await client.post("/resumes", files=files)
+        upload_s.append(time.perf_counter() - t0)
+        for _, (_, fh, _) in files:
+            fh.close()
+        r.raise_for_status()
+        job_ids.append(r.json()["job_id"])
+    return job_ids, upload_s
+
+
+async def wait_jobs(client: httpx.AsyncClient, job_ids):
+    while True:
+        statuses = [(await client.get(f"/ingest/jobs/{j}")).json()["status"] for j in job_ids]
+        if all(s in ("completed", "failed") for s in statuses):
+            return statuses
+        await asyncio.sleep(0.2)
+
+
+async def during_upload(client, paths, args, parse_nice: int) -> dict:
+    store = fakes.FakeVectorStore(latency=args.vector_latency)
+
+    def extract(text: str) -> CandidateProfile:
+        time.sleep(args.extract_latency)
+        return CandidateProfile(full_name=text.strip().splitlines()[0])
+
+    api.ingest_queue = IngestQueue(api.DB_PATH, parse_nice=parse_nice, store=store, extract_fn=extract,
+                                   report_seconds=0)
+    done = asyncio.Event()
+    asker = asyncio.create_task(ask_until(client, done, args.ask_concurrency))
+    t0 = time.perf_counter()
+    job_ids, upload_s = await upload_all(client, paths, args.per_request)
+    statuses = await wait_jobs(client, job_ids)
+    ingest_s = time.perf_counter() - t0
+    done.set()
+    latencies = await asker
+    await api.ingest_queue.close()
+    return {**percentiles(latencies), "upload_p95_ms": percentiles(upload_s)["p95_ms"], "ingest_s": ingest_s,
+            "stored": len({d.metadata["candidate_id"] for d in store.docs}), "jobs": statuses}
+
+
+async def main(args):
+    query_router.structured_router = fakes.FakeStructuredRouter(latency=args.router_latency)
+    answer_generator.llm = fakes.FakeChatModel(latency=args.answer_latency)
+
+    tmp = tempfile.mkdtemp(prefix="cv_rag_upload_")
+    api.DB_PATH = os.path.join(tmp, "candidates.db")
+    api.UPLOAD_DIR = os.path.join(tmp, "uploads")
+    fakes.build_synthetic_db(api.DB_PATH, args.candidates)
+    api.vs = fakes.FakeVectorStore(latency=args.vector_latency, docs=fakes.synthetic_docs(api.DB_PATH))
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        idle = asyncio.Event()
+        idle.set()
+        rows = [("idle", {**percentiles(await ask_until(client, idle, args.ask_concurrency, args.idle_requests))})]
+        for seed, nice in ((101, 0), (202, UPLOAD_PARSE_NICE)):
+            paths = build_corpus(os.path.join(tmp, f"pdf_{seed}"), args.resumes, seed)
+            rows.append((f"uploading, parse nice {nice}", await during_upload(client, paths, args, nice)))
+
+    print(f"{args.resumes} resumes in requests of {args.per_request}, /ask concurrency {args.ask_concurrency}, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'phase':<26} {'asks':>5} {'p50 ms':>8} {'p95 ms':>8} {'upload p95 ms':>14} {'ingest s':>9} {'stored':>7}")
+    for label, r in rows:
+        print(f"{label:<26} {r['n']:>5} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+              f"{r.get('upload_p95_ms', 0):>14.0f} {r.get('ingest_s', 0):>9.1f} {r.get('stored', 0):>7}")
+    api.shutdown_executors()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--per-request", type=int, default=20)
+    parser.add_argument("--candidates", type=int, default=500)
+    parser.add_argument("--ask-concurrency", type=int, default=4)
+    parser.add_argument("--idle-requests", type=int, default=100)
+    parser.add_argument("--router-latency", type=float, default=0.3)
+    parser.add_argument("--answer-latency", type=float, default=0.8)
+    parser.add_argument("--extract-latency", type=float, default=1.0)
+    parser.add_argument("--vector-latency", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
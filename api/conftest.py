@@ -0,0 +1 @@
+# Lets pytest import the api packages (db, query_processing, ...) the way main.py does.
@@ -0,0 +1,42 @@
+"""
+(Re)build the section-level Chroma index from the profiles already in SQLite,
+without re-parsing or re-extracting the PDFs.
+
+Usage (from the api folder):
+    python -m cv_processing.build_section_index [--batch 200]
+Then start the API with VECTOR_INDEX_MODE=sections.
+"""
+import argparse
+from db.sql_store import init_db, load_candidate_profiles
+from db.chroma_store import section_store
+from cv_processing.cv_chunker import build_section_docs
+
+
+def build_section_index(db_path: str = "./data/candidates.db", batch: int = 200) -> int:
+    con = init_db(db_path)
+    try:
+        rows = con.execute("SELECT id, source_file FROM candidates ORDER BY rowid").fetchall()
+        indexed = 0
+        for i in range(0, len(rows), batch):
+            chunk = rows[i:i + batch]
+            ids = [cid for cid, _ in chunk]
+            # Drop a candidate's old chunks so re-running does not duplicate them
+            section_store.delete(where={"candidate_id": {"$in": ids}})
+            docs = []
+            for (cid, source_file), profile in zip(chunk, load_candidate_profiles(con, ids)):
+                docs.extend(build_section_docs(cid, profile, pdf_path=source_file or ""))
+            if docs:
+                section_store.add_documents(docs)
+            indexed += len(chunk)
+            print(f"Indexed {indexed}/{len(rows)} candidates ({len(docs)} chunks in this batch)")
+        return indexed
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="./data/candidates.db")
+    parser.add_argument("--batch", type=int, default=200)
+    args = parser.parse_args()
+    build_section_index(args.db, args.batch)
@@ -3,7 +3,7 @@ from model.CandidateProfile import CandidateProfile
 
 def synth_experience_text(ex):
     parts = []
-    parts.append(f"{(ex.title or '').strip()} at {ex.company} ({ex.start} to {ex.end}).".strip())
+    parts.append(f"{(ex.title or '').strip()} at {ex.company} ({ex.start} to {ex.end or 'Present'}).".strip())
     if ex.description:
         parts.append(f"Responsibilities: {ex.description}")
     if ex.skills:
@@ -16,42 +16,52 @@ def synth_education_text(edu):
     years = f" ({edu.start_year}–{edu.end_year})" if (edu.start_year or edu.end_year) else ""
     return main + years
 
-def build_docs_from_profile(text, candidate_id, profile, pdf_path):
+def section_metadata(candidate_id, profile, pdf_path, section, **fields):
+    # Chroma metadata values must be str/int/float/bool, never None
+    metadata = {"candidate_id": candidate_id, "candidate_name": profile.full_name or "", "section": section,
+                "source_file": pdf_path}
+    metadata.update({k: v for k, v in fields.items() if v is not None})
+    return metadata
+
+def build_section_docs(candidate_id, profile, pdf_path):
+    """
+    One document per resume section, and one per experience/education entry,
+    for the section-level vector index (VECTOR_INDEX_MODE=sections).
+    """
     docs = []
-    # if profile.summary:
-    #     docs.append(Document(
-    #         page_content=profile.summary,
-    #         metadata={"candidate_id": candidate_id, "candidate_name": profile.full_name, "section": "summary", "source_file": pdf_path}
-    #     ))
-    # if profile.skills:
-    #     docs.append(Document(
-    #         page_content="Skills: " + ", ".join(profile.skills),
-    #         metadata={"candidate_id": candidate_id, "candidate_name": profile.full_name, "section": "skills", "skills": ", ".join(profile.skills), "source_file": pdf_path}
-    #     ))
-    # for ex in profile.experience:
-    #     docs.append(Document(
-    #         page_content=synth_experience_text(ex),
-    #         metadata={
-    #             "candidate_id": candidate_id, "candidate_name": profile.full_name, "section": "experience", "company": ex.company,
-    #             "title": ex.title, "start": ex.start, "end": ex.end, "source_file": pdf_path
-    #         }
-    #     ))
-    # for edu in profile.education:
-    #     docs.append(Document(
-    #         page_content=synth_education_text(edu),
-    #         metadata={
-    #             "candidate_id": candidate_id, "candidate_name": profile.full_name, "section": "education", "institution": edu.institution,
-    #             "degree": edu.degree, "field": edu.field, "start_year": edu.start_year,
-    #             "end_year": edu.end_year, "source_file": pdf_path
-    #         }
-    #     ))
-    # for cert in profile.certifications or []:
-    #     line = f"Certification: {cert.name}" + (f" ({cert.year})" if cert.year else "") + (f", issuer: {cert.issuer}" if cert.issuer else "")
-    #     docs.append(Document(
-    #         page_content=line,
-    #         metadata={"candidate_id": candidate_id, "candidate_name": profile.full_name, "section": "certifications", "name": cert.name, "source_file": pdf_path}
-    #     ))
+    if profile.summary:
+        docs.append(Document(
+            page_content=profile.summary,
+            metadata=section_metadata(candidate_id, profile, pdf_path, "summary", summary=profile.summary)
+        ))
+    if profile.skills:
+        docs.append(Document(
+            page_content="Skills: " + ", ".join(profile.skills),
+            metadata=section_metadata(candidate_id, profile, pdf_path, "skills", skills=", ".join(profile.skills))
+        ))
+    for i, ex in enumerate(profile.experience):
+        docs.append(Document(
+            page_content=synth_experience_text(ex),
+            metadata=section_metadata(candidate_id, profile, pdf_path, "experience", entry=i, company=ex.company,
+                                      title=ex.title, start=ex.start, end=ex.end)
+        ))
+    for i, edu in enumerate(profile.education):
+        docs.append(Document(
+            page_content=synth_education_text(edu),
+            metadata=section_metadata(candidate_id, profile, pdf_path, "education", entry=i, institution=edu.institution,
+                                      degree=edu.degree, field=edu.field, start_year=edu.start_year,
+                                      end_year=edu.end_year)
+        ))
+    for i, cert in enumerate(profile.certifications or []):
+        line = f"Certification: {cert.name}" + (f" ({cert.year})" if cert.year else "") + (f", issuer: {cert.issuer}" if cert.issuer else "")
+        docs.append(Document(
+            page_content=line,
+            metadata=section_metadata(candidate_id, profile, pdf_path, "certifications", entry=i, name=cert.name)
+        ))
+    return docs
 
+def build_docs_from_profile(text, candidate_id, profile, pdf_path):
+    docs = []
     # Create metadata with simple types only (Chroma requirement)
     metadata = {
         "candidate_id": candidate_id, 
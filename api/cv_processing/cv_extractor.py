@@ -1,9 +1,10 @@
 import os
-from typing import List, Optional, Literal
+from typing import List, Optional, Literal, Tuple
 from dotenv import load_dotenv
 from typing import List, Optional, Literal
 from pydantic import BaseModel, ConfigDict
 from model.CandidateProfile import (EducationItem, ExperienceItem, LinkItem, CertificationItem, CandidateProfile)
+from cv_processing.template_parser import TEMPLATE_FAST_PATH, parse_template_profile
 
 
 
@@ -88,4 +89,18 @@ def extract_structured_profile_from_text(resume_text: str) -> CandidateProfile:
     return result
 
 
-
+def extract_profile_from_layout(layout: dict) -> Tuple[CandidateProfile, str]:
+    """
+    Profile from a parsed PDF (pdf_parser.extract_pdf_layout). Resumes rendered
+    from our own templates are read deterministically; unknown layouts go to
+    the LLM. Returns (profile, extractor) with extractor "template" or "llm".
+    """
+    if TEMPLATE_FAST_PATH:
+        try:
+            profile = parse_template_profile(layout)
+        except Exception as e:
+            print(f"Template parser failed, falling back to LLM: {e}")
+            profile = None
+        if profile is not None:
+            return profile, "template"
+    return extract_structured_profile_from_text(layout["text"]), "llm"
@@ -1,17 +1,26 @@
 import os
-import glob
 import asyncio
-from typing import List
+from typing import List, Optional
 from pathlib import Path
-from pdf_parser import extract_pdf_text
-from cv_extractor import extract_structured_profile_from_text
-from db.sql_store import store_profile
-from cv_chunker import build_docs_from_profile
-from db.chroma_store import store
+from cv_processing.parse_service import get_pdf_parser
+from cv_extractor import extract_profile_from_layout
+from db.sql_store import init_db
+from db.sql_writer import get_writer
+from db.vector_writer import get_vector_writer
+from cv_chunker import build_docs_from_profile, build_section_docs
+from db.chroma_store import vector_store, SECTION_INDEX
+from cv_processing.ingest_manifest import record_ingested
+from cv_processing.ingest_jobs import create_job, run_job
+from cv_processing.ingest_pipeline import EXTRACT_CONCURRENCY
 
 
-async def process_single_resume(pdf_path: str, db_path: str) -> str:
-    """Process a single resume file and return the candidate ID."""
+async def process_single_resume(pdf_path: str, db_path: str, task: Optional[dict] = None) -> str:
+    """
+    Process a single resume file and return the candidate ID. `task` comes
+    from the ingestion manifest: a changed file updates the candidate it was
+    ingested as, and the file is recorded once it is fully stored.
+    """
+    existing_id = task.get("candidate_id") if task else None
     try:
         print(f"Processing: {os.path.basename(pdf_path)}")
         
@@ -19,22 +28,32 @@ async def process_single_resume(pdf_path: str, db_path: str) -> str:
         absolute_path = Path(pdf_path).resolve()
         source_file_uri = f"file://{absolute_path}"
         
-        # Extract text from PDF
-        text = await asyncio.to_thread(extract_pdf_text, pdf_path)
+        # Extract text and positioned lines from PDF (process pool, cached by file hash)
+        layout = await get_pdf_parser().parse(pdf_path, sha256=task.get("sha256") if task else None)
+        text = layout["text"]
         
-        # Extract structured profile using LLM
-        profile = await asyncio.to_thread(extract_structured_profile_from_text, text)
+        # Extract structured profile (template fast path, LLM for other layouts)
+        profile, extractor = await asyncio.to_thread(extract_profile_from_layout, layout)
         
-        # Store profile in database with file:// URI
-        candidate_id = await asyncio.to_thread(store_profile, db_path, profile, source_file=source_file_uri)
+        # Store profile through the shared writer thread (batched with concurrent resumes)
+        writer = await asyncio.to_thread(get_writer, db_path)
+        candidate_id = await asyncio.wrap_future(writer.submit(profile, source_file=source_file_uri,
+                                                               candidate_id=existing_id, resume_text=text,
+                                                               in_flight=task is not None))
         
-        # Build documents for vector store
-        docs = await asyncio.to_thread(build_docs_from_profile, text, candidate_id, profile, pdf_path=source_file_uri)
+        # Build documents for vector store (whole resume, or one per section)
+        if SECTION_INDEX:
+            docs = await asyncio.to_thread(build_section_docs, candidate_id, profile, pdf_path=source_file_uri)
+        else:
+            docs = await asyncio.to_thread(build_docs_from_profile, text, candidate_id, profile, pdf_path=source_file_uri)
         
-        # Add to vector store
-        await asyncio.to_thread(store.add_documents, docs)
+        # Add to vector store (replacing the candidate's old documents on re-ingest), batched with other resumes
+        await asyncio.wrap_future(get_vector_writer(vector_store).submit(docs, replace_candidate_id=existing_id))
+
+        if task:
+            await asyncio.wrap_future(writer.call(record_ingested, task, candidate_id))
         
-        print(f"Successfully processed: {os.path.basename(pdf_path)} (ID: {candidate_id})")
+        print(f"Successfully processed: {os.path.basename(pdf_path)} (ID: {candidate_id}, extractor: {extractor})")
         return candidate_id
         
     except Exception as e:
@@ -42,36 +61,27 @@ async def process_single_resume(pdf_path: str, db_path: str) -> str:
         raise
 
 
-async def process_all_resumes(pdf_folder: str = "./data/pdf", db_path: str = "./data/candidates.db", max_concurrent: int = 5) -> List[str]:
-    processed_candidates = []
-    
-    # Get all PDF files in the folder
-    pdf_pattern = os.path.join(pdf_folder, "*.pdf")
-    pdf_files = glob.glob(pdf_pattern)
-    
-    print(f"Found {len(pdf_files)} PDF files to process...")
-    
-    # Create semaphore to limit concurrent operations
-    semaphore = asyncio.Semaphore(max_concurrent)
-    
-    async def process_with_semaphore(pdf_path: str) -> str:
-        async with semaphore:
-            return await process_single_resume(pdf_path, db_path)
-    
-    # Create tasks for all PDF files
-    tasks = [process_with_semaphore(pdf_path) for pdf_path in pdf_files]
-    
-    # Process tasks and collect results
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Filter successful results
-    for result in results:
-        if isinstance(result, str):  # Successful candidate ID
-            processed_candidates.append(result)
-        elif isinstance(result, Exception):
-            # Exception was already logged in process_single_resume
-            continue
-    
+async def process_all_resumes(pdf_folder: str = "./data/pdf", db_path: str = "./data/candidates.db",
+                              max_concurrent: Optional[int] = None, job_name: Optional[str] = None) -> List[str]:
+    """
+    Ingest every new or changed PDF in pdf_folder as an ingestion job
+    (ingest_jobs): the staged pipeline with a per-file journal, so an
+    interrupted run can be resumed with `python -m cv_processing.ingest_jobs
+    resume <job_id>`. max_concurrent, if given, caps the LLM extractions in
+    flight; the other stages use their own settings.
+    """
+    def create():
+        con = init_db(db_path)
+        try:
+            return create_job(con, pdf_folder, job_name)
+        finally:
+            con.close()
+    job_id = await asyncio.to_thread(create)
+    print(f"Ingestion job {job_id} for {pdf_folder}")
+
+    # Files the manifest says are already ingested and unchanged are skipped
+    processed_candidates = await run_job(job_id, db_path, store=vector_store, sections=SECTION_INDEX,
+                                         extract_concurrency=max_concurrent or EXTRACT_CONCURRENCY)
     print(f"Completed processing {len(processed_candidates)} resumes successfully.")
     return processed_candidates
 
@@ -0,0 +1,291 @@
+"""
+Named, resumable ingestion jobs.
+
+A job is a run over a PDF folder with a durable per-file journal
+(ingest_jobs / ingest_job_files). The pipeline reports every file's
+progress -- parsed, extracted, stored, embedded, or failed with the stage
+and error -- and the journal is flushed through the SQLite writer every
+JOURNAL_FLUSH_SECONDS. A killed job resumes with the files it had not
+finished: extracted profiles are reused instead of calling the LLM again,
+and stored files keep their candidate id. Failed files are only retried
+on request.
+
+Usage (from the api folder):
+    python -m cv_processing.ingest_jobs run [--folder ./data/pdf] [--name nightly]
+    python -m cv_processing.ingest_jobs resume <job_id> [--retry-failed]
+    python -m cv_processing.ingest_jobs status [<job_id>]
+"""
+import os
+import glob
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from typing import List, Optional
+from db.sql_store import init_db, _ph, SQL_MAX_VARIABLES
+from db.sql_writer import get_writer
+from model.CandidateProfile import CandidateProfile
+from cv_processing.ingest_manifest import INGEST_PIPELINE_VERSION, manifest_path, plan_ingestion
+
+JOURNAL_FLUSH_SECONDS = float(os.getenv("JOURNAL_FLUSH_SECONDS", "1"))
+# A running job whose heartbeat is older than this was killed
+STALE_JOB_SECONDS = float(os.getenv("STALE_JOB_SECONDS", "30"))
+FAILURES_SHOWN = 20
+
+FILE_STATES = ("pending", "parsed", "extracted", "stored", "embedded", "failed")
+UNFINISHED_STATES = ("pending", "parsed", "extracted", "stored")
+
+
+class JobJournal:
+    """
+    Buffers per-file progress from the pipeline; flush() applies it on the
+    SQLite writer thread. Identical copies (the task's aliases) share the
+    file's progress, since they are recorded together with it.
+    """
+    def __init__(self, job_id: str, writer):
+        self.job_id = job_id
+        self.writer = writer
+        self._marks = []
+
+    def mark(self, task: dict, state: str, stage: Optional[str] = None, error: Optional[str] = None,
+             candidate_id: Optional[str] = None, profile: Optional[CandidateProfile] = None):
+        profile_json = profile.model_dump_json() if profile is not None else None
+        now = time.time()
+        for path in [task["manifest_path"]] + [a[0] for a in task.get("aliases") or []]:
+            self._marks.append((state, stage, error, candidate_id, profile_json, task.get("sha256"), now,
+                                self.job_id, path))
+
+    async def flush(self):
+        marks, self._marks = self._marks, []
+        await asyncio.wrap_future(self.writer.call(apply_marks, self.job_id, marks, time.time()))
+
+    async def run(self, interval: float = JOURNAL_FLUSH_SECONDS):
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+
+def apply_marks(con, job_id: str, marks: list, heartbeat: float):
+    with con:
+        con.executemany("""
+          UPDATE ingest_job_files SET state=?, stage=?, error=?,
+            candidate_id=COALESCE(?, candidate_id), profile_json=COALESCE(?, profile_json),
+            sha256=COALESCE(?, sha256), updated_at=?
+          WHERE job_id=? AND path=?
+        """, marks)
+        con.execute("UPDATE ingest_jobs SET heartbeat_at=? WHERE id=?", (heartbeat, job_id))
+
+
+# ---- Job lifecycle ----
+
+def create_job(con, pdf_folder: str, name: Optional[str] = None) -> str:
+    paths = sorted(dict.fromkeys(manifest_path(p) for p in glob.glob(os.path.join(pdf_folder, "*.pdf"))))
+    job_id = str(uuid.uuid4())
+    now = time.time()
+    with con:
+        con.execute("INSERT INTO ingest_jobs(id, name, pdf_folder, status, total, created_at) VALUES (?,?,?,?,?,?)",
+                    (job_id, name, os.path.abspath(pdf_folder), "created", len(paths), now))
+        con.executemany("INSERT INTO ingest_job_files(job_id, path, updated_at) VALUES (?,?,?)",
+                        [(job_id, p, now) for p in paths])
+    return job_id
+
+
+def _mark_ingested(con, job_id: str, paths: List[str], version: str):
+    """
+    Mark files plan_ingestion skipped as done, with the manifest's candidate id.
+    Only for paths the plan checked against the manifest: the path alone says
+    nothing about the content.
+    """
+    now = time.time()
+    for i in range(0, len(paths), SQL_MAX_VARIABLES):
+        chunk = paths[i:i + SQL_MAX_VARIABLES]
+        con.execute(f"""
+          UPDATE ingest_job_files SET state='embedded', stage=NULL, error=NULL, updated_at=?,
+            candidate_id=(SELECT m.candidate_id FROM ingest_manifest m WHERE m.path=ingest_job_files.path),
+            sha256=(SELECT m.sha256 FROM ingest_manifest m WHERE m.path=ingest_job_files.path)
+          WHERE job_id=? AND path IN ({_ph(len(chunk))})
+            AND path IN (SELECT path FROM ingest_manifest WHERE pipeline_version=?)
+        """, [now, job_id, *chunk, version])
+
+
+def prepare_run(con, job_id: str, retry_failed: bool = False, version: str = INGEST_PIPELINE_VERSION) -> List[dict]:
+    """
+    Pipeline tasks for the job's unfinished files (or only its failed ones with
+    retry_failed), resuming journaled progress, and mark the job running.
+    Raises KeyError for an unknown job and RuntimeError if it is already running.
+    """
+    job = con.execute("SELECT status, heartbeat_at FROM ingest_jobs WHERE id=?", (job_id,)).fetchone()
+    if job is None:
+        raise KeyError(job_id)
+    if job[0] == "running" and job[1] and time.time() - job[1] < STALE_JOB_SECONDS:
+        raise RuntimeError(f"Job {job_id} is already running")
+    states = ("failed",) if retry_failed else UNFINISHED_STATES
+    rows = {r[0]: r[1:] for r in con.execute(
+        f"SELECT path, state, candidate_id, profile_json, sha256 FROM ingest_job_files "
+        f"WHERE job_id=? AND state IN ({_ph(len(states))})", (job_id, *states))}
+    existing = [p for p in rows if os.path.exists(p)]
+    missing = [p for p in rows if not os.path.exists(p)]
+
+    plan = plan_ingestion(con, existing, version)
+    todo = plan["todo"]
+    queued = {t["manifest_path"] for t in todo} | {a[0] for t in todo for a in t["aliases"]}
+    now = time.time()
+    with con:
+        # Skipped by the manifest: ingested by an earlier run or another job
+        _mark_ingested(con, job_id, [p for p in existing if p not in queued], version)
+        con.executemany("UPDATE ingest_job_files SET state='failed', stage='plan', error=?, updated_at=? "
+                        "WHERE job_id=? AND path=?",
+                        [("FileNotFoundError: file no longer exists", now, job_id, p) for p in missing])
+        for task in todo:
+            state, candidate_id, profile_json, sha = rows[task["manifest_path"]]
+            # Journaled progress only applies to the same content
+            if sha == task["sha256"] and state in ("extracted", "stored") and profile_json:
+                task["profile"] = CandidateProfile.model_validate_json(profile_json)
+            if sha == task["sha256"] and candidate_id and not task["candidate_id"]:
+                task["candidate_id"] = candidate_id
+        con.executemany("UPDATE ingest_job_files SET attempts=attempts+1, state=CASE WHEN state='failed' "
+                        "THEN 'pending' ELSE state END, stage=NULL, error=NULL WHERE job_id=? AND path=?",
+                        [(job_id, t["manifest_path"]) for t in todo])
+        done = con.execute("SELECT COUNT(*) FROM ingest_job_files WHERE job_id=? AND state='embedded'",
+                           (job_id,)).fetchone()[0]
+        con.execute("UPDATE ingest_jobs SET status='running', run_started_at=?, run_done_at_start=?, heartbeat_at=?, "
+                    "finished_at=NULL, error=NULL WHERE id=?", (now, done, now, job_id))
+    return todo
+
+
+def finish_run(con, job_id: str, status: str, error: Optional[str] = None):
+    with con:
+        con.execute("UPDATE ingest_jobs SET status=?, error=?, finished_at=?, heartbeat_at=? WHERE id=?",
+                    (status, error, time.time(), time.time(), job_id))
+
+
+async def run_job(job_id: str, db_path: str, retry_failed: bool = False, **pipeline_kwargs) -> List[str]:
+    """
+    Run (or resume) a job through the staged pipeline and backfill summaries
+    for what it stored. Returns the candidate ids ingested by this run.
+    """
+    from cv_processing.ingest_pipeline import run_pipeline
+
+    def prepare():
+        # Hashing the folder can take a while; keep it off the shared writer thread
+        con = init_db(db_path)
+        try:
+            return prepare_run(con, job_id, retry_failed)
+        finally:
+            con.close()
+    tasks = await asyncio.to_thread(prepare)
+    sql = await asyncio.to_thread(get_writer, db_path)
+    print(f"Job {job_id}: {len(tasks)} files to process" + (" (retrying failures)" if retry_failed else ""))
+    journal = JobJournal(job_id, sql)
+    flusher = asyncio.create_task(journal.run())
+    candidate_ids: List[str] = []
+    status, error = "completed", None
+    try:
+        if tasks:
+            result = await run_pipeline(tasks, db_path, journal=journal, **pipeline_kwargs)
+            candidate_ids = result["candidate_ids"]
+            print(f"Extractors: {result['extractors']['template']} template, {result['extractors']['llm']} LLM, "
+                  f"{result['extractors']['journal']} from the journal")
+    except asyncio.CancelledError:
+        status = "interrupted"
+        raise
+    except Exception as e:
+        status, error = "failed", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        flusher.cancel()
+        await journal.flush()
+        await asyncio.wrap_future(sql.call(finish_run, job_id, status, error))
+
+    from query_processing.candidate_summaries import PRECOMPUTED_SUMMARIES, backfill_summaries
+    if PRECOMPUTED_SUMMARIES and candidate_ids:
+        await asyncio.to_thread(backfill_summaries, db_path, candidate_ids)
+    return candidate_ids
+
+
+# ---- Status ----
+
+def _progress(row, counts: dict, now: float) -> dict:
+    job_id, name, folder, status, total, created, started, done_at_start, heartbeat, finished, error = row
+    if status == "running" and (heartbeat is None or now - heartbeat > STALE_JOB_SECONDS):
+        status = "interrupted"
+    done, failed = counts.get("embedded", 0), counts.get("failed", 0)
+    remaining = max(0, total - done - failed)
+    elapsed = ((finished or now) - started) if started else 0.0
+    rate = (done - done_at_start) / elapsed if elapsed > 0 else 0.0
+    return {
+        "id": job_id, "name": name, "pdf_folder": folder, "status": status, "error": error,
+        "total": total, "done": done, "failed": failed, "remaining": remaining,
+        "percent": round(100.0 * done / total, 1) if total else 100.0,
+        "states": {s: counts.get(s, 0) for s in FILE_STATES},
+        "files_per_second": round(rate, 2),
+        "eta_seconds": round(remaining / rate) if status == "running" and rate > 0 else None,
+        "created_at": created, "run_started_at": started, "finished_at": finished,
+        "elapsed_seconds": round(elapsed, 1),
+    }
+
+
+_JOB_COLUMNS = ("id, name, pdf_folder, status, total, created_at, run_started_at, run_done_at_start, "
+                "heartbeat_at, finished_at, error")
+
+
+def job_status(con, job_id: str, failures: int = FAILURES_SHOWN) -> Optional[dict]:
+    row = con.execute(f"SELECT {_JOB_COLUMNS} FROM ingest_jobs WHERE id=?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    counts = dict(con.execute("SELECT state, COUNT(*) FROM ingest_job_files WHERE job_id=? GROUP BY state", (job_id,)))
+    status = _progress(row, counts, time.time())
+    status["failures"] = [
+        {"path": p, "stage": stage, "error": err, "attempts": attempts}
+        for p, stage, err, attempts in con.execute(
+            "SELECT path, stage, error, attempts FROM ingest_job_files WHERE job_id=? AND state='failed' "
+            "ORDER BY updated_at DESC LIMIT ?", (job_id, failures))]
+    return status
+
+
+def list_jobs(con, limit: int = 50) -> List[dict]:
+    rows = con.execute(f"SELECT {_JOB_COLUMNS} FROM ingest_jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+    counts = {}
+    if rows:
+        ids = [r[0] for r in rows]
+        for job_id, state, n in con.execute(
+                f"SELECT job_id, state, COUNT(*) FROM ingest_job_files WHERE job_id IN ({_ph(len(ids))}) "
+                f"GROUP BY job_id, state", ids):
+            counts.setdefault(job_id, {})[state] = n
+    now = time.time()
+    return [_progress(r, counts.get(r[0], {}), now) for r in rows]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="./data/candidates.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="create a job for a folder and run it")
+    run.add_argument("--folder", default="./data/pdf")
+    run.add_argument("--name", default=None)
+    resume = sub.add_parser("resume", help="continue a job (or retry its failures)")
+    resume.add_argument("job_id")
+    resume.add_argument("--retry-failed", action="store_true")
+    status = sub.add_parser("status", help="progress of one job, or the recent jobs")
+    status.add_argument("job_id", nargs="?")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        con = init_db(args.db)
+        try:
+            result = job_status(con, args.job_id) if args.job_id else list_jobs(con)
+        finally:
+            con.close()
+        print(json.dumps(result, indent=2))
+    else:
+        if args.command == "run":
+            con = init_db(args.db)
+            try:
+                job = create_job(con, args.folder, args.name)
+            finally:
+                con.close()
+            print(f"Created job {job}")
+        else:
+            job = args.job_id
+        asyncio.run(run_job(job, args.db, retry_failed=getattr(args, "retry_failed", False)))
@@ -0,0 +1,103 @@
+"""
+Which resume files an ingestion run has to (re)process.
+
+Every ingested file is recorded in the ingest_manifest table with its size,
+mtime, SHA-256, candidate id and the pipeline version that produced it. On the
+next run a file is skipped if its size and mtime are unchanged (no read at
+all), or if its content hash is unchanged (touched/copied files). A changed
+file is re-processed into the candidate it was ingested as, so rows and
+vectors are replaced instead of duplicated.
+"""
+import os
+import hashlib
+from pathlib import Path
+from typing import List
+from db.sql_store import init_db, manifest_entries, manifest_by_hash, upsert_manifest
+
+# Bump when parsing/extraction/chunking changes so every file is re-ingested
+INGEST_PIPELINE_VERSION = os.getenv("INGEST_PIPELINE_VERSION", "1")
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_BYTES), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def manifest_path(path: str) -> str:
+    return str(Path(path).resolve())
+
+
+def plan_ingestion(con, pdf_files: List[str], version: str = INGEST_PIPELINE_VERSION) -> dict:
+    """
+    Split pdf_files into work and skips. Returns {"todo": [task], "skipped": n,
+    "unchanged_content": n, "new": n, "changed": n} where a task is a dict with
+    path, size, mtime, sha256 and the candidate_id to update (None for new files).
+    Files whose content matches another manifest entry are recorded against
+    that candidate without processing; identical files in one run (new ones,
+    or copies of one candidate after a version bump) become a single task
+    with the others as its aliases.
+    """
+    known = manifest_entries(con)
+    plan = {"todo": [], "skipped": 0, "unchanged_content": 0, "new": 0, "changed": 0}
+    new_by_hash = {}
+    changed_by_key = {}     # (candidate_id, sha256) -> task
+    for pdf_path in pdf_files:
+        path = manifest_path(pdf_path)
+        st = os.stat(path)
+        entry = known.get(path)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime and entry[4] == version:
+            plan["skipped"] += 1
+            continue
+        sha = file_sha256(path)
+        if entry and entry[2] == sha and entry[4] == version:
+            # Touched but identical; remember the new mtime so the next run skips the read
+            upsert_manifest(con, path, st.st_size, st.st_mtime, sha, entry[3], version)
+            plan["unchanged_content"] += 1
+            continue
+        if not entry:
+            same = manifest_by_hash(con, sha, version)
+            if same:
+                # Renamed or copied resume: same candidate, nothing to extract
+                upsert_manifest(con, path, st.st_size, st.st_mtime, sha, same, version)
+                plan["unchanged_content"] += 1
+                continue
+            if sha in new_by_hash:
+                # Identical new files in one run are extracted once
+                new_by_hash[sha]["aliases"].append((path, st.st_size, st.st_mtime))
+                plan["unchanged_content"] += 1
+                continue
+        elif (entry[3], sha) in changed_by_key:
+            # Copies of one candidate's resume, all stale after a version bump: re-ingest once
+            changed_by_key[(entry[3], sha)]["aliases"].append((path, st.st_size, st.st_mtime))
+            plan["unchanged_content"] += 1
+            continue
+        plan["new" if not entry else "changed"] += 1
+        task = {"path": pdf_path, "manifest_path": path, "size": st.st_size, "mtime": st.st_mtime,
+                "sha256": sha, "candidate_id": entry[3] if entry else None, "aliases": []}
+        if entry:
+            changed_by_key[(entry[3], sha)] = task
+        else:
+            new_by_hash[sha] = task
+        plan["todo"].append(task)
+    con.commit()
+    return plan
+
+
+def load_ingestion_plan(db_path: str, pdf_files: List[str], version: str = INGEST_PIPELINE_VERSION) -> dict:
+    con = init_db(db_path)
+    try:
+        return plan_ingestion(con, pdf_files, version)
+    finally:
+        con.close()
+
+
+def record_ingested(con, task: dict, candidate_id: str, version: str = INGEST_PIPELINE_VERSION):
+    with con:
+        con.execute("DELETE FROM ingest_in_flight WHERE candidate_id = ?", (candidate_id,))
+        upsert_manifest(con, task["manifest_path"], task["size"], task["mtime"], task["sha256"], candidate_id, version)
+        for path, size, mtime in task.get("aliases") or []:
+            upsert_manifest(con, path, size, mtime, task["sha256"], candidate_id, version)
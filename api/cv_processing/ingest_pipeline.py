@@ -0,0 +1,303 @@
+"""
+Staged ingestion pipeline: parse -> extract -> write -> embed -> record.
+
+Each stage has its own concurrency and the stages are connected by bounded
+asyncio queues, so a slow stage backs up the ones before it instead of
+piling work into memory:
+
+- parse: PyMuPDF layout extraction through the parse service (process pool
+  of PARSE_WORKERS, page-parallel for long PDFs, cached by file hash) and
+  the template fast path, in the same worker call.
+- extract: LLM extraction for layouts the template parser did not
+  recognise, EXTRACT_CONCURRENCY calls in flight.
+- write: batches of WRITE_BATCH handed to the shared SQLite writer thread
+  (db.sql_writer), which commits them with one executemany per table.
+- embed: chunking, then the shared vector writer (db.vector_writer), which
+  embeds documents from up to EMBED_IN_FLIGHT resumes in large batches.
+- record: manifest rows for fully stored files, batched on the writer thread.
+
+Every stage reports items done/failed, busy time, throughput and queue depth.
+An optional journal (ingest_jobs.JobJournal) is told each file's progress:
+parsed, extracted (with the profile), stored (with the candidate id),
+embedded once recorded, or failed with the stage and error.
+"""
+import os
+import time
+import asyncio
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from db.sql_writer import get_writer
+from db.vector_writer import get_vector_writer
+from cv_processing.parse_service import PdfParser, PARSE_WORKERS
+from cv_processing.template_parser import TEMPLATE_FAST_PATH, parse_template_profile
+from cv_processing.cv_chunker import build_docs_from_profile, build_section_docs
+from cv_processing.ingest_manifest import record_ingested
+
+EXTRACT_CONCURRENCY = int(os.getenv("EXTRACT_CONCURRENCY", "8"))
+EMBED_IN_FLIGHT = int(os.getenv("EMBED_IN_FLIGHT", "256"))        # resumes waiting for their embedding batch
+WRITE_BATCH = int(os.getenv("WRITE_BATCH", "50"))
+WRITE_MAX_WAIT = float(os.getenv("WRITE_MAX_WAIT", "0.2"))       # seconds a partial batch waits for more
+STAGE_QUEUE_SIZE = int(os.getenv("STAGE_QUEUE_SIZE", "64"))
+PIPELINE_REPORT_SECONDS = float(os.getenv("PIPELINE_REPORT_SECONDS", "5"))
+
+STAGES = ("parse", "extract", "write", "embed", "record")
+# Journal state reached when a stage finishes an item (embed is only final once recorded)
+STAGE_STATES = {"parse": "parsed", "extract": "extracted", "write": "stored", "record": "embedded"}
+_DONE = object()
+
+
+def template_profile(layout: dict, name: str = ""):
+    """Process-pool step: the profile when the template parser recognises the layout, else None."""
+    if not TEMPLATE_FAST_PATH:
+        return None
+    try:
+        return parse_template_profile(layout)
+    except Exception as e:
+        print(f"Template parser failed on {name}: {e}")
+        return None
+
+
+class StageStats:
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.done = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.max_queue = 0
+        self.queue: Optional[asyncio.Queue] = None
+
+    def observe_queue(self):
+        if self.queue is not None:
+            self.max_queue = max(self.max_queue, self.queue.qsize())
+
+    def snapshot(self, elapsed: float) -> dict:
+        return {
+            "workers": self.workers,
+            "done": self.done,
+            "failed": self.failed,
+            "per_second": round(self.done / elapsed, 2) if elapsed > 0 else 0.0,
+            "busy_seconds": round(self.busy, 2),
+            "queue": self.queue.qsize() if self.queue is not None else 0,
+            "max_queue": self.max_queue,
+        }
+
+
+def format_stats(stats: dict) -> str:
+    return " | ".join(f"{name} {s['done']} ({s['per_second']}/s, q={s['queue']}/{s['max_queue']})"
+                      for name, s in stats.items())
+
+
+def _source_uri(path: str) -> str:
+    return f"file://{Path(path).resolve()}"
+
+
+def _record_batch(con, items: List[dict]):
+    """Runs on the writer thread."""
+    for item in items:
+        # Tasks that did not come from the manifest plan (e.g. a bare {"path": ...}) are not recorded
+        if "manifest_path" in item["task"]:
+            record_ingested(con, item["task"], item["candidate_id"])
+
+
+async def run_pipeline(tasks: List[dict], db_path: str, store=None, sections: Optional[bool] = None,
+                       parse_workers: int = PARSE_WORKERS, extract_concurrency: int = EXTRACT_CONCURRENCY,
+                       embed_in_flight: int = EMBED_IN_FLIGHT, write_batch: int = WRITE_BATCH,
+                       queue_size: int = STAGE_QUEUE_SIZE, report_seconds: float = PIPELINE_REPORT_SECONDS,
+                       extract_fn=None, parser: Optional[PdfParser] = None, journal=None) -> dict:
+    """
+    Ingest manifest tasks (ingest_manifest.plan_ingestion) through the staged
+    pipeline. Returns {"candidate_ids", "extractors", "stages", "parser", "seconds"}.
+    A caller-supplied `parser` is used as is and left open. Tasks carrying a
+    "profile" (from a journal) skip extraction.
+    """
+    if store is None or sections is None:
+        from db.chroma_store import vector_store, SECTION_INDEX
+        store = vector_store if store is None else store
+        sections = SECTION_INDEX if sections is None else sections
+    if extract_fn is None:
+        from cv_processing.cv_extractor import extract_structured_profile_from_text as extract_fn
+
+    loop = asyncio.get_running_loop()
+    own_parser = parser is None
+    parser = PdfParser(workers=parse_workers) if own_parser else parser
+    llm_pool = ThreadPoolExecutor(max_workers=max(1, extract_concurrency), thread_name_prefix="extract")
+    sql = await asyncio.to_thread(get_writer, db_path)
+    vectors = get_vector_writer(store)
+
+    stats = {name: StageStats(name, n) for name, n in zip(
+        STAGES, (parse_workers, extract_concurrency, 1, embed_in_flight, 1))}
+    queues = {name: asyncio.Queue(maxsize=queue_size) for name in STAGES}
+    for name in STAGES:
+        stats[name].queue = queues[name]
+    extractors = {"template": 0, "llm": 0, "journal": 0}
+    candidate_ids: List[str] = []
+
+    def mark_done(name: str, item: dict):
+        if journal is not None and name in STAGE_STATES:
+            journal.mark(item["task"], STAGE_STATES[name], profile=item.get("profile") if name == "extract" else None,
+                         candidate_id=item.get("candidate_id"))
+
+    def mark_failed(name: str, item: dict, error: Exception):
+        stats[name].failed += 1
+        print(f"[{name}] {os.path.basename(item['task']['path'])} failed: {error}")
+        if journal is not None:
+            journal.mark(item["task"], "failed", stage=name, error=f"{type(error).__name__}: {error}")
+
+    async def workers(name: str, n: int, handle, downstream: Optional[str]):
+        """n workers taking items from queues[name], passing handle(item) on to downstream."""
+        async def worker():
+            while True:
+                item = await queues[name].get()
+                if item is _DONE:
+                    return
+                stats[name].observe_queue()
+                t = time.perf_counter()
+                try:
+                    out = await handle(item)
+                    stats[name].done += 1
+                    mark_done(name, item)
+                except Exception as e:
+                    mark_failed(name, item, e)
+                    continue
+                finally:
+                    stats[name].busy += time.perf_counter() - t
+                if downstream and out is not None:
+                    await queues[downstream].put(out)
+        await asyncio.gather(*(worker() for _ in range(n)))
+        if downstream:
+            await close(downstream)
+
+    async def close(name: str):
+        for _ in range(stats[name].workers):
+            await queues[name].put(_DONE)
+
+    async def parse(item):
+        task = item["task"]
+        # Layout, cache and template parse in one worker call: only text and profile come back
+        journaled = task.get("profile") is not None
+        parsed = await parser.parse_text(task["path"], sha256=task.get("sha256"),
+                                         analyze=None if journaled else template_profile,
+                                         name=os.path.basename(task["path"]))
+        item["text"], item["profile"] = parsed["text"], parsed["result"]
+        return item
+
+    async def extract(item):
+        if item["task"].get("profile") is not None:
+            item["profile"] = item["task"]["profile"]
+            extractors["journal"] += 1
+        elif item["profile"] is not None:
+            extractors["template"] += 1
+        else:
+            item["profile"] = await loop.run_in_executor(llm_pool, extract_fn, item["text"])
+            extractors["llm"] += 1
+        return item
+
+    async def writer():
+        # Single writer: drain up to write_batch items, waiting briefly for a partial batch to fill
+        q, st = queues["write"], stats["write"]
+        finished = False
+        while not finished:
+            item = await q.get()
+            if item is _DONE:
+                break
+            batch = [item]
+            deadline = loop.time() + WRITE_MAX_WAIT
+            while len(batch) < write_batch:
+                try:
+                    nxt = await asyncio.wait_for(q.get(), timeout=max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if nxt is _DONE:
+                    finished = True
+                    break
+                batch.append(nxt)
+            st.observe_queue()
+            t = time.perf_counter()
+            # Files that will get a manifest row are in flight until recorded (see _record_batch)
+            futures = [sql.submit(it["profile"], _source_uri(it["task"]["path"]), it["task"].get("candidate_id"),
+                                  it["text"], in_flight="manifest_path" in it["task"]) for it in batch]
+            try:
+                results = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures), return_exceptions=True)
+            finally:
+                st.busy += time.perf_counter() - t
+            for it, cid in zip(batch, results):
+                if isinstance(cid, Exception):
+                    mark_failed("write", it, cid)
+                    continue
+                st.done += 1
+                it["candidate_id"] = cid
+                mark_done("write", it)
+                await queues["embed"].put(it)
+        await close("embed")
+
+    async def embed(item):
+        cid, uri = item["candidate_id"], _source_uri(item["task"]["path"])
+        if sections:
+            docs = build_section_docs(cid, item["profile"], pdf_path=uri)
+        else:
+            docs = build_docs_from_profile(item["text"], cid, item["profile"], pdf_path=uri)
+        await asyncio.wrap_future(vectors.submit(docs, replace_candidate_id=item["task"].get("candidate_id")))
+        return item
+
+    async def recorder():
+        q, st = queues["record"], stats["record"]
+        done = False
+        while not done:
+            batch = [await q.get()]
+            while not q.empty() and len(batch) < write_batch:
+                batch.append(q.get_nowait())
+            done = any(it is _DONE for it in batch)
+            batch = [it for it in batch if it is not _DONE]
+            if not batch:
+                continue
+            st.observe_queue()
+            t = time.perf_counter()
+            try:
+                await asyncio.wrap_future(sql.call(_record_batch, batch))
+                st.done += len(batch)
+                candidate_ids.extend(it["candidate_id"] for it in batch)
+                for it in batch:
+                    mark_done("record", it)
+            except Exception as e:
+                for it in batch:
+                    mark_failed("record", it, e)
+            finally:
+                st.busy += time.perf_counter() - t
+
+    async def feed():
+        for task in tasks:
+            await queues["parse"].put({"task": task})
+        await close("parse")
+
+    t0 = time.perf_counter()
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(report_seconds)
+            elapsed = time.perf_counter() - t0
+            print(f"[pipeline {elapsed:.0f}s] " + format_stats({n: s.snapshot(elapsed) for n, s in stats.items()}))
+
+    report_task = asyncio.create_task(reporter()) if report_seconds > 0 else None
+    try:
+        await asyncio.gather(
+            feed(),
+            workers("parse", parse_workers, parse, "extract"),
+            workers("extract", extract_concurrency, extract, "write"),
+            writer(),
+            workers("embed", embed_in_flight, embed, "record"),
+            recorder(),
+        )
+    finally:
+        if report_task:
+            report_task.cancel()
+        if own_parser:
+            parser.close()
+        llm_pool.shutdown(wait=True)
+
+    elapsed = time.perf_counter() - t0
+    stage_stats = {n: s.snapshot(elapsed) for n, s in stats.items()}
+    print(f"[pipeline done {elapsed:.1f}s] " + format_stats(stage_stats))
+    return {"candidate_ids": candidate_ids, "extractors": extractors, "stages": stage_stats,
+            "parser": parser.stats(), "seconds": round(elapsed, 2)}
@@ -0,0 +1,213 @@
+"""
+Bulk-load the structured CVs written by cv_generation/cv_generator.py
+(data/json/<id>.json) straight into SQLite and Chroma, without rendering,
+parsing or LLM-extracting the PDFs. The JSON is the ground truth the PDFs
+were rendered from, so this is also the corpus for large-scale load tests.
+
+Profiles are written in batched transactions (one executemany per table)
+and embedded in large batches on a small thread pool while the next batch
+is written. Candidate ids are the CV ids, so re-running replaces rows
+instead of duplicating them.
+
+Usage (from the api folder):
+    python -m cv_processing.json_loader [--json-dir ./data/json] [--batch 1000] [--skip-vectors]
+"""
+import os
+import glob
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+from model.CandidateProfile import CandidateProfile, EducationItem, ExperienceItem, LinkItem
+from db.sql_store import init_db, store_profiles_bulk
+from cv_processing.cv_chunker import build_docs_from_profile, build_section_docs
+from cv_processing.template_parser import certification_item
+
+JSON_LOAD_BATCH = int(os.getenv("JSON_LOAD_BATCH", "1000"))   # candidates per SQLite transaction
+EMBED_BATCH = int(os.getenv("EMBED_BATCH", "500"))            # documents per embeddings request
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "4"))
+
+
+def _int(v) -> Optional[int]:
+    try:
+        return int(v) if v not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _str(v) -> Optional[str]:
+    return str(v).strip() or None if v not in (None, "null") else None
+
+
+def cv_json_to_profile(cv: dict) -> CandidateProfile:
+    """Map the generator's schema (cv_generator.make_cv_schema) onto CandidateProfile."""
+    links = []
+    for kind, url in (cv.get("public_profile") or {}).items():
+        if _str(url):
+            links.append(LinkItem(type=kind if kind in ("linkedin", "github", "portfolio") else "other", url=url))
+    experience = [
+        ExperienceItem(
+            company=_str(job.get("company")) or "",
+            title=_str(job.get("title")),
+            start=_str(job.get("start_date")),
+            end=_str(job.get("end_date")),
+            description=_str(job.get("summary")),
+            highlights=[h for h in job.get("highlights") or [] if h] or None,
+        )
+        for job in cv.get("experience") or [] if _str(job.get("company"))
+    ]
+    education = [
+        EducationItem(institution=e["institution"], degree=_str(e.get("degree")),
+                      start_year=_int(e.get("start_year")), end_year=_int(e.get("end_year")))
+        for e in cv.get("education") or [] if _str(e.get("institution"))
+    ]
+    certifications = [certification_item(c) for c in cv.get("certifications") or [] if isinstance(c, str) and c.strip()]
+    return CandidateProfile(
+        full_name=_str(cv.get("full_name")),
+        email=_str(cv.get("email")),
+        phone=_str(cv.get("phone")),
+        location=_str(cv.get("location")),
+        links=links,
+        summary=_str(cv.get("summary")),
+        skills=list(dict.fromkeys(s for s in cv.get("skills") or [] if s)),
+        education=education,
+        experience=experience,
+        certifications=certifications or None,
+    )
+
+
+def cv_json_text(cv: dict) -> str:
+    """Plain resume text in the templates' reading order (what extract_pdf_text returns for the PDF)."""
+    lines = [cv.get("full_name") or "", cv.get("title") or "",
+             " · ".join(x for x in (cv.get("location"), cv.get("email"), cv.get("phone")) if x),
+             cv.get("summary") or "", "Experience"]
+    for job in cv.get("experience") or []:
+        lines.append(f"{job.get('title') or ''} · {job.get('company') or ''}")
+        lines.append(f"{job.get('start_date') or ''} – {job.get('end_date') or 'Present'}")
+        lines.append(job.get("summary") or "")
+        lines.extend(f"• {h}" for h in job.get("highlights") or [])
+    lines += ["Skills", " ".join(cv.get("skills") or []), "Education"]
+    for e in cv.get("education") or []:
+        lines += [e.get("degree") or "", f"{e.get('institution') or ''} ({e.get('start_year')}–{e.get('end_year')})"]
+    if cv.get("languages"):
+        lines.append("Languages")
+        lines.extend(f"{l.get('language')} — {l.get('level')}" for l in cv["languages"] if isinstance(l, dict))
+    if cv.get("certifications"):
+        lines.append("Certifications")
+        lines.extend(f"• {c}" for c in cv["certifications"])
+    return "\n".join(l for l in lines if l)
+
+
+def source_file_for(cv: dict, json_path: str, pdf_dir: str) -> str:
+    """file:// URI of the rendered PDF (cv_generator's naming) if it exists, else of the JSON file."""
+    pdf = Path(pdf_dir) / f"{(cv.get('full_name') or '').replace(' ', '_')}.pdf"
+    path = pdf if cv.get("full_name") and pdf.is_file() else Path(json_path)
+    return f"file://{path.resolve()}"
+
+
+def read_cv_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            cv = json.load(fh)
+        return cv if isinstance(cv, dict) else None
+    except (OSError, ValueError) as e:
+        print(f"Skipping {os.path.basename(path)}: {e}")
+        return None
+
+
+def iter_batches(paths: List[str], pdf_dir: str, batch: int) -> Iterator[Tuple[list, int]]:
+    """([(candidate_id, profile, source_file, resume_text)], skipped) per batch of JSON files."""
+    for i in range(0, len(paths), batch):
+        rows, skipped = [], 0
+        for path in paths[i:i + batch]:
+            cv = read_cv_json(path)
+            if cv is None:
+                skipped += 1
+                continue
+            try:
+                profile = cv_json_to_profile(cv)
+            except ValueError as e:
+                print(f"Skipping {os.path.basename(path)}: {e}")
+                skipped += 1
+                continue
+            cid = str(cv.get("id") or Path(path).stem)
+            rows.append((cid, profile, source_file_for(cv, path, pdf_dir), cv_json_text(cv)))
+        yield rows, skipped
+
+
+def batch_docs(rows: list, sections: bool) -> list:
+    docs = []
+    for cid, profile, source_file, text in rows:
+        if sections:
+            docs.extend(build_section_docs(cid, profile, pdf_path=source_file))
+        else:
+            docs.extend(build_docs_from_profile(text, cid, profile, pdf_path=source_file))
+    return docs
+
+
+def index_batch(store, candidate_ids: List[str], docs: list, embed_batch: int = EMBED_BATCH) -> int:
+    # Drop the candidates' old documents so re-loading does not duplicate them
+    store.delete(where={"candidate_id": {"$in": candidate_ids}})
+    for i in range(0, len(docs), embed_batch):
+        store.add_documents(docs[i:i + embed_batch])
+    return len(docs)
+
+
+def bulk_load(json_dir: str = "./data/json", db_path: str = "./data/candidates.db", pdf_dir: str = "./data/pdf",
+              batch: int = JSON_LOAD_BATCH, limit: Optional[int] = None, skip_vectors: bool = False,
+              store=None, sections: Optional[bool] = None, embed_workers: int = EMBED_WORKERS) -> dict:
+    paths = sorted(glob.glob(os.path.join(json_dir, "*.json")))[:limit]
+    if not skip_vectors and (store is None or sections is None):
+        from db.chroma_store import vector_store, SECTION_INDEX
+        store = vector_store if store is None else store
+        sections = SECTION_INDEX if sections is None else sections
+    print(f"Found {len(paths)} JSON files in {json_dir}")
+
+    t0 = time.perf_counter()
+    loaded = skipped = documents = 0
+    sql_s = 0.0
+    con = init_db(db_path)
+    con.execute("PRAGMA synchronous=NORMAL")
+    skill_ids = {}
+    pool = None if skip_vectors else ThreadPoolExecutor(max_workers=max(1, embed_workers), thread_name_prefix="embed")
+    pending = []
+    try:
+        for rows, bad in iter_batches(paths, pdf_dir, batch):
+            skipped += bad
+            t = time.perf_counter()
+            loaded += store_profiles_bulk(con, rows, skill_ids)
+            sql_s += time.perf_counter() - t
+            if pool is not None and rows:
+                pending.append(pool.submit(index_batch, store, [r[0] for r in rows], batch_docs(rows, sections)))
+                # Bound the documents held in memory while embeddings catch up
+                while len(pending) > embed_workers * 2:
+                    documents += pending.pop(0).result()
+            print(f"Loaded {loaded}/{len(paths)} candidates ({loaded / (time.perf_counter() - t0):.0f}/s)")
+        for fut in pending:
+            documents += fut.result()
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+        con.close()
+
+    elapsed = time.perf_counter() - t0
+    print(f"Bulk load: {loaded} candidates, {documents} documents, {skipped} skipped in {elapsed:.1f}s "
+          f"(SQLite {sql_s:.1f}s)")
+    return {"files": len(paths), "loaded": loaded, "skipped": skipped, "documents": documents,
+            "sql_seconds": round(sql_s, 2), "seconds": round(elapsed, 2)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json-dir", default="./data/json")
+    parser.add_argument("--db", default="./data/candidates.db")
+    parser.add_argument("--pdf-dir", default="./data/pdf")
+    parser.add_argument("--batch", type=int, default=JSON_LOAD_BATCH)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=EMBED_WORKERS, help="concurrent embedding batches")
+    parser.add_argument("--skip-vectors", action="store_true", help="only load SQLite")
+    args = parser.parse_args()
+    bulk_load(args.json_dir, args.db, args.pdf_dir, batch=args.batch, limit=args.limit,
+              skip_vectors=args.skip_vectors, embed_workers=args.workers)
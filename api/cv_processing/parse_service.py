@@ -0,0 +1,201 @@
+"""
+PDF parsing off the event loop and out of the GIL.
+
+PdfParser runs pdf_parser.extract_pdf_layout in a process pool. PDFs with
+at least PAGE_SPLIT_MIN_PAGES pages are split into ranges of PAGES_PER_TASK
+pages parsed in parallel and merged. Every parsed layout is stored in an
+on-disk cache keyed by the file's SHA-256 and PARSER_VERSION, so re-runs and
+re-extractions (e.g. after an INGEST_PIPELINE_VERSION bump) never re-parse.
+
+parse returns the whole layout. parse_text is for callers that only need
+the text and something computed from the layout (the template profile):
+cache lookup, parsing, caching and that computation happen in one worker
+call, so the layout never crosses the process boundary.
+"""
+import os
+import gzip
+import json
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+from cv_processing.pdf_parser import extract_pdf_layout, merge_layouts, pdf_page_count
+from cv_processing.ingest_manifest import file_sha256
+
+# Bump when pdf_parser's output changes so cached layouts are not reused
+PARSER_VERSION = os.getenv("PARSER_VERSION", "1")
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", "data/parse_cache")   # empty disables the cache
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 2)))
+PAGE_SPLIT_MIN_PAGES = int(os.getenv("PAGE_SPLIT_MIN_PAGES", "8"))
+PAGES_PER_TASK = int(os.getenv("PAGES_PER_TASK", "4"))
+
+
+def _lower_priority(nice: int):
+    # Process-pool initializer: parse workers yield the CPU to the API process
+    if nice:
+        os.nice(nice)
+
+
+class ParseCache:
+    """Gzipped JSON layouts under <dir>/<sha[:2]>/<sha>.v<version>.json.gz."""
+    def __init__(self, cache_dir: str = PARSE_CACHE_DIR, version: str = PARSER_VERSION):
+        self.cache_dir = Path(cache_dir)
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, sha256: str) -> Path:
+        return self.cache_dir / sha256[:2] / f"{sha256}.v{self.version}.json.gz"
+
+    def get(self, sha256: str) -> Optional[dict]:
+        try:
+            with gzip.open(self._path(sha256), "rt", encoding="utf-8") as fh:
+                layout = json.load(fh)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        for line in layout["lines"]:
+            line["bbox"] = tuple(line["bbox"])
+        self.hits += 1
+        return layout
+
+    def put(self, sha256: str, layout: dict):
+        path = self._path(sha256)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial layout
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with gzip.open(os.fdopen(fd, "wb"), "wt", encoding="utf-8") as fh:
+                json.dump(layout, fh, ensure_ascii=False)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def _parse_in_worker(pdf_path: str, sha256: Optional[str], cache_dir: Optional[str], version: str,
+                     page_split: float, analyze: Optional[Callable], name: str) -> dict:
+    """
+    Process-pool step of PdfParser.parse_text. Returns {"text", "result",
+    "pages", "cached"}, or {"split": pages} for a PDF long enough to be
+    parsed page-parallel by the caller.
+    """
+    cache = ParseCache(cache_dir, version) if cache_dir and sha256 else None
+    layout = cache.get(sha256) if cache else None
+    cached, pages = layout is not None, 0
+    if not cached:
+        pages = pdf_page_count(pdf_path)
+        if pages >= page_split:
+            return {"split": pages}
+        layout = extract_pdf_layout(pdf_path)
+        if cache:
+            cache.put(sha256, layout)
+    return {"text": layout["text"], "result": analyze(layout, name) if analyze else None,
+            "pages": pages, "cached": cached}
+
+
+class PdfParser:
+    def __init__(self, workers: int = PARSE_WORKERS, cache_dir: Optional[str] = PARSE_CACHE_DIR,
+                 page_split: int = PAGE_SPLIT_MIN_PAGES, pages_per_task: int = PAGES_PER_TASK, nice: int = 0):
+        self.workers = max(1, workers)
+        self.cache = ParseCache(cache_dir) if cache_dir else None
+        self.page_split = page_split
+        self.pages_per_task = max(1, pages_per_task)
+        self.nice = nice
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pages = 0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_lower_priority,
+                                                 initargs=(self.nice,))
+            return self._pool
+
+    async def parse(self, pdf_path: str, sha256: Optional[str] = None) -> dict:
+        """Layout of pdf_path (as extract_pdf_layout), from the cache when the file was parsed before."""
+        if self.cache is not None:
+            sha256 = sha256 or await asyncio.to_thread(file_sha256, pdf_path)
+            cached = await asyncio.to_thread(self.cache.get, sha256)
+            if cached is not None:
+                return cached
+        pages = await asyncio.to_thread(pdf_page_count, pdf_path)
+        if pages >= self.page_split and self.workers > 1:
+            return await self._parse_split(pdf_path, pages, sha256)
+        layout = await asyncio.get_running_loop().run_in_executor(self.pool, extract_pdf_layout, pdf_path)
+        self.pages += pages
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.put, sha256, layout)
+        return layout
+
+    async def parse_text(self, pdf_path: str, sha256: Optional[str] = None, analyze: Optional[Callable] = None,
+                         name: str = "") -> dict:
+        """
+        {"text", "result"} for pdf_path, where result is analyze(layout, name)
+        (a picklable module-level function, run in the worker) or None.
+        """
+        if self.cache is not None:
+            sha256 = sha256 or await asyncio.to_thread(file_sha256, pdf_path)
+        loop = asyncio.get_running_loop()
+        page_split = self.page_split if self.workers > 1 else float("inf")
+        out = await loop.run_in_executor(
+            self.pool, _parse_in_worker, pdf_path, sha256, str(self.cache.cache_dir) if self.cache else None,
+            self.cache.version if self.cache else PARSER_VERSION, page_split, analyze, name)
+        if self.cache is not None:
+            if out.get("cached"):
+                self.cache.hits += 1
+            else:
+                self.cache.misses += 1
+        if "split" in out:
+            # Long PDF: its page ranges are parsed in parallel and merged here
+            layout = await self._parse_split(pdf_path, out["split"], sha256)
+            result = await loop.run_in_executor(self.pool, analyze, layout, name) if analyze else None
+            return {"text": layout["text"], "result": result}
+        self.pages += out["pages"]
+        return {"text": out["text"], "result": out["result"]}
+
+    async def _parse_split(self, pdf_path: str, pages: int, sha256: Optional[str]) -> dict:
+        loop = asyncio.get_running_loop()
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(self.pool, extract_pdf_layout, pdf_path, start, start + self.pages_per_task)
+            for start in range(0, pages, self.pages_per_task)))
+        layout = merge_layouts(list(parts))
+        self.pages += pages
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.put, sha256, layout)
+        return layout
+
+    def stats(self) -> dict:
+        return {"pages_parsed": self.pages, "cache_hits": self.cache.hits if self.cache else 0,
+                "cache_misses": self.cache.misses if self.cache else 0}
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+_parser: Optional[PdfParser] = None
+_parser_lock = threading.Lock()
+
+
+def get_pdf_parser() -> PdfParser:
+    """The process-wide parser (its pool starts on first parse)."""
+    global _parser
+    with _parser_lock:
+        if _parser is None:
+            _parser = PdfParser()
+        return _parser
+
+
+def close_pdf_parser():
+    global _parser
+    with _parser_lock:
+        if _parser is not None:
+            _parser.close()
+            _parser = None
@@ -1,4 +1,9 @@
 import fitz
+from typing import List, Optional
+
+BOLD_FLAG = 16
+BOLD_FONT_HINTS = ("bold", "semibold", "demibold", "black", "heavy")
+
 
 def extract_pdf_text(pdf_path: str, *, strip_whitespace: bool = True) -> str:
     doc = fitz.open(pdf_path)
@@ -10,3 +15,89 @@ def extract_pdf_text(pdf_path: str, *, strip_whitespace: bool = True) -> str:
     return "\n".join(parts)
 
 
+def _is_bold(span: dict) -> bool:
+    return bool(span["flags"] & BOLD_FLAG) or any(h in span["font"].lower() for h in BOLD_FONT_HINTS)
+
+
+def _line_segments(chars: List[dict], size: float) -> List[str]:
+    """
+    Split a line's characters where the horizontal gap is much wider than a
+    space, e.g. between skill pills that sit on the same line.
+    """
+    segments, current, last_x1 = [], [], None
+    for ch in chars:
+        c = ch["c"]
+        x0, _, x1, _ = ch["bbox"]
+        if not c.strip():
+            current.append(" ")
+            continue
+        if last_x1 is not None and x0 - last_x1 > size * 0.6 and current:
+            segments.append("".join(current).strip())
+            current = []
+        current.append(c)
+        last_x1 = x1
+    if current:
+        segments.append("".join(current).strip())
+    return [s for s in segments if s]
+
+
+def page_lines(page, page_no: int) -> List[dict]:
+    """Text lines with position, font size, boldness and gap-separated segments."""
+    lines = []
+    for block in page.get_text("rawdict")["blocks"]:
+        if block.get("type") != 0:
+            continue
+        for line in block["lines"]:
+            spans = [s for s in line["spans"] if any(ch["c"].strip() for ch in s["chars"])]
+            if not spans:
+                continue
+            chars = [ch for s in line["spans"] for ch in s["chars"]]
+            size = max(s["size"] for s in spans)
+            lines.append({
+                "page": page_no,
+                "bbox": tuple(round(v, 2) for v in line["bbox"]),
+                "text": " ".join("".join(ch["c"] for ch in chars).split()),
+                "size": round(size, 2),
+                "bold": all(_is_bold(s) for s in spans),
+                "segments": _line_segments(chars, size),
+            })
+    return lines
+
+
+def pdf_page_count(pdf_path: str) -> int:
+    doc = fitz.open(pdf_path)
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+
+def extract_pdf_layout(pdf_path: str, start: int = 0, stop: Optional[int] = None) -> dict:
+    """
+    Plain text (as extract_pdf_text) plus the positioned lines of every page,
+    from a single open of the PDF. start/stop restrict it to a page range;
+    merge_layouts joins the ranges of one PDF back together.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        parts, lines = [], []
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        for page_no in range(start, stop):
+            page = doc[page_no]
+            text = page.get_text("text")
+            if text:
+                parts.append(text)
+            lines.extend(page_lines(page, page_no))
+        width = doc[0].rect.width if doc.page_count else 0.0
+        return {"text": "\n".join(parts), "lines": lines, "metadata": doc.metadata or {},
+                "page_width": width, "pages": doc.page_count}
+    finally:
+        doc.close()
+
+
+def merge_layouts(parts: List[dict]) -> dict:
+    """Layouts of consecutive page ranges of one PDF, in order -> the whole-document layout."""
+    merged = dict(parts[0])
+    merged["text"] = "\n".join(p["text"] for p in parts if p["text"])
+    merged["lines"] = [line for p in parts for line in p["lines"]]
+    return merged
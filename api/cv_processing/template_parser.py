@@ -0,0 +1,261 @@
+"""
+Deterministic parser for resumes rendered from our own HTML templates
+(templates/cv-template-1.html and cv-template-2.html via
+cv_generation/pdf_generator.render_pdf).
+
+Both templates share one layout: a header (name, title, "location · email ·
+phone"), an optional summary, then two columns, Experience on the left and
+Skills / Education / Languages / Certifications on the right. The parser works
+on the positioned lines from pdf_parser.extract_pdf_layout: headings are
+recognised by text, size and weight, columns by x position, skill pills by the
+gaps between them. Anything that does not look like one of the templates
+returns None so the caller can fall back to the LLM extractor.
+"""
+import os
+import re
+from typing import List, Optional
+from model.CandidateProfile import CandidateProfile, EducationItem, ExperienceItem, CertificationItem
+
+TEMPLATE_FAST_PATH = os.getenv("TEMPLATE_FAST_PATH", "1") == "1"
+
+# Name font size (pt) of each template; the rest of the layout is shared
+TEMPLATE_NAME_SIZES = {"cv-template-1": 22.0, "cv-template-2": 20.0}
+HEADINGS = {"experience", "skills", "education", "languages", "certifications"}
+HEADING_MIN_SIZE = 11.5
+FOOTNOTE_MAX_SIZE = 9.0
+BULLETS = ("•", "◦", "▪")
+
+_YEAR = r"(?:\d{4}(?:-\d{2})?|None)"
+_DATES_RE = re.compile(rf"^(?P<start>{_YEAR})?\s*[–-]\s*(?P<end>{_YEAR}|Present)?$")
+_EDU_YEARS_RE = re.compile(r"\(\s*(?P<start>\d{4}|None)?\s*[–-]\s*(?P<end>\d{4}|None)?\s*\)\s*$")
+_CERT_YEAR_RE = re.compile(r"\s*(?:\((?P<p>\d{4})\)|[,–-]\s*(?P<s>\d{4}))\s*$")
+
+
+def _year(s: Optional[str]) -> Optional[str]:
+    return None if not s or s == "None" else s
+
+
+def _is_heading(line: dict) -> bool:
+    return line["bold"] and line["size"] >= HEADING_MIN_SIZE and line["text"].lower() in HEADINGS
+
+
+def _is_footnote(line: dict) -> bool:
+    return line["size"] < FOOTNOTE_MAX_SIZE and line["text"].startswith("This CV is")
+
+
+def _strip_bullet(text: str) -> Optional[str]:
+    """Text after a list marker, or None if the line does not start with one."""
+    for b in BULLETS:
+        if text.startswith(b):
+            return text[len(b):].strip()
+    return None
+
+
+def _sort_key(line: dict):
+    return (line["page"], round(line["bbox"][1], 1), line["bbox"][0])
+
+
+def detect_template(layout: dict) -> Optional[str]:
+    """Template id if the first page has our header and column headings, else None."""
+    first = [l for l in layout.get("lines") or [] if l["page"] == 0]
+    headings = [l for l in first if _is_heading(l)]
+    if not any(l["text"].lower() == "experience" for l in headings):
+        return None
+    top = min(l["bbox"][1] for l in headings)
+    header = [l for l in first if l["bbox"][3] <= top]
+    if not header:
+        return None
+    name = max(header, key=lambda l: l["size"])
+    for template, size in TEMPLATE_NAME_SIZES.items():
+        if abs(name["size"] - size) < 0.75:
+            # WeasyPrint writes the <title> ("<name> – CV") into the PDF metadata
+            title = (layout.get("metadata") or {}).get("title") or ""
+            if title.endswith(" – CV") and title[:-len(" – CV")].strip() != name["text"]:
+                return None
+            return template
+    return None
+
+
+# ---- Header ----
+
+def _parse_header(lines: List[dict]) -> dict:
+    name = max(lines, key=lambda l: l["size"])
+    rest = [l for l in lines if _sort_key(l) > _sort_key(name)]
+    meta_at = next((i for i, l in enumerate(rest) if " · " in l["text"] and "@" in l["text"]), None)
+    out = {"full_name": name["text"]}
+    if meta_at is None:
+        return out
+    parts = [p.strip() for p in rest[meta_at]["text"].split(" · ")]
+    parts += [""] * (3 - len(parts))
+    location, email, phone = parts[0], parts[1], " · ".join(parts[2:]).strip(" ·")
+    summary = " ".join(l["text"] for l in rest[meta_at + 1:])
+    out.update({"location": location or None, "email": email or None, "phone": phone or None,
+                "summary": summary or None})
+    return out
+
+
+# ---- Left column: experience ----
+
+def _parse_experience(lines: List[dict], col_x0: float) -> Optional[List[ExperienceItem]]:
+    jobs: List[dict] = []
+    job = None
+    pending_dates = None
+    role_open = bullet_open = False
+
+    def new_job(role: str) -> dict:
+        j = {"role": role, "dates": None, "summary": [], "highlights": []}
+        jobs.append(j)
+        return j
+
+    for line in lines:
+        text = line["text"]
+        dates = _DATES_RE.match(text)
+        if dates and line["bbox"][0] > col_x0 + 1:
+            if job is not None and job["dates"] is None:
+                job["dates"] = dates
+            else:
+                pending_dates = dates
+            continue
+        if line["bold"] and _strip_bullet(text) is None:
+            if job is not None and role_open:
+                job["role"] += " " + text
+            else:
+                job = new_job(text)
+                if pending_dates is not None:
+                    job["dates"], pending_dates = pending_dates, None
+            role_open, bullet_open = True, False
+            continue
+        role_open = False
+        if job is None:
+            continue
+        item = _strip_bullet(text)
+        if item is not None:
+            job["highlights"].append(item)
+            bullet_open = True
+        elif bullet_open and line["bbox"][0] > col_x0 + 6:
+            if job["highlights"] and job["highlights"][-1]:
+                job["highlights"][-1] += " " + text
+            else:
+                job["highlights"][-1:] = [text]
+        else:
+            job["summary"].append(text)
+            bullet_open = False
+
+    items = []
+    for j in jobs:
+        title, sep, company = j["role"].partition(" · ")
+        if not sep or not company.strip():
+            # Roles without a company are ambiguous; leave them to the LLM
+            return None
+        d = j["dates"]
+        end = _year(d.group("end")) if d else None
+        items.append(ExperienceItem(
+            company=company.strip(),
+            title=title.strip() or None,
+            start=_year(d.group("start")) if d else None,
+            end=None if end == "Present" else end,
+            description=" ".join(j["summary"]) or None,
+            highlights=[h for h in j["highlights"] if h] or None,
+        ))
+    return items
+
+
+# ---- Right column: skills, education, certifications ----
+
+def _parse_education(lines: List[dict]) -> List[EducationItem]:
+    entries: List[dict] = []
+    entry = None
+    for line in lines:
+        if line["bold"]:
+            if entry is None or entry["institution"] or entry["closed"]:
+                entry = {"degree": [], "institution": [], "years": None, "closed": False}
+                entries.append(entry)
+            entry["degree"].append(line["text"])
+            continue
+        if entry is None or entry["closed"]:
+            entry = {"degree": [], "institution": [], "years": None, "closed": False}
+            entries.append(entry)
+        entry["institution"].append(line["text"])
+        years = _EDU_YEARS_RE.search(" ".join(entry["institution"]))
+        if years:
+            entry["years"], entry["closed"] = years, True
+
+    items = []
+    for e in entries:
+        institution = " ".join(e["institution"])
+        start = end = None
+        if e["years"]:
+            institution = institution[:e["years"].start()]
+            start, end = _year(e["years"].group("start")), _year(e["years"].group("end"))
+        if not institution.strip():
+            continue
+        items.append(EducationItem(institution=institution.strip(), degree=" ".join(e["degree"]) or None,
+                                   start_year=int(start) if start else None, end_year=int(end) if end else None))
+    return items
+
+
+def certification_item(text: str) -> CertificationItem:
+    """ "AWS Certified Developer (2021)" -> name + year, as listed in the templates."""
+    m = _CERT_YEAR_RE.search(text)
+    year = m.group("p") or m.group("s") if m else None
+    return CertificationItem(name=text[:m.start()].strip() if m else text.strip(), year=int(year) if year else None)
+
+
+def _parse_certifications(lines: List[dict]) -> List[CertificationItem]:
+    names: List[str] = []
+    for line in lines:
+        item = _strip_bullet(line["text"])
+        if item is not None or not names:
+            names.append(item if item is not None else line["text"])
+        else:
+            names[-1] += " " + line["text"]
+    items = [certification_item(name) for name in names]
+    return [c for c in items if c.name]
+
+
+def _parse_right_column(lines: List[dict]) -> dict:
+    sections = {}
+    current = None
+    for line in lines:
+        if _is_heading(line):
+            current = line["text"].lower()
+            sections.setdefault(current, [])
+        elif current:
+            sections[current].append(line)
+
+    skills = []
+    for line in sections.get("skills", []):
+        skills.extend(line["segments"] or [line["text"]])
+    out = {"skills": list(dict.fromkeys(s for s in skills if s)),
+           "education": _parse_education(sections.get("education", []))}
+    certifications = _parse_certifications(sections.get("certifications", []))
+    if certifications:
+        out["certifications"] = certifications
+    return out
+
+
+def parse_template_profile(layout: dict) -> Optional[CandidateProfile]:
+    """CandidateProfile read straight from the layout, or None if it is not one of our templates."""
+    if detect_template(layout) is None:
+        return None
+    lines = sorted((l for l in layout["lines"] if not _is_footnote(l)), key=_sort_key)
+    first_headings = [l for l in lines if l["page"] == 0 and _is_heading(l)]
+    top = min(l["bbox"][1] for l in first_headings)
+    left_x0 = next(l["bbox"][0] for l in first_headings if l["text"].lower() == "experience")
+    right = [l["bbox"][0] for l in first_headings if l["bbox"][0] > left_x0 + layout["page_width"] * 0.25]
+    split = min(right) - 2 if right else layout["page_width"]
+
+    header = [l for l in lines if l["page"] == 0 and l["bbox"][3] <= top]
+    body = [l for l in lines if not (l["page"] == 0 and l["bbox"][3] <= top)]
+    left = [l for l in body if l["bbox"][0] < split and not _is_heading(l)]
+    right_lines = [l for l in body if l["bbox"][0] >= split]
+
+    experience = _parse_experience(left, left_x0)
+    if experience is None:
+        return None
+    fields = _parse_header(header)
+    fields.update(_parse_right_column(right_lines))
+    fields["experience"] = experience
+    if not fields.get("email") or not (experience or fields["education"]):
+        return None
+    return CandidateProfile(**fields)
@@ -0,0 +1,136 @@
+"""
+Resume uploads through the API: streaming uploaded files to disk and the
+background queue that ingests them.
+
+Each upload request is saved to its own folder under UPLOAD_DIR in
+UPLOAD_CHUNK_BYTES chunks (never a whole file in memory) and becomes an
+ingestion job (ingest_jobs). Jobs run in UPLOAD_WORKERS background
+workers with a lower-priority parse pool and fewer LLM calls in flight
+than batch ingestion, so /ask stays responsive while uploads are processed.
+"""
+import os
+import re
+import asyncio
+from typing import Dict, Optional, Set
+from cv_processing.ingest_jobs import run_job
+from cv_processing.parse_service import PdfParser, PARSE_WORKERS
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "data/uploads")
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1 << 20
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "1"))                 # jobs ingested at once
+UPLOAD_QUEUE_SIZE = int(os.getenv("UPLOAD_QUEUE_SIZE", "100"))         # waiting jobs before uploads get a 503
+UPLOAD_EXTRACT_CONCURRENCY = int(os.getenv("UPLOAD_EXTRACT_CONCURRENCY", "4"))
+UPLOAD_PARSE_NICE = int(os.getenv("UPLOAD_PARSE_NICE", "10"))
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class UploadRejected(ValueError):
+    pass
+
+
+def safe_filename(name: Optional[str], taken: Set[str]) -> str:
+    """A file name safe to create in the upload folder, unique within `taken` (which it updates)."""
+    base = _UNSAFE.sub("_", os.path.basename(name or "")).strip("._")
+    if not base.lower().endswith(".pdf"):
+        raise UploadRejected("only .pdf files are accepted")
+    stem, n, candidate = base[:-4] or "resume", 1, base
+    while candidate.lower() in taken:
+        n += 1
+        candidate = f"{stem}-{n}.pdf"
+    taken.add(candidate.lower())
+    return candidate
+
+
+async def save_upload(upload, path: str, max_bytes: int = UPLOAD_MAX_BYTES) -> int:
+    """
+    Copy an upload (anything with an async read(n), e.g. FastAPI's UploadFile)
+    to path chunk by chunk. The file only appears under its name once complete.
+    Returns the size; raises UploadRejected for non-PDF, empty or oversized files.
+    """
+    part = path + ".part"
+    size = 0
+    fh = await asyncio.to_thread(open, part, "wb")
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            if size == 0 and not chunk.startswith(b"%PDF-"):
+                raise UploadRejected("not a PDF file")
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadRejected(f"larger than {max_bytes} bytes")
+            await asyncio.to_thread(fh.write, chunk)
+        if size == 0:
+            raise UploadRejected("empty file")
+    except BaseException:
+        fh.close()
+        os.unlink(part)
+        raise
+    await asyncio.to_thread(fh.close)
+    os.replace(part, path)
+    return size
+
+
+class IngestQueue:
+    """
+    Background workers running ingestion jobs one at a time each. Started
+    lazily on the first submit (it needs the running event loop).
+    """
+    def __init__(self, db_path: str, workers: int = UPLOAD_WORKERS, max_queued: int = UPLOAD_QUEUE_SIZE,
+                 parse_nice: int = UPLOAD_PARSE_NICE, **pipeline_kwargs):
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.parse_nice = parse_nice
+        self.pipeline_kwargs = {"extract_concurrency": UPLOAD_EXTRACT_CONCURRENCY, **pipeline_kwargs}
+        self.jobs: Dict[str, str] = {}      # job id -> "queued" | "running"
+        self.parser: Optional[PdfParser] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+
+    def _start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            # One shared lower-priority parse pool instead of a new process pool per job
+            self.parser = PdfParser(workers=PARSE_WORKERS, nice=self.parse_nice)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, job_id: str, retry_failed: bool = False) -> int:
+        """
+        Queue a job and return how many jobs are waiting. Raises asyncio.QueueFull
+        when max_queued jobs are already waiting.
+        """
+        self._start()
+        self._queue.put_nowait((job_id, retry_failed))
+        self.jobs[job_id] = "queued"
+        return self._queue.qsize()
+
+    async def _worker(self):
+        while True:
+            job_id, retry_failed = await self._queue.get()
+            self.jobs[job_id] = "running"
+            try:
+                await run_job(job_id, self.db_path, retry_failed=retry_failed, parser=self.parser,
+                              **self.pipeline_kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Ingestion job {job_id} failed: {e}")
+            finally:
+                self.jobs.pop(job_id, None)
+
+    def snapshot(self) -> dict:
+        return {"workers": self.workers, "queued": sum(1 for s in self.jobs.values() if s == "queued"),
+                "running": [j for j, s in self.jobs.items() if s == "running"]}
+
+    async def close(self):
+        """Cancel the workers; running jobs are journaled as interrupted and queued ones stay resumable."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.parser is not None:
+            await asyncio.to_thread(self.parser.close)
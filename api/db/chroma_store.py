@@ -1,16 +1,33 @@
 import os
 from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
+from db.embedding_cache import cached_embeddings
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# 1) Embeddings
-emb = OpenAIEmbeddings(model="text-embedding-3-small", api_key=os.environ["OPENAI_API_KEY"])
+CHROMA_DIR = "data/chroma_resumes"
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# 1) Embeddings, behind the persistent text-hash cache (EMBED_CACHE_PATH)
+emb = cached_embeddings(OpenAIEmbeddings(model=EMBEDDING_MODEL, api_key=os.environ["OPENAI_API_KEY"]))
 
 # 2) Vector store (NEW collection if you previously used a different embedding model!)
 store = Chroma(
     collection_name="resumes_openai_t3s",
     embedding_function=emb,
-    persist_directory="data/chroma_resumes"
+    persist_directory=CHROMA_DIR
+)
+
+# 3) Section-level index: one document per resume section / experience entry.
+# VECTOR_INDEX_MODE=sections indexes and searches this collection instead.
+VECTOR_INDEX_MODE = os.getenv("VECTOR_INDEX_MODE", "resume")
+SECTION_INDEX = VECTOR_INDEX_MODE == "sections"
+
+section_store = Chroma(
+    collection_name="resume_sections_openai_t3s",
+    embedding_function=emb,
+    persist_directory=CHROMA_DIR
 )
+
+vector_store = section_store if SECTION_INDEX else store
@@ -96,3 +96,189 @@ ON certifications(
   IFNULL(year, -1),
   IFNULL(issuer, '')
 );
+
+-- Data generation counter: bumped on every ingest so generation-aware caches
+-- (final answers) can tell when the underlying candidates changed.
+CREATE TABLE IF NOT EXISTS data_generation (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  generation INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO data_generation(id, generation) VALUES (1, 0);
+
+-- Persistent tier of the query caches (routes, answers)
+CREATE TABLE IF NOT EXISTS query_cache (
+  namespace TEXT NOT NULL,
+  key TEXT NOT NULL,
+  value TEXT NOT NULL,
+  generation INTEGER,          -- NULL for entries that do not depend on the data
+  expires_at REAL NOT NULL,    -- unix time
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_query_cache_expires ON query_cache(expires_at);
+
+-- Raw resume text (as parsed from the PDF), indexed for full-text search
+CREATE TABLE IF NOT EXISTS resume_texts (
+  candidate_id TEXT PRIMARY KEY,
+  text TEXT NOT NULL,
+  FOREIGN KEY(candidate_id) REFERENCES candidates(id) ON DELETE CASCADE
+);
+
+-- Schema bookkeeping (e.g. whether FTS indexes were built for existing rows)
+CREATE TABLE IF NOT EXISTS schema_meta (
+  key TEXT PRIMARY KEY,
+  value TEXT
+);
+
+-- FTS5 indexes (external content, kept in sync by triggers).
+-- trigram: case-insensitive substring matching, i.e. the semantics of
+-- lower(col) LIKE '%x%' but served from an index (needs >= 3 characters).
+CREATE VIRTUAL TABLE IF NOT EXISTS experience_fts USING fts5(
+  company, title, content='experience', content_rowid='id', tokenize='trigram'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS education_fts USING fts5(
+  institution, content='education', content_rowid='id', tokenize='trigram'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+  full_name, content='candidates', content_rowid='rowid', tokenize='trigram'
+);
+-- Word-level index with BM25 ranking for resume text
+CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(
+  text, content='resume_texts', content_rowid='rowid', tokenize='porter unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS experience_fts_ai AFTER INSERT ON experience BEGIN
+  INSERT INTO experience_fts(rowid, company, title) VALUES (new.id, new.company, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS experience_fts_ad AFTER DELETE ON experience BEGIN
+  INSERT INTO experience_fts(experience_fts, rowid, company, title) VALUES ('delete', old.id, old.company, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS experience_fts_au AFTER UPDATE ON experience BEGIN
+  INSERT INTO experience_fts(experience_fts, rowid, company, title) VALUES ('delete', old.id, old.company, old.title);
+  INSERT INTO experience_fts(rowid, company, title) VALUES (new.id, new.company, new.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS education_fts_ai AFTER INSERT ON education BEGIN
+  INSERT INTO education_fts(rowid, institution) VALUES (new.id, new.institution);
+END;
+CREATE TRIGGER IF NOT EXISTS education_fts_ad AFTER DELETE ON education BEGIN
+  INSERT INTO education_fts(education_fts, rowid, institution) VALUES ('delete', old.id, old.institution);
+END;
+CREATE TRIGGER IF NOT EXISTS education_fts_au AFTER UPDATE ON education BEGIN
+  INSERT INTO education_fts(education_fts, rowid, institution) VALUES ('delete', old.id, old.institution);
+  INSERT INTO education_fts(rowid, institution) VALUES (new.id, new.institution);
+END;
+
+CREATE TRIGGER IF NOT EXISTS candidates_fts_ai AFTER INSERT ON candidates BEGIN
+  INSERT INTO candidates_fts(rowid, full_name) VALUES (new.rowid, new.full_name);
+END;
+CREATE TRIGGER IF NOT EXISTS candidates_fts_ad AFTER DELETE ON candidates BEGIN
+  INSERT INTO candidates_fts(candidates_fts, rowid, full_name) VALUES ('delete', old.rowid, old.full_name);
+END;
+CREATE TRIGGER IF NOT EXISTS candidates_fts_au AFTER UPDATE OF full_name ON candidates BEGIN
+  INSERT INTO candidates_fts(candidates_fts, rowid, full_name) VALUES ('delete', old.rowid, old.full_name);
+  INSERT INTO candidates_fts(rowid, full_name) VALUES (new.rowid, new.full_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS resume_fts_ai AFTER INSERT ON resume_texts BEGIN
+  INSERT INTO resume_fts(rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS resume_fts_ad AFTER DELETE ON resume_texts BEGIN
+  INSERT INTO resume_fts(resume_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS resume_fts_au AFTER UPDATE ON resume_texts BEGIN
+  INSERT INTO resume_fts(resume_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+  INSERT INTO resume_fts(rowid, text) VALUES (new.rowid, new.text);
+END;
+
+-- Canonical skill dictionary. skill_aliases maps normalized spellings
+-- ("python3", "py", "k8s") to one integer skill id; candidate_skills is the
+-- normalized candidate <-> skill link used by skill lookups.
+CREATE TABLE IF NOT EXISTS skill_dict (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS skill_aliases (
+  alias TEXT PRIMARY KEY,          -- normalized (lower, single spaces)
+  skill_id INTEGER NOT NULL,
+  FOREIGN KEY(skill_id) REFERENCES skill_dict(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS candidate_skills (
+  candidate_id TEXT NOT NULL,
+  skill_id INTEGER NOT NULL,
+  PRIMARY KEY (candidate_id, skill_id),
+  FOREIGN KEY(candidate_id) REFERENCES candidates(id) ON DELETE CASCADE,
+  FOREIGN KEY(skill_id) REFERENCES skill_dict(id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_candidate_skills_skill ON candidate_skills(skill_id, candidate_id);
+
+-- Candidate summaries generated at ingest; content_hash is the hash of the
+-- profile they were generated from, so a changed profile gets a new summary.
+CREATE TABLE IF NOT EXISTS candidate_summaries (
+  candidate_id TEXT PRIMARY KEY,
+  content_hash TEXT NOT NULL,
+  summary TEXT NOT NULL,
+  model TEXT,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY(candidate_id) REFERENCES candidates(id) ON DELETE CASCADE
+);
+
+-- Ingestion manifest: one row per ingested resume file. Unchanged files
+-- (same size/mtime, or same SHA-256) are skipped on the next run; changed
+-- files update the candidate they were ingested as. Bumping the pipeline
+-- version re-ingests everything.
+CREATE TABLE IF NOT EXISTS ingest_manifest (
+  path TEXT PRIMARY KEY,
+  size INTEGER NOT NULL,
+  mtime REAL NOT NULL,
+  sha256 TEXT NOT NULL,
+  candidate_id TEXT NOT NULL,
+  pipeline_version TEXT NOT NULL,
+  ingested_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY(candidate_id) REFERENCES candidates(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_ingest_manifest_sha ON ingest_manifest(sha256);
+CREATE INDEX IF NOT EXISTS idx_ingest_manifest_candidate ON ingest_manifest(candidate_id);
+
+-- Candidates the PDF pipeline has stored but not yet recorded in the manifest
+-- (vectors may still be missing). Written in the transaction that stores the
+-- rows and removed with the manifest row; bulk-loaded candidates never get one.
+CREATE TABLE IF NOT EXISTS ingest_in_flight (
+  candidate_id TEXT PRIMARY KEY,
+  FOREIGN KEY(candidate_id) REFERENCES candidates(id) ON DELETE CASCADE
+);
+
+-- Ingestion jobs: a named run over a folder with a per-file journal, so a
+-- killed run resumes where it stopped and failures can be retried alone.
+-- File states: pending -> parsed -> extracted -> stored -> embedded, or failed
+-- (with the stage and error). Times are Unix epoch seconds.
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+  id TEXT PRIMARY KEY,
+  name TEXT,
+  pdf_folder TEXT NOT NULL,
+  status TEXT NOT NULL,              -- created | running | completed | failed | interrupted
+  total INTEGER NOT NULL DEFAULT 0,
+  created_at REAL NOT NULL,
+  run_started_at REAL,
+  run_done_at_start INTEGER NOT NULL DEFAULT 0,
+  heartbeat_at REAL,
+  finished_at REAL,
+  error TEXT
+);
+CREATE TABLE IF NOT EXISTS ingest_job_files (
+  job_id TEXT NOT NULL,
+  path TEXT NOT NULL,                -- resolved path, as in ingest_manifest
+  sha256 TEXT,                       -- content the journaled progress belongs to
+  state TEXT NOT NULL DEFAULT 'pending',
+  stage TEXT,                        -- stage that failed
+  error TEXT,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  candidate_id TEXT,
+  profile_json TEXT,                 -- extracted profile, so a resumed run skips the LLM
+  updated_at REAL,
+  PRIMARY KEY (job_id, path),
+  FOREIGN KEY(job_id) REFERENCES ingest_jobs(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_ingest_job_files_state ON ingest_job_files(job_id, state);
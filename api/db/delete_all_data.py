@@ -2,7 +2,9 @@ import os
 import sqlite3
 import shutil
 
-def delete_sqlite_data(db_path="api/data/candidates.db"):
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def delete_sqlite_data(db_path="data/candidates.db"):
     """Delete all data from SQLite database tables."""
     print(f"Deleting SQLite data from {db_path}...")
     
@@ -37,7 +39,7 @@ def delete_sqlite_data(db_path="api/data/candidates.db"):
     except Exception as e:
         print(f"Error deleting SQLite data: {e}")
 
-def delete_chroma_data(chroma_dir="api/data/chroma_resumes"):
+def delete_chroma_data(chroma_dir="data/chroma_resumes"):
     """Delete all data from Chroma vector store."""
     print(f"Deleting Chroma data from {chroma_dir}...")
     
@@ -60,9 +62,9 @@ def main():
     print("=" * 50)
     print()
     
-    # Change to the workspace directory
-    workspace_dir = "/Users/mahmoudsoliman/workspace/cv-search-challenge"
-    os.chdir(workspace_dir)
+    # Paths are relative to the api folder, wherever this is run from
+    os.chdir(API_DIR)
+    print("To remove single candidates instead, use: python -m db.maintenance delete <candidate_id>")
     
     
     print("\nStarting database data deletion...")
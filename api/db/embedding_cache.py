@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+
+# Persistent text-hash -> vector cache in front of the embeddings model.
+# Identical chunks (unchanged sections of an edited resume, re-ingests after a
+# pipeline version bump, shared boilerplate) are embedded once per model.
+
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "data/embedding_cache.db")   # empty disables the cache
+SQL_MAX_VARIABLES = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_cache (
+  model     TEXT NOT NULL,
+  text_hash TEXT NOT NULL,
+  dim       INTEGER NOT NULL,
+  vector    BLOB NOT NULL,      -- float32
+  PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+"""
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _pack(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    vec = array("f")
+    vec.frombytes(blob)
+    return vec.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that only sends cache misses to `embeddings`. Documents
+    are cached; queries are passed through (they are answered by the query cache).
+    """
+    def __init__(self, embeddings: Embeddings, cache_path: str = EMBED_CACHE_PATH, model: Optional[str] = None):
+        self.embeddings = embeddings
+        self.model = model or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.cache_path = cache_path
+        self._con: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._con is None:
+            if os.path.dirname(self.cache_path):
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            con = sqlite3.connect(self.cache_path, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.executescript(_SCHEMA)
+            self._con = con
+        return self._con
+
+    def lookup(self, hashes: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            con = self._connection()
+            for i in range(0, len(hashes), SQL_MAX_VARIABLES):
+                chunk = hashes[i:i + SQL_MAX_VARIABLES]
+                rows = con.execute(
+                    f"SELECT text_hash, vector FROM embedding_cache WHERE model=? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [self.model, *chunk])
+                found.update((h, _unpack(blob)) for h, blob in rows)
+        return found
+
+    def store(self, vectors: Dict[str, List[float]]):
+        with self._lock:
+            con = self._connection()
+            with con:
+                con.executemany("INSERT OR REPLACE INTO embedding_cache(model, text_hash, dim, vector) VALUES (?,?,?,?)",
+                                [(self.model, h, len(v), _pack(v)) for h, v in vectors.items()])
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [text_hash(t) for t in texts]
+        cached = self.lookup(list(dict.fromkeys(hashes)))
+        # Embed each distinct missing text once
+        missing = {h: t for h, t in zip(hashes, texts) if h not in cached}
+        self.hits += len(texts) - sum(1 for h in hashes if h in missing)
+        self.misses += len(missing)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing, vectors))
+            self.store(fresh)
+            cached.update(fresh)
+        return [cached[h] for h in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    def stats(self) -> dict:
+        return {"model": self.model, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+
+def cached_embeddings(embeddings: Embeddings, cache_path: str = EMBED_CACHE_PATH) -> Embeddings:
+    """Wrap `embeddings` with the persistent cache unless EMBED_CACHE_PATH is empty."""
+    return CachedEmbeddings(embeddings, cache_path) if cache_path else embeddings
@@ -0,0 +1,219 @@
+"""
+Candidate-level maintenance of the SQLite database and the Chroma collections.
+
+- delete: removes candidates from SQLite (children, FTS rows, summaries and
+  manifest entries go with them through ON DELETE CASCADE) and their
+  documents from every Chroma collection, by candidate_id.
+- replace: re-ingests one candidate from a new PDF, or from its own source
+  file, keeping its candidate id; its rows and documents are replaced.
+- compact: drops vector documents whose candidate no longer exists and
+  stale query-cache rows, optimizes the FTS indexes and VACUUMs both
+  SQLite files (candidates.db and Chroma's chroma.sqlite3).
+
+SQL changes go through the shared writer thread (db.sql_writer) and vector
+deletes through the vector writer (db.vector_writer), so all of this is safe
+while the API is serving and ingestion is running.
+
+Usage (from the api folder):
+    python -m db.maintenance delete <candidate_id> [<candidate_id> ...]
+    python -m db.maintenance replace <candidate_id> [--pdf path/to/new.pdf]
+    python -m db.maintenance compact
+"""
+import os
+import time
+import json
+import sqlite3
+import asyncio
+import argparse
+from typing import Dict, List, Optional
+from db.sql_store import init_db, bump_data_generation, data_generation, _ph, SQL_MAX_VARIABLES, FTS_TABLES
+from db.sql_writer import get_writer
+from db.vector_writer import get_vector_writer
+
+VECTOR_SCAN_PAGE = 5000
+
+
+def _default_stores() -> list:
+    from db.chroma_store import store, section_store
+    return [store, section_store]
+
+
+# ---- SQLite (run on the writer thread) ----
+
+def existing_candidates(con, candidate_ids: List[str]) -> List[str]:
+    found = set()
+    for i in range(0, len(candidate_ids), SQL_MAX_VARIABLES):
+        chunk = candidate_ids[i:i + SQL_MAX_VARIABLES]
+        found.update(r[0] for r in con.execute(f"SELECT id FROM candidates WHERE id IN ({_ph(len(chunk))})", chunk))
+    return [cid for cid in candidate_ids if cid in found]
+
+
+def delete_candidate_rows(con, candidate_ids: List[str]) -> List[str]:
+    """Delete candidates (their child rows cascade) and return the ids that existed."""
+    existing = existing_candidates(con, candidate_ids)
+    if not existing:
+        return []
+    with con:
+        for i in range(0, len(existing), SQL_MAX_VARIABLES):
+            chunk = existing[i:i + SQL_MAX_VARIABLES]
+            con.execute(f"DELETE FROM candidates WHERE id IN ({_ph(len(chunk))})", chunk)
+        bump_data_generation(con)
+    return existing
+
+
+def forget_other_sources(con, candidate_id: str, keep_path: str):
+    # After a replace the candidate comes from keep_path only; its old file is a new resume if seen again
+    with con:
+        con.execute("DELETE FROM ingest_manifest WHERE candidate_id=? AND path<>?", (candidate_id, keep_path))
+
+
+def source_path(con, candidate_id: str) -> Optional[str]:
+    row = con.execute("SELECT source_file FROM candidates WHERE id=?", (candidate_id,)).fetchone()
+    if row is None:
+        raise KeyError(candidate_id)
+    return row[0][len("file://"):] if row[0] and row[0].startswith("file://") else row[0]
+
+
+def compact_sql(con) -> dict:
+    """Drop dead query-cache rows, merge FTS segments and VACUUM. Returns the rows dropped."""
+    with con:
+        dropped = con.execute("DELETE FROM query_cache WHERE expires_at < ? OR generation < ?",
+                              (time.time(), data_generation(con))).rowcount
+        for table in FTS_TABLES:
+            con.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+    con.execute("VACUUM")
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    con.execute("PRAGMA optimize")
+    return {"query_cache_rows": dropped}
+
+
+def vacuum_sqlite(path: str, timeout: float = 30.0):
+    con = sqlite3.connect(path, timeout=timeout)
+    try:
+        con.execute("VACUUM")
+    finally:
+        con.close()
+
+
+def _file_sizes(*paths: str) -> Dict[str, int]:
+    sizes = {}
+    for path in paths:
+        # Include the WAL, which is where most of a busy database's slack lives
+        sizes[path] = sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+    return sizes
+
+
+# ---- Vector store ----
+
+def vector_candidates(store, page: int = VECTOR_SCAN_PAGE) -> Dict[str, Optional[str]]:
+    """document id -> candidate_id for every document in store."""
+    out, offset = {}, 0
+    while True:
+        got = store.get(include=["metadatas"], limit=page, offset=offset)
+        out.update((i, (meta or {}).get("candidate_id")) for i, meta in zip(got["ids"], got["metadatas"]))
+        if len(got["ids"]) < page:
+            return out
+        offset += page
+
+
+def delete_vector_ids(store, ids: List[str], page: int = VECTOR_SCAN_PAGE):
+    for i in range(0, len(ids), page):
+        store.delete(ids=ids[i:i + page])
+
+
+# ---- Operations ----
+
+async def delete_candidates(db_path: str, candidate_ids: List[str], stores: Optional[list] = None) -> dict:
+    """
+    Delete candidates from every vector store, then from SQLite. Documents are
+    removed even for ids SQLite no longer knows (e.g. left by a failed ingest).
+    """
+    candidate_ids = list(dict.fromkeys(candidate_ids))
+    stores = _default_stores() if stores is None else stores
+    # Vectors first: a query in between can still find the candidate's facts, but never docs without facts
+    await asyncio.gather(*(asyncio.wrap_future(get_vector_writer(s).submit([], replace_candidate_id=cid))
+                           for s in stores for cid in candidate_ids))
+    sql = await asyncio.to_thread(get_writer, db_path)
+    deleted = await asyncio.wrap_future(sql.call(delete_candidate_rows, candidate_ids))
+    return {"deleted": deleted, "not_found": [cid for cid in candidate_ids if cid not in set(deleted)]}
+
+
+async def replace_candidate(db_path: str, candidate_id: str, pdf_path: Optional[str] = None,
+                            store=None, sections: Optional[bool] = None) -> dict:
+    """
+    Re-ingest candidate_id from pdf_path (default: its current source file)
+    through the ingestion pipeline, keeping the id. Raises KeyError for an
+    unknown candidate and FileNotFoundError when there is no file to read.
+    """
+    from cv_processing.ingest_manifest import file_sha256, manifest_path
+    from cv_processing.ingest_pipeline import run_pipeline
+    from cv_processing.parse_service import get_pdf_parser
+
+    sql = await asyncio.to_thread(get_writer, db_path)
+    current = await asyncio.wrap_future(sql.call(source_path, candidate_id))
+    pdf_path = pdf_path or current
+    if not pdf_path or not os.path.isfile(pdf_path):
+        raise FileNotFoundError(f"No resume file for {candidate_id}: {pdf_path}")
+    st = await asyncio.to_thread(os.stat, pdf_path)
+    task = {"path": pdf_path, "manifest_path": manifest_path(pdf_path), "size": st.st_size, "mtime": st.st_mtime,
+            "sha256": await asyncio.to_thread(file_sha256, pdf_path), "candidate_id": candidate_id, "aliases": []}
+    result = await run_pipeline([task], db_path, store=store, sections=sections, report_seconds=0,
+                                parser=get_pdf_parser())
+    if candidate_id not in result["candidate_ids"]:
+        raise RuntimeError(f"Re-ingesting {candidate_id} from {pdf_path} failed; see the ingestion log")
+    await asyncio.wrap_future(sql.call(forget_other_sources, candidate_id, task["manifest_path"]))
+
+    from query_processing.candidate_summaries import PRECOMPUTED_SUMMARIES, backfill_summaries
+    if PRECOMPUTED_SUMMARIES:
+        await asyncio.to_thread(backfill_summaries, db_path, [candidate_id])
+    return {"candidate_id": candidate_id, "source_file": pdf_path, "extractors": result["extractors"]}
+
+
+async def compact(db_path: str, stores: Optional[list] = None, chroma_dir: Optional[str] = None) -> dict:
+    """Reclaim space in both stores. Returns bytes before/after per file and what was dropped."""
+    if stores is None:
+        from db.chroma_store import CHROMA_DIR
+        stores, chroma_dir = _default_stores(), chroma_dir or CHROMA_DIR
+    chroma_db = os.path.join(chroma_dir, "chroma.sqlite3") if chroma_dir else None
+    files = [db_path] + ([chroma_db] if chroma_db and os.path.exists(chroma_db) else [])
+    before = _file_sizes(*files)
+
+    sql = await asyncio.to_thread(get_writer, db_path)
+    orphans = 0
+    for store in stores:
+        docs = await asyncio.to_thread(vector_candidates, store)
+        # Looked up after the scan: ingestion stores the SQL row before the documents,
+        # so a candidate whose documents were seen is in SQLite unless it was deleted
+        known = set(await asyncio.wrap_future(sql.call(existing_candidates, [c for c in set(docs.values()) if c])))
+        ids = [i for i, cid in docs.items() if cid not in known]
+        await asyncio.to_thread(delete_vector_ids, store, ids)
+        orphans += len(ids)
+    dropped = await asyncio.wrap_future(sql.call(compact_sql))
+    if chroma_db in files:
+        await asyncio.to_thread(vacuum_sqlite, chroma_db)
+
+    after = _file_sizes(*files)
+    return {"orphan_vectors": orphans, **dropped,
+            "files": {path: {"before": before[path], "after": after[path]} for path in files}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="./data/candidates.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+    delete = sub.add_parser("delete", help="delete candidates from SQLite and the vector stores")
+    delete.add_argument("candidate_ids", nargs="+")
+    replace = sub.add_parser("replace", help="re-ingest one candidate, keeping its id")
+    replace.add_argument("candidate_id")
+    replace.add_argument("--pdf", default=None, help="new resume (default: the candidate's source file)")
+    sub.add_parser("compact", help="drop orphaned vectors and VACUUM both stores")
+    args = parser.parse_args()
+
+    init_db(args.db).close()
+    if args.command == "delete":
+        result = asyncio.run(delete_candidates(args.db, args.candidate_ids))
+    elif args.command == "replace":
+        result = asyncio.run(replace_candidate(args.db, args.candidate_id, args.pdf))
+    else:
+        result = asyncio.run(compact(args.db))
+    print(json.dumps(result, indent=2))
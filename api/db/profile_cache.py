@@ -0,0 +1,71 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+from model.CandidateProfile import CandidateProfile
+from db.sql_store import data_generation, load_profile_json, load_candidate_profiles
+
+# Hot CandidateProfile objects by candidate id, shared by all request threads.
+# Any ingest or delete bumps the data generation, which drops the whole cache on
+# the next lookup, so an upserted candidate is never served stale (also when the
+# ingest ran in another process). There is no per-candidate invalidation: the
+# generation is the only signal that crosses processes, and it does not say
+# which rows changed. Cached profiles are shared: treat them as read-only.
+
+PROFILE_CACHE_ENABLED = os.getenv("PROFILE_CACHE_ENABLED", "1") == "1"
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "5000"))
+
+
+class ProfileCache:
+    def __init__(self, max_entries: int = PROFILE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CandidateProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, con, candidate_ids: List[str]) -> List[CandidateProfile]:
+        """Profiles for candidate_ids in input order; misses are loaded in one batch."""
+        generation = data_generation(con)
+        found = {}
+        with self._lock:
+            if generation != self.generation:
+                self._entries.clear()
+                self.generation = generation
+            for cid in candidate_ids:
+                profile = self._entries.get(cid)
+                if profile is not None:
+                    self._entries.move_to_end(cid)
+                    found[cid] = profile
+        missing = [cid for cid in dict.fromkeys(candidate_ids) if cid not in found]
+        self.hits += len(found)
+        self.misses += len(missing)
+        if missing:
+            loaded = {cid: CandidateProfile.model_validate_json(js)
+                      for cid, js in load_profile_json(con, missing).items()}
+            found.update(loaded)
+            with self._lock:
+                if self.generation == generation:
+                    for cid, profile in loaded.items():
+                        self._entries[cid] = profile
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return [found[cid] for cid in candidate_ids if cid in found]
+
+    def snapshot(self) -> dict:
+        total = self.hits + self.misses
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits,
+                "misses": self.misses, "hit_ratio": round(self.hits / total, 3) if total else 0.0}
+
+
+profile_cache = ProfileCache()
+
+
+def load_profiles_cached(con, candidate_ids: List[str]) -> List[CandidateProfile]:
+    """Drop-in for sql_store.load_candidate_profiles served through the profile LRU."""
+    if not candidate_ids:
+        return []
+    if not PROFILE_CACHE_ENABLED:
+        return load_candidate_profiles(con, candidate_ids)
+    return profile_cache.load(con, candidate_ids)
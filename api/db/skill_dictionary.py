@@ -0,0 +1,149 @@
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Canonical skill names with the spellings the extractor LLM tends to produce.
+# Keys are canonical display names; aliases are matched after normalize_skill.
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "Python": ["py", "python3", "python 3", "python2", "cpython"],
+    "JavaScript": ["js", "javascript es6", "es6", "ecmascript", "vanilla js"],
+    "TypeScript": ["ts"],
+    "Node.js": ["node", "nodejs", "node js"],
+    "React": ["react.js", "reactjs", "react js"],
+    "React Native": ["react-native", "reactnative"],
+    "Vue": ["vue.js", "vuejs", "vue js"],
+    "Angular": ["angular.js", "angularjs"],
+    "Next.js": ["nextjs", "next js"],
+    "Go": ["golang"],
+    "Java": ["java se", "java ee", "jdk"],
+    "Kotlin": [],
+    "Scala": [],
+    "Ruby": [],
+    "PHP": [],
+    "Swift": [],
+    "Rust": [],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    "C++": ["cpp", "c plus plus"],
+    "C#": ["csharp", "c sharp"],
+    ".NET": ["dotnet", "dot net", ".net core", "asp.net"],
+    "PostgreSQL": ["postgres", "postgre", "psql", "postgresql db"],
+    "MySQL": ["my sql"],
+    "MongoDB": ["mongo"],
+    "Microsoft SQL Server": ["mssql", "sql server", "ms sql"],
+    "Elasticsearch": ["elastic search", "elastic"],
+    "Kubernetes": ["k8s", "kube"],
+    "Docker": ["docker compose", "docker-compose"],
+    "Terraform": ["hashicorp terraform"],
+    "AWS": ["amazon web services", "aws cloud"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "Azure": ["microsoft azure", "azure cloud"],
+    "CI/CD": ["cicd", "ci cd", "ci-cd", "continuous integration", "continuous delivery"],
+    "REST APIs": ["rest", "rest api", "restful", "restful apis", "restful api"],
+    "GraphQL": ["graph ql"],
+    "Scikit-learn": ["sklearn", "scikit learn", "scikit"],
+    "TensorFlow": ["tensor flow"],
+    "PyTorch": ["torch"],
+    "Pandas": ["pandas dataframe"],
+    "Apache Spark": ["spark", "pyspark"],
+    "Apache Kafka": ["kafka"],
+    "Apache Airflow": ["airflow"],
+    "Machine Learning": ["ml"],
+    "Deep Learning": ["dl"],
+    "Natural Language Processing": ["nlp"],
+    "Spring Boot": ["springboot", "spring"],
+    "Django": ["django rest framework", "drf"],
+    "Git": ["git version control"],
+    "Jest": ["jestjs"],
+    "Pytest": ["py.test"],
+}
+
+_WS_RE = re.compile(r"\s+")
+_VERSION_RE = re.compile(r"^(.*?[a-z+#])[\s-]?v?\d+(\.\d+)*$")
+
+
+def normalize_skill(raw: str) -> str:
+    return _WS_RE.sub(" ", (raw or "").strip().lower())
+
+
+def _alias_map() -> Dict[str, str]:
+    aliases = {}
+    for canonical, spellings in SKILL_ALIASES.items():
+        aliases[normalize_skill(canonical)] = canonical
+        for s in spellings:
+            aliases.setdefault(normalize_skill(s), canonical)
+    return aliases
+
+ALIASES = _alias_map()
+
+
+def version_base(norm: str) -> Optional[str]:
+    """A normalized skill without its trailing version ("java 17" -> "java"), or None."""
+    m = _VERSION_RE.match(norm)
+    return m.group(1).strip() if m else None
+
+
+def canonical_skill(raw: str) -> Optional[str]:
+    """
+    Canonical display name for a raw skill string from the seeded alias
+    table, also with a trailing version stripped ("Java 17", "python3").
+    Other skills keep their own (trimmed) spelling; resolve_skill_id also
+    strips versions of skills already in the database's dictionary.
+    """
+    norm = normalize_skill(raw)
+    if not norm:
+        return None
+    if norm in ALIASES:
+        return ALIASES[norm]
+    base = version_base(norm)
+    if base in ALIASES:
+        return ALIASES[base]
+    return _WS_RE.sub(" ", raw.strip())
+
+
+def seed_skill_dictionary(con):
+    # Seeded spellings are authoritative: they replace whatever an earlier ingest registered for them
+    for alias, canonical in ALIASES.items():
+        con.execute("INSERT OR REPLACE INTO skill_aliases(alias, skill_id) VALUES (?, ?)",
+                    (alias, skill_id_for_canonical(con, canonical)))
+
+
+def skill_id_for_canonical(con, canonical: str) -> int:
+    con.execute("INSERT OR IGNORE INTO skill_dict(name) VALUES (?)", (canonical,))
+    return con.execute("SELECT id FROM skill_dict WHERE name = ?", (canonical,)).fetchone()[0]
+
+
+def resolve_skill_id(con, raw: str, create: bool = True) -> Optional[int]:
+    """Map a raw skill string onto skill_dict.id, registering new skills and aliases at ingest."""
+    norm = normalize_skill(raw)
+    if not norm:
+        return None
+    row = con.execute("SELECT skill_id FROM skill_aliases WHERE alias = ?", (norm,)).fetchone()
+    if row:
+        return row[0]
+    base = version_base(norm)
+    row = con.execute("SELECT skill_id FROM skill_aliases WHERE alias = ?", (base,)).fetchone() if base else None
+    if row:
+        # A versioned spelling of a known skill ("elixir 1.15" once "elixir" is in the dictionary)
+        if create:
+            con.execute("INSERT OR IGNORE INTO skill_aliases(alias, skill_id) VALUES (?, ?)", (norm, row[0]))
+        return row[0]
+    canonical = canonical_skill(raw)
+    if not create:
+        row = con.execute("SELECT id FROM skill_dict WHERE name = ?", (canonical,)).fetchone()
+        return row[0] if row else None
+    skill_id = skill_id_for_canonical(con, canonical)
+    con.execute("INSERT OR IGNORE INTO skill_aliases(alias, skill_id) VALUES (?, ?)", (norm, skill_id))
+    return skill_id
+
+
+def resolve_skill_ids(con, skills: Iterable[str]) -> List[Optional[int]]:
+    """Query-time lookup: one id (or None for unknown skills) per distinct input skill."""
+    out = []
+    seen = set()
+    for s in skills:
+        norm = normalize_skill(s)
+        if not norm or norm in seen:
+            continue
+        seen.add(norm)
+        out.append(resolve_skill_id(con, s, create=False))
+    return out
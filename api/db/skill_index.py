@@ -0,0 +1,114 @@
+import os
+import re
+import time
+import threading
+from typing import Dict, Iterable, List, Optional
+from db.sql_store import data_generation, ids_by_skills as ids_by_skills_sql
+from db.skill_dictionary import resolve_skill_ids
+
+# In-memory inverted index skill_id -> set of candidates, stored as compact
+# bitsets (Python ints, bit n = candidates.rowid n). Multi-skill AND/OR is a
+# handful of big-int &/| operations instead of a GROUP BY over the link table.
+
+SKILL_INDEX_ENABLED = os.getenv("SKILL_INDEX_ENABLED", "1") == "1"
+# Minimum seconds between rebuilds when ingestion keeps bumping the generation
+SKILL_INDEX_REFRESH_SECONDS = float(os.getenv("SKILL_INDEX_REFRESH_SECONDS", "5"))
+
+_NONZERO_RE = re.compile(rb"[^\x00]")
+
+
+class SkillIndex:
+    def __init__(self, bitsets: Dict[int, int], rowid_to_id: Dict[int, str], generation: int):
+        self.bitsets = bitsets
+        self.rowid_to_id = rowid_to_id
+        self.generation = generation
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, con) -> "SkillIndex":
+        generation = data_generation(con)
+        rowid_to_id = dict(con.execute("SELECT rowid, id FROM candidates").fetchall())
+        nbytes = (max(rowid_to_id, default=0) >> 3) + 1
+        maps: Dict[int, bytearray] = {}
+        for skill_id, rowid in con.execute(
+            "SELECT cs.skill_id, c.rowid FROM candidate_skills cs JOIN candidates c ON c.id = cs.candidate_id"
+        ):
+            bm = maps.get(skill_id)
+            if bm is None:
+                bm = maps[skill_id] = bytearray(nbytes)
+            bm[rowid >> 3] |= 1 << (rowid & 7)
+        bitsets = {skill_id: int.from_bytes(bm, "little") for skill_id, bm in maps.items()}
+        return cls(bitsets, rowid_to_id, generation)
+
+    def bits_for(self, skill_ids: List[Optional[int]], mode: str = "and") -> int:
+        if not skill_ids:
+            return 0
+        if mode.lower() == "or":
+            bits = 0
+            for sid in skill_ids:
+                bits |= self.bitsets.get(sid, 0) if sid is not None else 0
+            return bits
+        if None in skill_ids:
+            return 0
+        # Intersect smallest first so the running value shrinks fast
+        sets = sorted((self.bitsets.get(sid, 0) for sid in set(skill_ids)), key=int.bit_count)
+        bits = sets[0]
+        for other in sets[1:]:
+            if not bits:
+                break
+            bits &= other
+        return bits
+
+    def candidate_ids(self, bits: int) -> List[str]:
+        if not bits:
+            return []
+        data = bits.to_bytes((bits.bit_length() + 7) >> 3, "little")
+        out = []
+        for m in _NONZERO_RE.finditer(data):
+            i = m.start()
+            byte = data[i]
+            for b in range(8):
+                if byte >> b & 1:
+                    cid = self.rowid_to_id.get((i << 3) | b)
+                    if cid is not None:
+                        out.append(cid)
+        return out
+
+    def count(self, skill_ids: List[Optional[int]], mode: str = "and") -> int:
+        return self.bits_for(skill_ids, mode).bit_count()
+
+
+_indexes: Dict[str, SkillIndex] = {}      # by database file
+_index_lock = threading.Lock()
+
+
+def get_skill_index(con) -> SkillIndex:
+    """
+    Current index of con's database, rebuilt when the data generation moved.
+    During a bulk ingest rebuilds happen at most every
+    SKILL_INDEX_REFRESH_SECONDS, so results may trail the newest candidates
+    by that much.
+    """
+    db_file = con.execute("PRAGMA database_list").fetchone()[2]
+    index = _indexes.get(db_file)
+    if index is not None:
+        if index.generation == data_generation(con):
+            return index
+        if time.monotonic() - index.built_at < SKILL_INDEX_REFRESH_SECONDS:
+            return index
+    with _index_lock:
+        index = _indexes.get(db_file)
+        if index is None or index.generation != data_generation(con):
+            _indexes[db_file] = index = SkillIndex.build(con)
+    return index
+
+
+def ids_by_skills(con, skills: Iterable[str], mode: str = "and") -> List[str]:
+    """Drop-in for sql_store.ids_by_skills served from the in-memory bitsets."""
+    if not SKILL_INDEX_ENABLED:
+        return ids_by_skills_sql(con, skills, mode)
+    skill_ids = resolve_skill_ids(con, skills)
+    if not skill_ids:
+        return []
+    index = get_skill_index(con)
+    return index.candidate_ids(index.bits_for(skill_ids, mode))
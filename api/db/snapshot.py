@@ -0,0 +1,270 @@
+"""
+Snapshots of the full index (SQLite + Chroma) for cold starts and replicas.
+
+Layout of a snapshot directory:
+    manifest.json                  format, pipeline/parser versions, embedding model,
+                                   per-collection count and dim, sha256 of every file
+    candidates.db                  SQLite online-backup copy (rollback journal mode)
+    vectors/<collection>.f32       float32 vectors, row-major, count x dim
+    vectors/<collection>.jsonl     one {"id", "metadata", "document"} per vector row
+
+create_snapshot works while the API is serving: the SQLite backup is a
+consistent copy taken without blocking ingestion writes. PDF ingestion marks a
+candidate in ingest_in_flight when it commits its rows, before embedding it,
+and clears the mark with its ingest_manifest row. New candidates still marked
+are dropped from the copy, and only vectors of candidates left in it are
+exported. Bulk-loaded candidates are never marked. A re-ingest in flight keeps
+its old manifest row, so the restored node re-processes that file on its next
+ingestion run. restore_snapshot verifies checksums,
+copies the database back with the backup API and bulk-adds the stored
+vectors to Chroma (no embeddings requests).
+
+Usage (from the api folder):
+    python -m db.snapshot create data/snapshots/2025-01-01
+    python -m db.snapshot restore data/snapshots/2025-01-01 [--force] [--no-verify]
+"""
+import os
+import json
+import shutil
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+from db.sql_store import init_db, bump_data_generation, data_generation
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_DB = "candidates.db"
+SNAPSHOT_PAGE = int(os.getenv("SNAPSHOT_PAGE", "5000"))                  # vectors read per Chroma get()
+RESTORE_BATCH = int(os.getenv("SNAPSHOT_RESTORE_BATCH", "5000"))         # vectors per Chroma add()
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def _default_stores() -> list:
+    from db.chroma_store import store, section_store
+    return [store, section_store]
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_BYTES), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _versions() -> dict:
+    from cv_processing.ingest_manifest import INGEST_PIPELINE_VERSION
+    from cv_processing.parse_service import PARSER_VERSION
+    from db.chroma_store import EMBEDDING_MODEL, VECTOR_INDEX_MODE
+    return {"pipeline_version": INGEST_PIPELINE_VERSION, "parser_version": PARSER_VERSION,
+            "embedding_model": EMBEDDING_MODEL, "vector_index_mode": VECTOR_INDEX_MODE}
+
+
+# ---- Create ----
+
+def backup_sqlite(db_path: str, dest: str) -> int:
+    """Consistent copy of db_path at dest; returns its data generation."""
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(dest)
+    try:
+        # One step: the copy is a single read transaction, which in WAL mode does not block writers
+        src.backup(dst)
+        # A self-contained file: no -wal/-shm next to it, so the checksum stays valid
+        dst.execute("PRAGMA journal_mode=DELETE")
+        return data_generation(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def drop_unfinished(con) -> int:
+    """Delete new candidates whose PDF ingestion has not finished; returns how many."""
+    if not con.execute("SELECT 1 FROM sqlite_master WHERE name = 'ingest_in_flight'").fetchone():
+        return 0      # database last opened before in-flight marks existed
+    con.execute("PRAGMA foreign_keys=ON")     # their child rows, summaries and journal links cascade
+    with con:
+        return con.execute("""
+          DELETE FROM candidates WHERE id IN (SELECT candidate_id FROM ingest_in_flight)
+            AND id NOT IN (SELECT candidate_id FROM ingest_manifest)
+        """).rowcount
+
+
+def export_vectors(store, folder: str, candidate_ids: set, page: int = SNAPSHOT_PAGE) -> dict:
+    """Write the store's vectors for candidate_ids to <folder>/<collection>.f32/.jsonl."""
+    name = store._collection.name
+    vec_path, rec_path = os.path.join(folder, f"{name}.f32"), os.path.join(folder, f"{name}.jsonl")
+    # Page by id rather than offset: OFFSET re-scans every skipped row
+    ids = store.get(include=[])["ids"]
+    count, dim = 0, None
+    with open(vec_path, "wb") as vf, open(rec_path, "w", encoding="utf-8") as rf:
+        for i in range(0, len(ids), page):
+            got = store.get(ids=ids[i:i + page], include=["embeddings", "metadatas", "documents"])
+            keep = [j for j, meta in enumerate(got["metadatas"]) if (meta or {}).get("candidate_id") in candidate_ids]
+            if not keep:
+                continue
+            vectors = np.asarray(got["embeddings"], dtype="<f4")[keep]
+            dim = vectors.shape[1] if dim is None else dim
+            vf.write(vectors.tobytes())
+            for j in keep:
+                rf.write(json.dumps({"id": got["ids"][j], "metadata": got["metadatas"][j],
+                                     "document": got["documents"][j]}, ensure_ascii=False) + "\n")
+            count += len(keep)
+    return {"count": count, "dim": dim or 0, "vectors": f"vectors/{name}.f32", "records": f"vectors/{name}.jsonl"}
+
+
+def create_snapshot(db_path: str, out_dir: str, stores: Optional[list] = None) -> dict:
+    """Write a snapshot to out_dir (built next to it and renamed into place). Returns the manifest."""
+    stores = _default_stores() if stores is None else stores
+    if os.path.exists(out_dir):
+        raise FileExistsError(out_dir)
+    tmp = out_dir.rstrip("/") + ".partial"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(os.path.join(tmp, "vectors"))
+    try:
+        generation = backup_sqlite(db_path, os.path.join(tmp, SNAPSHOT_DB))
+        con = sqlite3.connect(os.path.join(tmp, SNAPSHOT_DB))
+        try:
+            in_flight = drop_unfinished(con)
+            candidate_ids = {r[0] for r in con.execute("SELECT id FROM candidates")}
+            if in_flight:
+                con.execute("VACUUM")
+        finally:
+            con.close()
+        collections = {s._collection.name: export_vectors(s, os.path.join(tmp, "vectors"), candidate_ids)
+                       for s in stores}
+        files = [SNAPSHOT_DB] + [c[k] for c in collections.values() for k in ("vectors", "records")]
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            **_versions(),
+            "data_generation": generation,
+            "candidates": len(candidate_ids),
+            "skipped_in_flight": in_flight,
+            "collections": collections,
+            "files": {f: {"bytes": os.path.getsize(os.path.join(tmp, f)), "sha256": _sha256(os.path.join(tmp, f))}
+                      for f in files},
+        }
+        with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=2)
+        os.replace(tmp, out_dir)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return manifest
+
+
+# ---- Restore ----
+
+def read_manifest(snapshot_dir: str, verify: bool = True) -> dict:
+    """The snapshot's manifest; raises ValueError for an unknown format or a checksum mismatch."""
+    with open(os.path.join(snapshot_dir, "manifest.json"), encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {manifest.get('format')}")
+    if verify:
+        for name, meta in manifest["files"].items():
+            if _sha256(os.path.join(snapshot_dir, name)) != meta["sha256"]:
+                raise ValueError(f"Checksum mismatch for {name}")
+    return manifest
+
+
+def restore_sqlite(snapshot_db: str, db_path: str):
+    src = sqlite3.connect(f"file:{os.path.abspath(snapshot_db)}?mode=ro", uri=True)
+    dst = sqlite3.connect(db_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    # Apply schema added since the snapshot was taken, and make every cache keyed on the generation reload
+    con = init_db(db_path)
+    try:
+        with con:
+            bump_data_generation(con)
+    finally:
+        con.close()
+
+
+def import_vectors(store, snapshot_dir: str, meta: dict, batch: int = RESTORE_BATCH):
+    collection = store._collection
+    batch = min(batch, store._client.get_max_batch_size())
+    row_bytes = meta["dim"] * 4
+    with open(os.path.join(snapshot_dir, meta["vectors"]), "rb") as vf, \
+            open(os.path.join(snapshot_dir, meta["records"]), encoding="utf-8") as rf:
+        while True:
+            records = [json.loads(line) for _, line in zip(range(batch), rf)]
+            if not records:
+                return
+            vectors = np.frombuffer(vf.read(row_bytes * len(records)), dtype="<f4").reshape(len(records), meta["dim"])
+            collection.add(ids=[r["id"] for r in records], embeddings=vectors,
+                           metadatas=[r["metadata"] for r in records], documents=[r["document"] for r in records])
+
+
+def candidate_count(db_path: str) -> int:
+    if not os.path.exists(db_path):
+        return 0
+    con = sqlite3.connect(db_path)
+    try:
+        return con.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        con.close()
+
+
+def restore_snapshot(snapshot_dir: str, db_path: str, stores: Optional[list] = None, force: bool = False,
+                     verify: bool = True) -> dict:
+    """
+    Load a snapshot into db_path and the vector stores. Refuses to overwrite
+    a non-empty database or collection unless force. Raises ValueError when
+    the snapshot was embedded with a different model than this node uses.
+    """
+    stores = _default_stores() if stores is None else stores
+    manifest = read_manifest(snapshot_dir, verify)
+    current = _versions()
+    if manifest["embedding_model"] != current["embedding_model"]:
+        raise ValueError(f"Snapshot embedded with {manifest['embedding_model']}, "
+                         f"this node queries with {current['embedding_model']}")
+    if manifest["pipeline_version"] != current["pipeline_version"]:
+        print(f"Snapshot pipeline version {manifest['pipeline_version']} != {current['pipeline_version']}: "
+              f"the next ingestion run will re-process every file")
+    by_name: Dict[str, object] = {s._collection.name: s for s in stores}
+    missing = [name for name in manifest["collections"] if name not in by_name]
+    if missing:
+        raise ValueError(f"No vector store for collection(s) {', '.join(missing)}")
+    if not force:
+        busy: List[str] = [db_path] if candidate_count(db_path) else []
+        busy += [n for n in manifest["collections"] if by_name[n]._collection.count()]
+        if busy:
+            raise FileExistsError(f"Not empty: {', '.join(busy)} (use force to overwrite)")
+
+    restore_sqlite(os.path.join(snapshot_dir, SNAPSHOT_DB), db_path)
+    for name, meta in manifest["collections"].items():
+        store = by_name[name]
+        if store._collection.count():
+            store.reset_collection()
+        import_vectors(store, snapshot_dir, meta)
+    return {"candidates": manifest["candidates"],
+            "vectors": {name: meta["count"] for name, meta in manifest["collections"].items()}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="./data/candidates.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+    create = sub.add_parser("create", help="write a snapshot of the database and vector stores")
+    create.add_argument("path")
+    restore = sub.add_parser("restore", help="load a snapshot into an empty node")
+    restore.add_argument("path")
+    restore.add_argument("--force", action="store_true", help="overwrite a non-empty database and collections")
+    restore.add_argument("--no-verify", action="store_true", help="skip the checksum pass")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        result = create_snapshot(args.db, args.path)
+        result = {k: v for k, v in result.items() if k != "files"}
+    else:
+        result = restore_snapshot(args.path, args.db, force=args.force, verify=not args.no_verify)
+    print(json.dumps(result, indent=2))
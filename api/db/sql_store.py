@@ -1,11 +1,75 @@
-import sqlite3, uuid
+import os, json, sqlite3, threading, uuid
 from rapidfuzz import process, fuzz
 from typing import Optional, Tuple, Iterable, List, Dict
 from model.CandidateProfile import CandidateProfile, EducationItem, ExperienceItem, LinkItem, CertificationItem
+from db.skill_dictionary import seed_skill_dictionary, resolve_skill_id, resolve_skill_ids
 
-def init_db(db_path="./data/candidates.db"):
-    con = sqlite3.connect(db_path)
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "db_schema.sql")
+
+FTS_VERSION = "1"
+FTS_TABLES = ("experience_fts", "education_fts", "candidates_fts", "resume_fts")
+FTS_MIN_CHARS = 3  # trigram indexes cannot answer shorter substrings
+SKILL_DICT_VERSION = "2"
+
+def init_db(db_path="./data/candidates.db", check_same_thread: bool = True):
+    con = sqlite3.connect(db_path, check_same_thread=check_same_thread)
     con.execute("PRAGMA foreign_keys=ON;")
+    with open(SCHEMA_PATH, encoding="utf-8") as fh:
+        con.executescript(fh.read())
+    ensure_fts(con)
+    ensure_skill_dictionary(con)
+    return con
+
+def rebuild_fts(con):
+    """Re-index every FTS table from its content table."""
+    with con:
+        for table in FTS_TABLES:
+            con.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        con.execute("INSERT OR REPLACE INTO schema_meta(key, value) VALUES ('fts_version', ?)", (FTS_VERSION,))
+
+def ensure_skill_dictionary(con):
+    # Seed aliases and (re)map every stored skill when the dictionary or its matching rules change
+    row = con.execute("SELECT value FROM schema_meta WHERE key='skill_dict_version'").fetchone()
+    if row and row[0] == SKILL_DICT_VERSION:
+        return
+    with con:
+        # Learned spellings are re-resolved under the current rules ("java 17" now maps onto Java)
+        con.execute("DELETE FROM candidate_skills")
+        con.execute("DELETE FROM skill_aliases")
+        seed_skill_dictionary(con)
+        ids = {}
+        for (skill,) in con.execute("SELECT DISTINCT skill FROM skills ORDER BY length(skill)").fetchall():
+            ids[skill] = resolve_skill_id(con, skill)
+        con.executemany(
+            "INSERT OR IGNORE INTO candidate_skills(candidate_id, skill_id) VALUES (?, ?)",
+            ((cid, ids[skill]) for cid, skill in con.execute("SELECT candidate_id, skill FROM skills").fetchall()
+             if ids.get(skill) is not None)
+        )
+        con.execute("DELETE FROM skill_dict WHERE id NOT IN (SELECT skill_id FROM skill_aliases)")
+        con.execute("INSERT OR REPLACE INTO schema_meta(key, value) VALUES ('skill_dict_version', ?)", (SKILL_DICT_VERSION,))
+        if row:
+            bump_data_generation(con)
+
+def ensure_fts(con):
+    # Databases created before the FTS tables existed have rows the triggers never saw
+    row = con.execute("SELECT value FROM schema_meta WHERE key='fts_version'").fetchone()
+    if not row or row[0] != FTS_VERSION:
+        rebuild_fts(con)
+
+_thread_local = threading.local()
+
+def thread_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Return a connection owned by the calling thread, opening it on first use.
+    sqlite3 connections cannot be shared across threads, so executor workers
+    keep one connection per db_path for their whole lifetime.
+    """
+    cons = getattr(_thread_local, "cons", None)
+    if cons is None:
+        cons = _thread_local.cons = {}
+    con = cons.get(db_path)
+    if con is None:
+        con = cons[db_path] = init_db(db_path)
     return con
 
 def upsert_candidate(con, candidate_id: str, profile, source_file: str | None):
@@ -52,6 +116,18 @@ def insert_skills(con, candidate_id: str, skills: list[str]):
     for s in skills or []:
         con.execute("INSERT OR IGNORE INTO skills(candidate_id, skill) VALUES (?,?)",
                     (candidate_id, s))
+        skill_id = resolve_skill_id(con, s)
+        if skill_id is not None:
+            con.execute("INSERT OR IGNORE INTO candidate_skills(candidate_id, skill_id) VALUES (?,?)",
+                        (candidate_id, skill_id))
+
+def upsert_resume_text(con, candidate_id: str, text: str | None):
+    if not text:
+        return
+    con.execute("""
+      INSERT INTO resume_texts(candidate_id, text) VALUES (?, ?)
+      ON CONFLICT(candidate_id) DO UPDATE SET text=excluded.text
+    """, (candidate_id, text))
 
 def insert_certifications(con, candidate_id: str, certs):
     for c in certs or []:
@@ -60,35 +136,177 @@ def insert_certifications(con, candidate_id: str, certs):
           VALUES (?,?,?,?)
         """, (candidate_id, c.name, c.year, c.issuer))
 
-def store_profile(db_path: str, profile, source_file: str | None = None, candidate_id: str | None = None) -> str:
+def data_generation(con) -> int:
+    row = con.execute("SELECT generation FROM data_generation WHERE id=1").fetchone()
+    return row[0] if row else 0
+
+def bump_data_generation(con) -> int:
+    con.execute("UPDATE data_generation SET generation = generation + 1 WHERE id=1")
+    return data_generation(con)
+
+def store_profile(db_path: str, profile, source_file: str | None = None, candidate_id: str | None = None,
+                  resume_text: str | None = None) -> str:
     candidate_id = candidate_id or str(uuid.uuid4())
     con = init_db(db_path)
     try:
         with con:
+            # Re-ingesting an existing candidate replaces its rows instead of merging them
+            delete_candidate_children(con, [candidate_id])
             upsert_candidate(con, candidate_id, profile, source_file)
             insert_links(con, candidate_id, profile.links)
             insert_education(con, candidate_id, profile.education)
             insert_experience(con, candidate_id, profile.experience)
             insert_skills(con, candidate_id, profile.skills)
             insert_certifications(con, candidate_id, profile.certifications)
+            upsert_resume_text(con, candidate_id, resume_text)
+            bump_data_generation(con)
     finally:
         con.close()
     return candidate_id
 
+# Per-candidate rows replaced when a profile is re-loaded
+CHILD_TABLES = ("links", "education", "experience", "skills", "candidate_skills", "certifications", "resume_texts")
+
+def delete_candidate_children(con, candidate_ids: List[str]):
+    for i in range(0, len(candidate_ids), SQL_MAX_VARIABLES):
+        chunk = candidate_ids[i:i + SQL_MAX_VARIABLES]
+        for table in CHILD_TABLES:
+            con.execute(f"DELETE FROM {table} WHERE candidate_id IN ({_ph(len(chunk))})", chunk)
+
+def store_profiles_bulk(con, rows: List[Tuple[str, object, Optional[str], Optional[str]]],
+                        skill_ids: Optional[Dict[str, Optional[int]]] = None, in_flight: Iterable[str] = ()) -> int:
+    """
+    Write many (candidate_id, profile, source_file, resume_text) rows in one
+    transaction with one executemany per table. A re-loaded candidate's child
+    rows are replaced rather than merged; when a candidate id appears more than
+    once, its last row wins. `skill_ids` caches raw skill -> skill_dict id
+    across calls. Ids in `in_flight` are marked as stored but not yet recorded
+    in the ingest manifest (see record_ingested).
+    """
+    if not rows:
+        return 0
+    rows = list({row[0]: row for row in rows}.values())
+    skill_ids = {} if skill_ids is None else skill_ids
+    with con:
+        delete_candidate_children(con, [cid for cid, _, _, _ in rows])
+        con.executemany("""
+          INSERT INTO candidates (id, full_name, email, phone, location, summary, source_file)
+          VALUES (?, ?, ?, ?, ?, ?, ?)
+          ON CONFLICT(id) DO UPDATE SET
+            full_name=excluded.full_name,
+            email=excluded.email,
+            phone=excluded.phone,
+            location=excluded.location,
+            summary=excluded.summary,
+            source_file=COALESCE(excluded.source_file, candidates.source_file)
+        """, [(cid, p.full_name, p.email, p.phone, p.location, p.summary, src) for cid, p, src, _ in rows])
+        con.executemany("INSERT OR IGNORE INTO links(candidate_id, type, url) VALUES (?,?,?)",
+                        [(cid, l.type or "other", l.url) for cid, p, _, _ in rows for l in p.links or []])
+        con.executemany("""
+          INSERT OR IGNORE INTO education(candidate_id, institution, degree, field, start_year, end_year)
+          VALUES (?,?,?,?,?,?)
+        """, [(cid, e.institution, e.degree, e.field, e.start_year, e.end_year)
+              for cid, p, _, _ in rows for e in p.education or []])
+        con.executemany("""
+          INSERT OR IGNORE INTO experience(candidate_id, company, title, start, end, description)
+          VALUES (?,?,?,?,?,?)
+        """, [(cid, x.company, x.title, x.start, x.end, x.description)
+              for cid, p, _, _ in rows for x in p.experience or []])
+        skill_rows = [(cid, s) for cid, p, _, _ in rows for s in p.skills or []]
+        for _, s in skill_rows:
+            if s not in skill_ids:
+                skill_ids[s] = resolve_skill_id(con, s)
+        con.executemany("INSERT OR IGNORE INTO skills(candidate_id, skill) VALUES (?,?)", skill_rows)
+        con.executemany("INSERT OR IGNORE INTO candidate_skills(candidate_id, skill_id) VALUES (?,?)",
+                        [(cid, skill_ids[s]) for cid, s in skill_rows if skill_ids[s] is not None])
+        con.executemany("""
+          INSERT OR IGNORE INTO certifications(candidate_id, name, year, issuer)
+          VALUES (?,?,?,?)
+        """, [(cid, c.name, c.year, c.issuer) for cid, p, _, _ in rows for c in p.certifications or []])
+        con.executemany("INSERT INTO resume_texts(candidate_id, text) VALUES (?, ?)",
+                        [(cid, text) for cid, _, _, text in rows if text])
+        con.executemany("INSERT OR IGNORE INTO ingest_in_flight(candidate_id) VALUES (?)", [(cid,) for cid in in_flight])
+        bump_data_generation(con)
+    return len(rows)
+
+def manifest_entries(con) -> Dict[str, tuple]:
+    """path -> (size, mtime, sha256, candidate_id, pipeline_version) for every ingested file."""
+    return {r[0]: r[1:] for r in con.execute(
+        "SELECT path, size, mtime, sha256, candidate_id, pipeline_version FROM ingest_manifest")}
+
+def manifest_by_hash(con, sha256: str, pipeline_version: str) -> Optional[str]:
+    row = con.execute(
+        "SELECT candidate_id FROM ingest_manifest WHERE sha256 = ? AND pipeline_version = ? LIMIT 1",
+        (sha256, pipeline_version)
+    ).fetchone()
+    return row[0] if row else None
+
+def upsert_manifest(con, path: str, size: int, mtime: float, sha256: str, candidate_id: str, pipeline_version: str):
+    con.execute("""
+      INSERT INTO ingest_manifest(path, size, mtime, sha256, candidate_id, pipeline_version) VALUES (?, ?, ?, ?, ?, ?)
+      ON CONFLICT(path) DO UPDATE SET
+        size=excluded.size,
+        mtime=excluded.mtime,
+        sha256=excluded.sha256,
+        candidate_id=excluded.candidate_id,
+        pipeline_version=excluded.pipeline_version,
+        ingested_at=CURRENT_TIMESTAMP
+    """, (path, size, mtime, sha256, candidate_id, pipeline_version))
+
+def get_candidate_summary(con, candidate_id: str) -> Optional[Tuple[str, str]]:
+    """(content_hash, summary) of the stored summary, if any."""
+    return con.execute(
+        "SELECT content_hash, summary FROM candidate_summaries WHERE candidate_id = ?", (candidate_id,)
+    ).fetchone()
+
+def summary_hashes(con, candidate_ids: List[str]) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for i in range(0, len(candidate_ids), SQL_MAX_VARIABLES):
+        chunk = candidate_ids[i:i + SQL_MAX_VARIABLES]
+        out.update(con.execute(
+            f"SELECT candidate_id, content_hash FROM candidate_summaries WHERE candidate_id IN ({_ph(len(chunk))})",
+            chunk
+        ).fetchall())
+    return out
+
+def upsert_candidate_summary(con, candidate_id: str, content_hash: str, summary: str, model: str | None = None):
+    with con:
+        con.execute("""
+          INSERT INTO candidate_summaries(candidate_id, content_hash, summary, model) VALUES (?, ?, ?, ?)
+          ON CONFLICT(candidate_id) DO UPDATE SET
+            content_hash=excluded.content_hash,
+            summary=excluded.summary,
+            model=excluded.model,
+            created_at=CURRENT_TIMESTAMP
+        """, (candidate_id, content_hash, summary, model))
+
 def resolve_candidate(con: sqlite3.Connection, name_query: str, max_candidates: int = 20) -> Optional[Tuple[str, str]]:
     q = name_query.strip().lower()
 
-    # 1) LIKE shortlist
-    rows = con.execute(
-        """
-        SELECT id, full_name
-        FROM candidates
-        WHERE lower(full_name) LIKE ?
-        ORDER BY created_at DESC
-        LIMIT ?
-        """,
-        (f"%{q}%", max_candidates)
-    ).fetchall()
+    # 1) Substring shortlist (FTS trigram index; LIKE scan for very short names)
+    if len(q) >= FTS_MIN_CHARS:
+        rows = con.execute(
+            """
+            SELECT c.id, c.full_name
+            FROM candidates_fts f
+            JOIN candidates c ON c.rowid = f.rowid
+            WHERE candidates_fts MATCH ?
+            ORDER BY c.created_at DESC
+            LIMIT ?
+            """,
+            (fts_phrase("full_name", q), max_candidates)
+        ).fetchall()
+    else:
+        rows = con.execute(
+            """
+            SELECT id, full_name
+            FROM candidates
+            WHERE lower(full_name) LIKE ?
+            ORDER BY created_at DESC
+            LIMIT ?
+            """,
+            (f"%{q}%", max_candidates)
+        ).fetchall()
     
     if not rows:
         return None
@@ -110,126 +328,76 @@ def _ph(n: int) -> str:
 def _norm(s: Optional[str]) -> Optional[str]:
     return s.lower().strip() if isinstance(s, str) else None
 
+# SQLite's default bound-variable limit is 999 on older builds
+SQL_MAX_VARIABLES = 900
+
+PROFILE_JSON_SQL = """
+SELECT c.id, json_object(
+  'full_name', c.full_name,
+  'email', c.email,
+  'phone', c.phone,
+  'location', c.location,
+  'summary', c.summary,
+  'links', (SELECT json_group_array(json_object('type', type, 'url', url)) FROM (
+      SELECT COALESCE(type, 'other') AS type, url
+      FROM links WHERE candidate_id = c.id
+      ORDER BY id)),
+  'education', (SELECT json_group_array(json_object('institution', institution, 'degree', degree, 'field', field,
+                                                    'start_year', start_year, 'end_year', end_year)) FROM (
+      SELECT institution, degree, field, start_year, end_year
+      FROM education WHERE candidate_id = c.id
+      ORDER BY COALESCE(end_year, start_year) DESC, institution)),
+  'experience', (SELECT json_group_array(json_object('company', company, 'title', title, 'start', start,
+                                                     'end', "end", 'description', description)) FROM (
+      SELECT company, title, start, "end", description
+      FROM experience WHERE candidate_id = c.id
+      ORDER BY COALESCE(substr("end",1,4),'9999') DESC,
+               COALESCE(substr(start,1,4),'0000') DESC,
+               company)),
+  'skills', (SELECT json_group_array(skill) FROM (
+      SELECT skill FROM skills WHERE candidate_id = c.id AND skill <> ''
+      ORDER BY lower(skill))),
+  'certifications', (SELECT json_group_array(json_object('name', name, 'year', year, 'issuer', issuer)) FROM (
+      SELECT name, year, issuer
+      FROM certifications WHERE candidate_id = c.id
+      ORDER BY COALESCE(year, 0) DESC, lower(name)))
+)
+FROM candidates c
+WHERE c.id IN ({ph})
+"""
+
+def load_profile_json(con: sqlite3.Connection, candidate_ids: List[str]) -> Dict[str, str]:
+    """candidate_id -> profile JSON, one query per chunk of SQL_MAX_VARIABLES ids."""
+    out: Dict[str, str] = {}
+    ids = list(dict.fromkeys(candidate_ids))
+    for i in range(0, len(ids), SQL_MAX_VARIABLES):
+        chunk = ids[i:i + SQL_MAX_VARIABLES]
+        out.update(con.execute(PROFILE_JSON_SQL.format(ph=_ph(len(chunk))), chunk).fetchall())
+    return out
+
 def load_candidate_profiles(con: sqlite3.Connection, candidate_ids: List[str]) -> List[CandidateProfile]:
     """
     Batch load complete CandidateProfile objects for the given candidate_ids.
-    Runs one SELECT per table and assembles Pydantic objects.
+    Each profile is assembled as JSON inside SQLite and validated in one step.
+    Unknown ids are skipped; the input order is preserved.
     """
     if not candidate_ids:
         return []
+    by_id = load_profile_json(con, candidate_ids)
+    return [CandidateProfile.model_validate_json(by_id[cid]) for cid in candidate_ids if cid in by_id]
 
-    ph = _ph(len(candidate_ids))
-
-    # --- Base candidates ---
-    base_rows = con.execute(
-        f"""
-        SELECT id, full_name, email, phone, location, summary, source_file
-        FROM candidates
-        WHERE id IN ({ph})
-        """,
-        candidate_ids,
-    ).fetchall()
-    # id -> CandidateProfile (partially filled)
-    by_id: Dict[str, CandidateProfile] = {}
-    for cid, full_name, email, phone, location, summary, source_file in base_rows:
-        by_id[cid] = CandidateProfile(
-            full_name=full_name,
-            email=email,
-            phone=phone,
-            location=location,
-            links=[],
-            summary=summary,
-            skills=[],
-            education=[],
-            experience=[],
-            certifications=[]
-        )
-    if not by_id:
-        return []
-
-    # --- Links ---
-    rows = con.execute(
-        f"""
-        SELECT candidate_id, COALESCE(type,'other') as type, url
-        FROM links
-        WHERE candidate_id IN ({ph})
-        ORDER BY id
-        """,
-        candidate_ids,
-    ).fetchall()
-    for cid, typ, url in rows:
-        if cid in by_id:
-            by_id[cid].links.append(LinkItem(type=typ, url=url))
-
-    # --- Education (most recent first) ---
-    rows = con.execute(
-        f"""
-        SELECT candidate_id, institution, degree, field, start_year, end_year
-        FROM education
-        WHERE candidate_id IN ({ph})
-        ORDER BY COALESCE(end_year, start_year) DESC, institution
-        """,
-        candidate_ids,
-    ).fetchall()
-    for cid, inst, degree, field, sy, ey in rows:
-        if cid in by_id:
-            by_id[cid].education.append(EducationItem(
-                institution=inst, degree=degree, field=field,
-                start_year=sy, end_year=ey
-            ))
-
-    # --- Experience (most recent end/start first) ---
-    rows = con.execute(
-        f"""
-        SELECT candidate_id, company, title, start, "end", description
-        FROM experience
-        WHERE candidate_id IN ({ph})
-        ORDER BY COALESCE(substr("end",1,4),'9999') DESC,
-                 COALESCE(substr(start,1,4),'0000') DESC,
-                 company
-        """,
-        candidate_ids,
-    ).fetchall()
-    for cid, company, title, start, end, desc in rows:
-        if cid in by_id:
-            by_id[cid].experience.append(ExperienceItem(
-                company=company, title=title, start=start, end=end, description=desc,
-                skills=None, highlights=None  # not stored in SQL per your simplified schema
-            ))
-
-    # --- Skills (sorted) ---
-    rows = con.execute(
-        f"""
-        SELECT candidate_id, skill
-        FROM skills
-        WHERE candidate_id IN ({ph})
-        ORDER BY lower(skill)
-        """,
-        candidate_ids,
-    ).fetchall()
-    for cid, skill in rows:
-        if cid in by_id and skill:
-            by_id[cid].skills.append(skill)
-
-    # --- Certifications (recent first, then name) ---
-    rows = con.execute(
-        f"""
-        SELECT candidate_id, name, year, issuer
-        FROM certifications
-        WHERE candidate_id IN ({ph})
-        ORDER BY COALESCE(year, 0) DESC, lower(name)
-        """,
-        candidate_ids,
-    ).fetchall()
-    for cid, name, year, issuer in rows:
-        if cid in by_id:
-            by_id[cid].certifications.append(CertificationItem(
-                name=name, year=year, issuer=issuer
-            ))
-
-    # Preserve input order
-    return [by_id[cid] for cid in candidate_ids if cid in by_id]
 
+def source_files_for(con: sqlite3.Connection, candidate_ids: List[str]) -> Dict[str, str]:
+    """candidate_id -> source_file for the candidates that have one."""
+    out: Dict[str, str] = {}
+    ids = list(dict.fromkeys(candidate_ids))
+    for i in range(0, len(ids), SQL_MAX_VARIABLES):
+        chunk = ids[i:i + SQL_MAX_VARIABLES]
+        out.update(con.execute(
+            f"SELECT id, source_file FROM candidates WHERE id IN ({_ph(len(chunk))}) AND source_file IS NOT NULL",
+            chunk
+        ).fetchall())
+    return out
 
 def companies_for(con: sqlite3.Connection, candidate_id: str) -> List[str]:
     rows = con.execute(
@@ -246,79 +414,225 @@ def institutions_for(con: sqlite3.Connection, candidate_id: str) -> List[str]:
     return [r[0] for r in rows]
 
 def ids_by_skill(con, skill: str) -> list[str]:
-    """Single skill (case-insensitive)."""
-    return [r[0] for r in con.execute(
-        """
-        SELECT DISTINCT c.id
-        FROM candidates c
-        JOIN skills s ON s.candidate_id = c.id
-        WHERE lower(s.skill) = lower(?)
-        """,
-        (skill,)
-    ).fetchall()]
+    """Single skill (any alias of it)."""
+    return ids_by_skills(con, [skill])
 
 def ids_by_skills(con, skills: Iterable[str], mode: str = "and") -> list[str]:
-    skills = [s for s in {_norm(s) for s in skills} if s] 
-    if not skills:
+    """
+    Candidates having all (mode="and") or any (mode="or") of the skills,
+    matched on canonical skill ids so "py", "python3" and "Python" agree.
+    """
+    skill_ids = resolve_skill_ids(con, skills)
+    if not skill_ids:
         return []
     if mode.lower() == "or":
-        qmarks = ",".join("?" for _ in skills)
+        known = sorted({i for i in skill_ids if i is not None})
+        if not known:
+            return []
         rows = con.execute(
             f"""
-            SELECT DISTINCT c.id
-            FROM candidates c
-            JOIN skills s ON s.candidate_id = c.id
-            WHERE lower(s.skill) IN ({qmarks})
+            SELECT DISTINCT candidate_id
+            FROM candidate_skills
+            WHERE skill_id IN ({_ph(len(known))})
             """,
-            skills
+            known
         ).fetchall()
         return [r[0] for r in rows]
     else:
-        # AND semantics: count distinct matched skills == len(skills)
-        qmarks = ",".join("?" for _ in skills)
+        # AND semantics: an unknown skill matches nobody
+        if None in skill_ids:
+            return []
+        known = sorted(set(skill_ids))
         rows = con.execute(
             f"""
-            SELECT c.id
-            FROM candidates c
-            JOIN skills s ON s.candidate_id = c.id
-            WHERE lower(s.skill) IN ({qmarks})
-            GROUP BY c.id
-            HAVING COUNT(DISTINCT lower(s.skill)) = ?
+            SELECT candidate_id
+            FROM candidate_skills
+            WHERE skill_id IN ({_ph(len(known))})
+            GROUP BY candidate_id
+            HAVING COUNT(*) = ?
             """,
-            skills + [len(skills)]
+            known + [len(known)]
         ).fetchall()
         return [r[0] for r in rows]
 
-def ids_by_company(con, comp_like: str) -> list[str]:
-    return [r[0] for r in con.execute(
+def search_resume_text(con, fts_query: str, limit: int = 50) -> list[tuple[str, float]]:
+    """BM25-ranked (candidate_id, score) over resume text, best first (lower bm25 is better)."""
+    if not fts_query:
+        return []
+    return con.execute(
         """
-        SELECT DISTINCT c.id
-        FROM candidates c
-        JOIN experience e ON e.candidate_id = c.id
-        WHERE lower(e.company) LIKE lower(?)
+        SELECT r.candidate_id, bm25(resume_fts) AS score
+        FROM resume_fts
+        JOIN resume_texts r ON r.rowid = resume_fts.rowid
+        WHERE resume_fts MATCH ?
+        ORDER BY score
+        LIMIT ?
+        """,
+        (fts_query, limit)
+    ).fetchall()
+
+def fts_phrase(column: str, value: str) -> str:
+    """FTS5 query matching value as a substring of column (trigram tables)."""
+    return f'{column} : "{value.replace(chr(34), chr(34) * 2)}"'
+
+def _ids_by_like(con, table: str, column: str, value: str) -> list[str]:
+    # Legacy full scan; only used when the value is too short for the trigram index
+    return [r[0] for r in con.execute(
+        f"""
+        SELECT DISTINCT candidate_id
+        FROM {table}
+        WHERE lower({column}) LIKE lower(?)
         """,
-        (f"%{comp_like}%",)
+        (f"%{value}%",)
     ).fetchall()]
 
-def ids_by_institution(con, inst_like: str) -> list[str]:
+def _ids_by_fts(con, table: str, column: str, value: str) -> list[str]:
+    value = value.strip()
+    if len(value) < FTS_MIN_CHARS:
+        return _ids_by_like(con, table, column, value)
     return [r[0] for r in con.execute(
-        """
-        SELECT DISTINCT c.id
-        FROM candidates c
-        JOIN education e ON e.candidate_id = c.id
-        WHERE lower(e.institution) LIKE lower(?)
+        f"""
+        SELECT DISTINCT t.candidate_id
+        FROM {table}_fts f
+        JOIN {table} t ON t.id = f.rowid
+        WHERE {table}_fts MATCH ?
         """,
-        (f"%{inst_like}%",)
+        (fts_phrase(column, value),)
     ).fetchall()]
 
+def ids_by_company(con, comp_like: str) -> list[str]:
+    return _ids_by_fts(con, "experience", "company", comp_like)
+
+def ids_by_title(con, title_like: str) -> list[str]:
+    return _ids_by_fts(con, "experience", "title", title_like)
+
+def ids_by_institution(con, inst_like: str) -> list[str]:
+    return _ids_by_fts(con, "education", "institution", inst_like)
+
 def id_by_name(con, name_like: str) -> Optional[str]:
-    row = con.execute(
+    name_like = name_like.strip()
+    if len(name_like) < FTS_MIN_CHARS:
+        row = con.execute(
+            """
+            SELECT id FROM candidates
+            WHERE lower(full_name) LIKE lower(?)
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            (f"%{name_like}%",)
+        ).fetchone()
+    else:
+        row = con.execute(
+            """
+            SELECT c.id
+            FROM candidates_fts f
+            JOIN candidates c ON c.rowid = f.rowid
+            WHERE candidates_fts MATCH ?
+            ORDER BY c.created_at DESC
+            LIMIT 1
+            """,
+            (fts_phrase("full_name", name_like),)
+        ).fetchone()
+    return row[0] if row else None
+
+def _slot_rows(table: str, column: str, value: str) -> tuple[str, str]:
+    """FROM/WHERE clause (rows aliased t) matching value as a substring of table.column."""
+    value = value.strip()
+    if len(value) < FTS_MIN_CHARS:
+        return f"FROM {table} t WHERE lower(t.{column}) LIKE lower(?)", f"%{value}%"
+    return f"FROM {table}_fts f JOIN {table} t ON t.id = f.rowid WHERE {table}_fts MATCH ?", fts_phrase(column, value)
+
+def ranked_shortlist(con, skills: Optional[Iterable[str]] = None, company: Optional[str] = None,
+                     institution: Optional[str] = None, limit: int = 20,
+                     after: Optional[Tuple[float, str]] = None,
+                     weights: Optional[Dict[str, float]] = None, skill_mode: str = "and",
+                     skill_matches: Optional[Iterable[str]] = None) -> Tuple[List[dict], int, int]:
+    """
+    Candidates matching any of the slots, scored in SQL and returned best first:
+        skill * matched skills + company + institution + recency * (1 - years since the matching job ended / 10)
+    The skills slot matches ids_by_skills(skills, skill_mode): every skill by
+    default, any of them with skill_mode="or". Callers holding that set
+    already (db.skill_index) pass it as `skill_matches`.
+    Only `limit` rows leave SQLite. `after` is the (score, candidate_id) of the
+    last row of the previous page (keyset pagination). Returns (rows, total
+    matches, complete matches), where complete matches satisfy every slot.
+    """
+    w = {"skill": 2.0, "company": 3.0, "institution": 2.0, "recency": 1.0, **(weights or {})}
+    ctes, joins, params = [], [], []
+
+    resolved = resolve_skill_ids(con, skills or [])
+    skill_ids = sorted({i for i in resolved if i is not None})
+    if skill_ids:
+        if skill_matches is None:
+            skill_matches = ids_by_skills(con, skills, skill_mode)
+        # Ids from the in-memory index may trail a delete by a few seconds
+        ctes.append("skill_hits AS (SELECT c.id AS candidate_id FROM json_each(?) j JOIN candidates c ON c.id = j.value)")
+        params.append(json.dumps(list(skill_matches)))
+    if company and company.strip():
+        rows_sql, arg = _slot_rows("experience", "company", company)
+        ctes.append("company_hits AS (SELECT t.candidate_id, "
+                    "MAX(CAST(substr(COALESCE(t.end, strftime('%Y', 'now')), 1, 4) AS INTEGER)) AS last_year "
+                    f"{rows_sql} GROUP BY t.candidate_id)")
+        params.append(arg)
+    if institution and institution.strip():
+        rows_sql, arg = _slot_rows("education", "institution", institution)
+        ctes.append(f"inst_hits AS (SELECT DISTINCT t.candidate_id {rows_sql})")
+        params.append(arg)
+    if not ctes:
+        return [], 0, 0
+
+    names = [c.split(" ", 1)[0] for c in ctes]
+    matched = " UNION ".join(f"SELECT candidate_id FROM {n}" for n in names)
+    # Requested skills each matched candidate has: one probe of the link table's primary key per candidate
+    skill_count = "0"
+    if skill_ids:
+        skill_count = (f"(SELECT COUNT(*) FROM candidate_skills cs WHERE cs.candidate_id = m.candidate_id "
+                       f"AND cs.skill_id IN ({_ph(len(skill_ids))}))")
+        params += skill_ids
+    skill_n = "m.skill_n"
+    company_hit = "(c.candidate_id IS NOT NULL)" if "company_hits" in names else "0"
+    last_year = "c.last_year" if "company_hits" in names else "NULL"
+    inst_hit = "(i.candidate_id IS NOT NULL)" if "inst_hits" in names else "0"
+    # Every requested skill (an unknown one matches nobody), company and institution
+    complete = []
+    if resolved:
+        complete.append("0" if None in resolved else f"{skill_n} = {len(skill_ids)}")
+    if "company_hits" in names:
+        complete.append(company_hit)
+    if "inst_hits" in names:
+        complete.append(inst_hit)
+    for name, alias in (("company_hits", "c"), ("inst_hits", "i")):
+        if name in names:
+            joins.append(f"LEFT JOIN {name} {alias} ON {alias}.candidate_id = m.candidate_id")
+
+    params += [w["skill"], w["company"], w["institution"], w["recency"]]
+    sql = f"""
+        WITH {", ".join(ctes)},
+        matched(candidate_id) AS ({matched}),
+        counted AS (SELECT m.candidate_id, {skill_count} AS skill_n FROM matched m),
+        scored AS (
+            SELECT m.candidate_id,
+                   {skill_n} AS skill_hits,
+                   {company_hit} AS company_hit,
+                   {inst_hit} AS institution_hit,
+                   {last_year} AS last_year,
+                   ROUND(? * {skill_n} + ? * {company_hit} + ? * {inst_hit}
+                         + ? * MAX(0.0, 1.0 - (CAST(strftime('%Y', 'now') AS INTEGER) - COALESCE({last_year}, 0)) / 10.0), 4) AS score,
+                   COUNT(*) OVER () AS total,
+                   SUM({" AND ".join(complete)}) OVER () AS complete_total
+            FROM counted m
+            {" ".join(joins)}
+        )
+        SELECT candidate_id, score, skill_hits, company_hit, institution_hit, last_year, total, complete_total
+        FROM scored
+        WHERE ? IS NULL OR score < ? OR (score = ? AND candidate_id > ?)
+        ORDER BY score DESC, candidate_id
+        LIMIT ?
         """
-        SELECT id FROM candidates
-        WHERE lower(full_name) LIKE lower(?)
-        ORDER BY created_at DESC
-        LIMIT 1
-        """,
-        (f"%{name_like}%",)
-    ).fetchone()
-    return row[0] if row else None
\ No newline at end of file
+    after_score, after_id = after if after else (None, None)
+    rows = con.execute(sql, params + [after_score, after_score, after_score, after_id, limit]).fetchall()
+    counts = rows[0] if rows else (None if after is None else con.execute(sql, params + [None] * 4 + [1]).fetchone())
+    total, complete_total = (counts[6], counts[7]) if counts else (0, 0)
+    return [{"candidate_id": cid, "score": score, "skill_hits": n, "company_hit": bool(ch),
+             "institution_hit": bool(ih), "last_year": ly}
+            for cid, score, n, ch, ih, ly, _, _ in rows], total, complete_total
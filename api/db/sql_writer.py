@@ -0,0 +1,170 @@
+import os
+import time
+import uuid
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional
+from db.sql_store import init_db, store_profiles_bulk
+
+# Single SQLite writer for ingestion: one connection (WAL) on its own thread.
+# Callers enqueue profiles and get a Future with the candidate id; the thread
+# drains the queue and commits whole batches (one executemany per table), so
+# concurrent ingestion never contends for the write lock.
+
+WRITER_BATCH = int(os.getenv("WRITER_BATCH", "200"))
+# Seconds a partial batch waits for more profiles. 0 = group commit: take whatever queued up
+# during the previous commit. Only worth raising for open-loop producers that never await results.
+WRITER_MAX_WAIT = float(os.getenv("WRITER_MAX_WAIT", "0"))
+
+_STOP = object()
+
+
+class SqlWriter:
+    def __init__(self, db_path: str, batch_size: int = WRITER_BATCH, max_wait: float = WRITER_MAX_WAIT):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        # Unbounded so submit() never blocks an event loop; callers bound their own work in flight
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"profiles": 0, "batches": 0, "calls": 0, "failed": 0, "write_seconds": 0.0}
+
+    def start(self) -> "SqlWriter":
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                ready = Future()
+                self._thread = threading.Thread(target=self._run, args=(ready,), name="sql-writer", daemon=True)
+                self._thread.start()
+                ready.result()
+        return self
+
+    def submit(self, profile, source_file: Optional[str] = None, candidate_id: Optional[str] = None,
+               resume_text: Optional[str] = None, in_flight: bool = False) -> Future:
+        """
+        Queue a profile for the next batch. The Future resolves to its candidate
+        id once committed. in_flight marks the candidate as not yet recorded in
+        the ingest manifest (PDF ingestion; record_ingested clears it).
+        """
+        fut = Future()
+        row = (candidate_id or str(uuid.uuid4()), profile, source_file, resume_text)
+        self._queue.put(("profile", (row, in_flight), fut))
+        return fut
+
+    def call(self, fn, *args, **kwargs) -> Future:
+        """Run fn(con, *args, **kwargs) on the writer thread, after every profile queued before it."""
+        fut = Future()
+        self._queue.put(("call", (fn, args, kwargs), fut))
+        return fut
+
+    def close(self, timeout: Optional[float] = None):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._queue.put(_STOP)
+                self._thread.join(timeout)
+            self._thread = None
+
+    def snapshot(self) -> dict:
+        return dict(self.stats, queue=self._queue.qsize())
+
+    # ---- writer thread ----
+
+    def _run(self, ready: Future):
+        try:
+            con = init_db(self.db_path, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("PRAGMA busy_timeout=5000")
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(True)
+        skill_ids: Dict[str, Optional[int]] = {}
+        try:
+            stopping = False
+            while not stopping:
+                items = [self._queue.get()]
+                deadline = time.monotonic() + self.max_wait
+                while len(items) < self.batch_size and items[-1] is not _STOP:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        items.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if items[-1] is _STOP:
+                    items.pop()
+                    stopping = True
+                self._process(con, items, skill_ids)
+        finally:
+            con.close()
+
+    def _process(self, con, items, skill_ids):
+        # Consecutive profiles are committed together; a call runs after the profiles queued before it
+        pending = []
+        for kind, payload, fut in items:
+            if kind == "profile":
+                pending.append((payload, fut))
+                continue
+            self._flush(con, pending, skill_ids)
+            pending = []
+            fn, args, kwargs = payload
+            try:
+                fut.set_result(fn(con, *args, **kwargs))
+            except Exception as e:
+                fut.set_exception(e)
+            self.stats["calls"] += 1
+        self._flush(con, pending, skill_ids)
+
+    def _flush(self, con, pending, skill_ids):
+        if not pending:
+            return
+        t = time.perf_counter()
+        try:
+            store_profiles_bulk(con, [row for (row, _), _ in pending], skill_ids,
+                                [row[0] for (row, in_flight), _ in pending if in_flight])
+        except Exception:
+            # One bad row must not fail everyone's Future: retry the batch row by row
+            skill_ids.clear()       # may hold ids of skills the rollback just removed
+            for payload, fut in pending:
+                self._store_one(con, payload, fut, skill_ids)
+            return
+        finally:
+            self.stats["write_seconds"] += time.perf_counter() - t
+        self.stats["profiles"] += len(pending)
+        self.stats["batches"] += 1
+        for (row, _), fut in pending:
+            fut.set_result(row[0])
+
+    def _store_one(self, con, payload, fut, skill_ids):
+        row, in_flight = payload
+        try:
+            store_profiles_bulk(con, [row], skill_ids, [row[0]] if in_flight else ())
+        except Exception as e:
+            skill_ids.clear()
+            self.stats["failed"] += 1
+            fut.set_exception(e)
+            return
+        self.stats["profiles"] += 1
+        self.stats["batches"] += 1
+        fut.set_result(row[0])
+
+
+_writers: Dict[str, SqlWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path: str) -> SqlWriter:
+    """The process-wide writer for db_path, started on first use."""
+    with _writers_lock:
+        writer = _writers.get(db_path)
+        if writer is None:
+            writer = _writers[db_path] = SqlWriter(db_path)
+        return writer.start()
+
+
+def close_writers():
+    with _writers_lock:
+        for writer in _writers.values():
+            writer.close()
+        _writers.clear()
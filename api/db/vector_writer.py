@@ -0,0 +1,170 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# Cross-resume vector store writer. Callers submit one resume's documents and
+# get a Future; a thread accumulates submissions until VECTOR_BATCH_DOCS
+# documents are pending or the oldest has waited VECTOR_FLUSH_SECONDS, then
+# replaces/adds the whole batch with one add_documents call (one embeddings
+# request per batch instead of one per resume).
+
+VECTOR_BATCH_DOCS = int(os.getenv("VECTOR_BATCH_DOCS", "256"))
+VECTOR_FLUSH_SECONDS = float(os.getenv("VECTOR_FLUSH_SECONDS", "0.5"))
+VECTOR_WRITER_WORKERS = int(os.getenv("VECTOR_WRITER_WORKERS", "2"))   # batches being embedded at once
+
+_STOP = object()
+
+
+def _candidate_of(entry) -> Optional[str]:
+    docs, replace_id, _ = entry
+    return replace_id or (docs[0].metadata.get("candidate_id") if docs else None)
+
+
+class VectorWriter:
+    def __init__(self, store, batch_size: int = VECTOR_BATCH_DOCS, flush_interval: float = VECTOR_FLUSH_SECONDS,
+                 workers: int = VECTOR_WRITER_WORKERS):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.workers = max(1, workers)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._life = threading.Lock()     # start/close
+        self._lock = threading.Lock()     # stats and in-flight candidates
+        self._inflight: Dict[str, Future] = {}
+        self.stats = {"submissions": 0, "documents": 0, "batches": 0, "failed": 0, "index_seconds": 0.0}
+
+    def start(self) -> "VectorWriter":
+        with self._life:
+            if self._thread is None or not self._thread.is_alive():
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vector-index")
+                self._thread = threading.Thread(target=self._run, name="vector-writer", daemon=True)
+                self._thread.start()
+        return self
+
+    def submit(self, docs: list, replace_candidate_id: Optional[str] = None) -> Future:
+        """
+        Queue one resume's documents. With replace_candidate_id the candidate's
+        existing documents are deleted first. The Future resolves to the number
+        of documents added once their batch is in the store.
+        """
+        fut = Future()
+        self._queue.put((list(docs), replace_candidate_id, fut))
+        return fut
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush what is pending and wait for every batch to be indexed."""
+        with self._life:
+            if self._thread is not None and self._thread.is_alive():
+                self._queue.put(_STOP)
+                self._thread.join(timeout)
+                self._pool.shutdown(wait=True)
+            self._thread = None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats, queue=self._queue.qsize())
+
+    # ---- writer thread ----
+
+    def _run(self):
+        pending, pending_docs, oldest = [], 0, 0.0
+        while True:
+            timeout = None if not pending else max(0.0, oldest + self.flush_interval - time.monotonic())
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                entry = None
+            if entry is _STOP:
+                self._dispatch(pending)
+                return
+            if entry is not None:
+                if not pending:
+                    oldest = time.monotonic()
+                pending.append(entry)
+                pending_docs += len(entry[0])
+            if pending and (pending_docs >= self.batch_size or time.monotonic() - oldest >= self.flush_interval):
+                self._dispatch(pending)
+                pending, pending_docs = [], 0
+
+    def _dispatch(self, batch):
+        if not batch:
+            return
+        # A candidate submitted twice in one batch keeps only its latest documents
+        last = {}
+        for i, entry in enumerate(batch):
+            cid = _candidate_of(entry)
+            if cid:
+                last[cid] = i
+        keep = []
+        for i, entry in enumerate(batch):
+            cid = _candidate_of(entry)
+            if cid and last[cid] != i:
+                entry[2].set_result(0)
+            else:
+                keep.append(entry)
+        # Do not race a batch that is still indexing the same candidates
+        cids = {cid for cid in map(_candidate_of, keep) if cid}
+        with self._lock:
+            waits = {self._inflight[c] for c in cids if c in self._inflight}
+        for job in waits:
+            job.exception()
+        job = self._pool.submit(self._index, keep)
+        with self._lock:
+            for cid in cids:
+                self._inflight[cid] = job
+        job.add_done_callback(lambda j: self._release(j, cids))
+
+    def _release(self, job: Future, cids):
+        with self._lock:
+            for cid in cids:
+                if self._inflight.get(cid) is job:
+                    del self._inflight[cid]
+
+    def _index(self, batch):
+        t = time.perf_counter()
+        docs: List = [d for entry in batch for d in entry[0]]
+        try:
+            replace = [entry[1] for entry in batch if entry[1]]
+            if replace:
+                self.store.delete(where={"candidate_id": {"$in": replace}})
+            if docs:
+                self.store.add_documents(docs)
+        except Exception as e:
+            with self._lock:
+                self.stats["failed"] += len(batch)
+                self.stats["index_seconds"] += time.perf_counter() - t
+            for _, _, fut in batch:
+                fut.set_exception(e)
+            return
+        with self._lock:
+            self.stats["submissions"] += len(batch)
+            self.stats["documents"] += len(docs)
+            self.stats["batches"] += 1
+            self.stats["index_seconds"] += time.perf_counter() - t
+        for entry in batch:
+            entry[2].set_result(len(entry[0]))
+
+
+_writers: Dict[int, VectorWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_vector_writer(store) -> VectorWriter:
+    """The process-wide writer for `store`, started on first use."""
+    with _writers_lock:
+        writer = _writers.get(id(store))
+        if writer is None or writer.store is not store:
+            writer = _writers[id(store)] = VectorWriter(store)
+        return writer.start()
+
+
+def close_vector_writers():
+    with _writers_lock:
+        for writer in _writers.values():
+            writer.close()
+        _writers.clear()
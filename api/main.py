@@ -1,17 +1,36 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List, Literal
 import uvicorn
+import json
+import os
+import re
+import asyncio
+import uuid
 from datetime import datetime
 
 # Add the current directory to Python path to import modules
 #sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from query_processing.query_executor import execute_query
-from query_processing.answer_generator import synthesize_answer_from_docs
+from query_processing.query_router import route_query_async
+from query_processing.rule_router import router_stats
+from query_processing.query_executor import (execute_query_async, execute_route_async, start_speculative_search,
+                                             apply_route_fallback, StageTimer, SPECULATIVE_VECTOR_SEARCH)
+from query_processing.answer_generator import answer_async, astream_answer
+from query_processing.query_cache import cache_stats
+from query_processing.executors import run_sql, shutdown_executors
+from query_processing.shortlist import SHORTLIST_TOP_N, InvalidCursor, shortlist_with_profiles
 from db.sql_store import init_db
-from db.chroma_store import store
+from db.sql_writer import get_writer, close_writers
+from db.vector_writer import close_vector_writers
+from db.profile_cache import profile_cache
+from db.maintenance import delete_candidates, replace_candidate, compact
+from db.snapshot import create_snapshot, restore_snapshot, candidate_count
+from db.chroma_store import vector_store
+from cv_processing.ingest_jobs import create_job, job_status, list_jobs
+from cv_processing.uploads import UPLOAD_DIR, UploadRejected, IngestQueue, safe_filename, save_upload
 from model.CandidateProfile import CandidateProfile, EducationItem as Education, ExperienceItem as Experience, LinkItem as Link, CertificationItem as Certification
 
 # Initialize FastAPI app
@@ -33,6 +52,8 @@ app.add_middleware(
 # Pydantic models for request/response
 class AskRequest(BaseModel):
     question: str
+    # auto: extractive for confident search routes, LLM otherwise
+    answer_mode: Optional[Literal["auto", "llm", "extractive"]] = None
 
 class AskResponse(BaseModel):
     sections: List[str]
@@ -40,10 +61,65 @@ class AskResponse(BaseModel):
     docs: List[CandidateProfile]
     answer: Optional[str] = None
     why: Optional[str] = None
+    timings: Optional[dict] = None
+    ranking: Optional[List[dict]] = None
+    total_matches: Optional[int] = None
+    next_cursor: Optional[str] = None
+    evidence_tokens: Optional[dict] = None
+    answer_mode: Optional[str] = None
+
+class ShortlistRequest(BaseModel):
+    question: str
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
+
+class ShortlistResponse(BaseModel):
+    candidates: List[dict]
+    facts: List[CandidateProfile]
+    total: int
+    complete: int = 0
+    next_cursor: Optional[str] = None
+
+class SnapshotRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")    # a "path" from older clients is an error, not ignored
+    name: Optional[str] = None
+
+class IngestJobRequest(BaseModel):
+    pdf_folder: str = "data/pdf"
+    name: Optional[str] = None
 
 # Initialize database and vector store
-con = init_db("data/candidates.db")
-vs = store
+DB_PATH = "data/candidates.db"
+init_db(DB_PATH).close()
+vs = vector_store
+
+
+# Uploads and ingestion jobs started through the API run here, in the background
+ingest_queue = IngestQueue(DB_PATH)
+
+# Folders POST /ingest/jobs may read from (os.pathsep-separated), subfolders included
+INGEST_ROOTS = [os.path.realpath(p) for p in os.getenv("INGEST_ROOTS", os.pathsep.join(["data/pdf", UPLOAD_DIR])).split(os.pathsep) if p]
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "data/snapshots")
+SNAPSHOT_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]{0,99}")
+# A new node with an empty database loads this snapshot before serving
+RESTORE_SNAPSHOT = os.getenv("RESTORE_SNAPSHOT", "")
+
+
+@app.on_event("startup")
+async def startup():
+    if RESTORE_SNAPSHOT and await asyncio.to_thread(candidate_count, DB_PATH) == 0:
+        print(f"Restoring snapshot {RESTORE_SNAPSHOT}...")
+        print(await asyncio.to_thread(restore_snapshot, RESTORE_SNAPSHOT, DB_PATH))
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Cancelled jobs flush their journal and are marked interrupted, so they can be resumed
+    await ingest_queue.close()
+    shutdown_executors()
+    close_vector_writers()
+    close_writers()
 
 
 @app.get("/")
@@ -54,91 +130,105 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/stats")
+async def stats():
+    return {"router": router_stats(), "cache": cache_stats(), "profiles": profile_cache.snapshot()}
+
+def serialize_docs(result: dict) -> list:
+    # Transform docs from tuples to profile objects (like facts)
+    docs = []
+    for doc_tuple in result.get("docs", []):
+        if isinstance(doc_tuple, tuple) and len(doc_tuple) == 2:
+            doc, score = doc_tuple
+            # Extract candidate information directly from metadata
+            metadata = doc.metadata
+            
+            # Create profile dict from metadata
+            profile_dict = {
+                "full_name": metadata.get("candidate_name"),
+                "email": metadata.get("email"),
+                "phone": metadata.get("phone"),
+                "location": metadata.get("location"),
+                "links": [],  # Not available in current metadata structure
+                "summary": metadata.get("summary"),
+                "skills": metadata.get("skills", "").split(", ") if metadata.get("skills") else [],
+                "education": [{
+                    "institution": metadata.get("education_institution") or metadata.get("institution"),
+                    "degree": metadata.get("education_degree") or metadata.get("degree"),
+                    "field": metadata.get("education_field") or metadata.get("field"),
+                    "start_year": metadata.get("education_start_year") or metadata.get("start_year"),
+                    "end_year": metadata.get("education_end_year") or metadata.get("end_year")
+                }] if metadata.get("education_institution") or metadata.get("institution") else [],
+                # Section-index chunks carry the fields of their own entry
+                "experience": [{
+                    "company": metadata.get("latest_company") or metadata.get("company"),
+                    "title": metadata.get("latest_title") or metadata.get("title"),
+                    "start": metadata.get("latest_start") or metadata.get("start"),
+                    "end": metadata.get("latest_end") or metadata.get("end"),
+                    "description": doc.page_content if metadata.get("section") == "experience" else None
+                }] if metadata.get("latest_company") or metadata.get("company") else [],
+                "certifications": []  # Not available in current metadata structure
+            }
+            docs.append(profile_dict)
+    return docs
+
+def serialize_facts(result: dict) -> list:
+    # Convert CandidateProfile objects to dictionaries
+    facts = []
+    for fact in result.get("facts", []):
+        if hasattr(fact, 'model_dump'):
+            # Convert Pydantic model to dictionary
+            fact_dict = fact.model_dump()
+            facts.append(fact_dict)
+        elif hasattr(fact, '__dict__'):
+            # Convert regular object to dictionary
+            fact_dict = {
+                "full_name": getattr(fact, 'full_name', None),
+                "email": getattr(fact, 'email', None),
+                "phone": getattr(fact, 'phone', None),
+                "location": getattr(fact, 'location', None),
+                "links": [{"type": getattr(link, 'type', None), "url": getattr(link, 'url', None)} for link in getattr(fact, 'links', [])],
+                "summary": getattr(fact, 'summary', None),
+                "skills": getattr(fact, 'skills', []),
+                "education": [{"institution": getattr(edu, 'institution', None), "degree": getattr(edu, 'degree', None), "field": getattr(edu, 'field', None), "start_year": getattr(edu, 'start_year', None), "end_year": getattr(edu, 'end_year', None)} for edu in getattr(fact, 'education', [])],
+                "experience": [{"company": getattr(exp, 'company', None), "title": getattr(exp, 'title', None), "start": getattr(exp, 'start', None), "end": getattr(exp, 'end', None), "description": getattr(exp, 'description', None)} for exp in getattr(fact, 'experience', [])],
+                "certifications": [{"name": getattr(cert, 'name', None), "year": getattr(cert, 'year', None), "issuer": getattr(cert, 'issuer', None)} for cert in getattr(fact, 'certifications', [])] if getattr(fact, 'certifications', None) else None
+            }
+            facts.append(fact_dict)
+        else:
+            facts.append(fact)
+    return facts
+
 @app.post("/ask", response_model=AskResponse)
 async def ask_question(request: AskRequest):
     """
     Execute a query against the CV database and return structured results
     """
     try:
-        # Execute the query using the existing query executor
-        result = execute_query(con, vs, request.question)
+        # Execute the query without blocking the event loop
+        result = await execute_query_async(DB_PATH, vs, request.question, answer_mode=request.answer_mode)
 
         # Generate answer using the answer generator
-        answer = synthesize_answer_from_docs(result, request.question)
+        answer = await answer_async(DB_PATH, result, request.question, request.answer_mode)
 
         # Add the answer to the result
         result["answer"] = answer
-        
-        # Convert the result to the expected format
-        # Transform docs from tuples to profile objects (like facts)
-        docs = []
-        for doc_tuple in result.get("docs", []):
-            if isinstance(doc_tuple, tuple) and len(doc_tuple) == 2:
-                doc, score = doc_tuple
-                # Extract candidate information directly from metadata
-                metadata = doc.metadata
-                
-                # Create profile dict from metadata
-                profile_dict = {
-                    "full_name": metadata.get("candidate_name"),
-                    "email": metadata.get("email"),
-                    "phone": metadata.get("phone"),
-                    "location": metadata.get("location"),
-                    "links": [],  # Not available in current metadata structure
-                    "summary": metadata.get("summary"),
-                    "skills": metadata.get("skills", "").split(", ") if metadata.get("skills") else [],
-                    "education": [{
-                        "institution": metadata.get("education_institution"),
-                        "degree": metadata.get("education_degree"),
-                        "field": metadata.get("education_field"),
-                        "start_year": metadata.get("education_start_year"),
-                        "end_year": metadata.get("education_end_year")
-                    }] if metadata.get("education_institution") else [],
-                    "experience": [{
-                        "company": metadata.get("latest_company"),
-                        "title": metadata.get("latest_title"),
-                        "start": metadata.get("latest_start"),
-                        "end": metadata.get("latest_end"),
-                        "description": None  # Not available in current metadata structure
-                    }] if metadata.get("latest_company") else [],
-                    "certifications": []  # Not available in current metadata structure
-                }
-                docs.append(profile_dict)
-        
-        # Convert CandidateProfile objects to dictionaries
-        facts = []
-        for fact in result.get("facts", []):
-            if hasattr(fact, 'model_dump'):
-                # Convert Pydantic model to dictionary
-                fact_dict = fact.model_dump()
-                facts.append(fact_dict)
-            elif hasattr(fact, '__dict__'):
-                # Convert regular object to dictionary
-                fact_dict = {
-                    "full_name": getattr(fact, 'full_name', None),
-                    "email": getattr(fact, 'email', None),
-                    "phone": getattr(fact, 'phone', None),
-                    "location": getattr(fact, 'location', None),
-                    "links": [{"type": getattr(link, 'type', None), "url": getattr(link, 'url', None)} for link in getattr(fact, 'links', [])],
-                    "summary": getattr(fact, 'summary', None),
-                    "skills": getattr(fact, 'skills', []),
-                    "education": [{"institution": getattr(edu, 'institution', None), "degree": getattr(edu, 'degree', None), "field": getattr(edu, 'field', None), "start_year": getattr(edu, 'start_year', None), "end_year": getattr(edu, 'end_year', None)} for edu in getattr(fact, 'education', [])],
-                    "experience": [{"company": getattr(exp, 'company', None), "title": getattr(exp, 'title', None), "start": getattr(exp, 'start', None), "end": getattr(exp, 'end', None), "description": getattr(exp, 'description', None)} for exp in getattr(fact, 'experience', [])],
-                    "certifications": [{"name": getattr(cert, 'name', None), "year": getattr(cert, 'year', None), "issuer": getattr(cert, 'issuer', None)} for cert in getattr(fact, 'certifications', [])] if getattr(fact, 'certifications', None) else None
-                }
-                facts.append(fact_dict)
-            else:
-                facts.append(fact)
 
         print("Result:", result)
         
         response = AskResponse(
             ok=True,
             sections=result.get("sections", []),
-            facts=facts,
-            docs=docs,
+            facts=serialize_facts(result),
+            docs=serialize_docs(result),
             answer=result.get("answer"),
-            why=result.get("why")
+            why=result.get("why"),
+            timings=result.get("timings"),
+            ranking=result.get("ranking"),
+            total_matches=result.get("total_matches"),
+            next_cursor=result.get("next_cursor"),
+            evidence_tokens=result.get("evidence_tokens"),
+            answer_mode=result.get("answer_mode")
         )
         
         return response
@@ -147,5 +237,213 @@ async def ask_question(request: AskRequest):
         print(f"Error processing query: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
+@app.post("/shortlist", response_model=ShortlistResponse)
+async def shortlist(request: ShortlistRequest):
+    """
+    Page through every candidate matching the question's skills/company/institution,
+    best SQL score first. Pass next_cursor back as cursor for the following page.
+    """
+    try:
+        route = await route_query_async(DB_PATH, request.question)
+        page = await run_sql(DB_PATH, shortlist_with_profiles, route, request.cursor,
+                             request.limit or SHORTLIST_TOP_N)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error processing shortlist: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error processing shortlist: {str(e)}")
+    return ShortlistResponse(candidates=page["candidates"], facts=serialize_facts({"facts": page["profiles"]}),
+                             total=page["total"], complete=page["complete"], next_cursor=page["next_cursor"])
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def ask_stream_events(question: str, answer_mode: Optional[str] = None):
+    """
+    Server-Sent Events for one question, in pipeline order:
+    route -> evidence (sections, facts, docs) -> token* -> done.
+    Failures are reported as an error event because the 200 status is already sent.
+    """
+    try:
+        timer = StageTimer()
+        vector_task = start_speculative_search(vs, question, timer) if SPECULATIVE_VECTOR_SEARCH else None
+        route = await timer.timed("route_ms", route_query_async(DB_PATH, question))
+        # Emit the route as executed: a low-confidence route falls back to vector search
+        apply_route_fallback(route)
+        yield sse_event("route", route.model_dump())
+
+        result = await execute_route_async(DB_PATH, vs, route, question, vector_task=vector_task, timer=timer,
+                                           answer_mode=answer_mode)
+        yield sse_event("evidence", {
+            "sections": result.get("sections", []),
+            "facts": serialize_facts(result),
+            "docs": serialize_docs(result),
+            "why": result.get("why"),
+            "timings": result.get("timings"),
+            "ranking": result.get("ranking"),
+            "total_matches": result.get("total_matches"),
+            "next_cursor": result.get("next_cursor"),
+        })
+
+        parts = []
+        async for token in astream_answer(DB_PATH, result, question, answer_mode):
+            parts.append(token)
+            yield sse_event("token", {"text": token})
+
+        yield sse_event("done", {"answer": "".join(parts), "evidence_tokens": result.get("evidence_tokens"),
+                                 "answer_mode": result.get("answer_mode")})
+
+    except Exception as e:
+        print(f"Error processing streaming query: {str(e)}")
+        yield sse_event("error", {"detail": f"Error processing query: {str(e)}"})
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: AskRequest):
+    """
+    Streaming variant of /ask (text/event-stream): the route, then the SQL facts
+    and vector docs as soon as retrieval finishes, then the answer token by token.
+    """
+    return StreamingResponse(
+        ask_stream_events(request.question, request.answer_mode),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def upload_folder() -> str:
+    return os.path.join(UPLOAD_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}")
+
+
+def queue_ingest_job(job_id: str, retry_failed: bool = False) -> int:
+    try:
+        return ingest_queue.submit(job_id, retry_failed)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail=f"Ingestion queue is full; resume job {job_id} later")
+
+
+@app.post("/resumes", status_code=202)
+async def upload_resumes(files: List[UploadFile] = File(...), name: Optional[str] = Form(None)):
+    """
+    Upload one or more PDF resumes. They are saved as they stream in, then
+    parsed, extracted, stored and embedded by a background job; poll
+    /ingest/jobs/{job_id} for progress.
+    """
+    folder = upload_folder()
+    await asyncio.to_thread(os.makedirs, folder, exist_ok=True)
+    saved, rejected, taken = [], [], set()
+    for upload in files:
+        try:
+            filename = safe_filename(upload.filename, taken)
+            size = await save_upload(upload, os.path.join(folder, filename))
+            saved.append({"file": upload.filename, "saved_as": filename, "bytes": size})
+        except UploadRejected as e:
+            rejected.append({"file": upload.filename, "error": str(e)})
+        finally:
+            await upload.close()
+    if not saved:
+        await asyncio.to_thread(os.rmdir, folder)
+        raise HTTPException(status_code=400, detail={"message": "No PDF resumes were uploaded", "rejected": rejected})
+
+    writer = await asyncio.to_thread(get_writer, DB_PATH)
+    job_id = await asyncio.wrap_future(writer.call(create_job, folder, name))
+    position = queue_ingest_job(job_id)
+    return {"job_id": job_id, "files": saved, "rejected": rejected, "queue_position": position}
+
+
+@app.get("/ingest/jobs")
+async def ingest_jobs():
+    return {"jobs": await run_sql(DB_PATH, list_jobs), "queue": ingest_queue.snapshot()}
+
+@app.get("/ingest/jobs/{job_id}")
+async def ingest_job(job_id: str):
+    """Per-state file counts, throughput, ETA and the latest failures of a job."""
+    status = await run_sql(DB_PATH, job_status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return status
+
+@app.post("/ingest/jobs", status_code=202)
+async def create_ingest_job(request: IngestJobRequest):
+    """
+    Create a job for every PDF in pdf_folder and queue it for the background
+    workers. pdf_folder must be inside one of INGEST_ROOTS.
+    """
+    folder = os.path.realpath(request.pdf_folder)
+    if not any(folder == root or folder.startswith(root + os.sep) for root in INGEST_ROOTS):
+        raise HTTPException(status_code=403, detail=f"{request.pdf_folder} is outside the ingestion folders")
+    if not os.path.isdir(folder):
+        raise HTTPException(status_code=400, detail=f"Not a directory: {request.pdf_folder}")
+    writer = await asyncio.to_thread(get_writer, DB_PATH)
+    job_id = await asyncio.wrap_future(writer.call(create_job, folder, request.name))
+    queue_ingest_job(job_id)
+    return await run_sql(DB_PATH, job_status, job_id)
+
+@app.post("/ingest/jobs/{job_id}/resume", status_code=202)
+async def resume_ingest_job(job_id: str, retry_failed: bool = False):
+    """Continue an interrupted job, or with retry_failed=true re-run only its failed files."""
+    status = await run_sql(DB_PATH, job_status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    if job_id in ingest_queue.jobs or status["status"] == "running":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already queued or running")
+    queue_ingest_job(job_id, retry_failed)
+    return status
+
+@app.delete("/candidates/{candidate_id}")
+async def delete_candidate(candidate_id: str):
+    """Remove a candidate from SQLite (all its rows) and from the vector stores."""
+    result = await delete_candidates(DB_PATH, [candidate_id])
+    if not result["deleted"]:
+        raise HTTPException(status_code=404, detail=f"Unknown candidate {candidate_id}")
+    return result
+
+@app.post("/candidates/{candidate_id}/replace")
+async def replace_candidate_resume(candidate_id: str, file: Optional[UploadFile] = File(None)):
+    """
+    Re-ingest one candidate, keeping its id: from the uploaded PDF, or without
+    a file from the resume it was ingested from (e.g. after an extraction fix).
+    """
+    pdf_path = None
+    if file is not None:
+        folder = upload_folder()
+        await asyncio.to_thread(os.makedirs, folder, exist_ok=True)
+        try:
+            pdf_path = os.path.join(folder, safe_filename(file.filename, set()))
+            await save_upload(file, pdf_path)
+        except UploadRejected as e:
+            raise HTTPException(status_code=400, detail=f"{file.filename}: {e}")
+        finally:
+            await file.close()
+    try:
+        return await replace_candidate(DB_PATH, candidate_id, pdf_path)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown candidate {candidate_id}")
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/maintenance/compact")
+async def compact_stores():
+    """Drop orphaned vectors and stale cache rows, then VACUUM SQLite and Chroma."""
+    return await compact(DB_PATH)
+
+@app.post("/maintenance/snapshot")
+async def snapshot(request: SnapshotRequest):
+    """
+    Write a snapshot (SQLite backup + float32 vectors + manifest) while serving;
+    load it on another node with `python -m db.snapshot restore` or RESTORE_SNAPSHOT.
+    """
+    name = request.name or datetime.now().strftime("%Y%m%d-%H%M%S")
+    # Only a name: the snapshot always lands directly under SNAPSHOT_DIR
+    if not SNAPSHOT_NAME.fullmatch(name) or ".." in name:
+        raise HTTPException(status_code=400, detail="Snapshot name must be letters, digits, '.', '_' or '-' "
+                                                    "(no path separators or '..')")
+    path = os.path.join(SNAPSHOT_DIR, name)
+    try:
+        manifest = await asyncio.to_thread(create_snapshot, DB_PATH, path)
+    except FileExistsError:
+        raise HTTPException(status_code=409, detail=f"Snapshot {path} already exists")
+    return {"path": path, **manifest}
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,43 +1,33 @@
 import os
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
+from query_processing.query_cache import QUERY_CACHE_ENABLED, MISS, answer_cache, answer_cache_key
+from query_processing.executors import run_sql
+from query_processing.evidence_packer import EVIDENCE_PACKING, pack_evidence
+from query_processing.local_ranker import select_answer_mode, rank_candidates, render_extractive_answer
+from db.sql_store import source_files_for
 from dotenv import load_dotenv
 
 load_dotenv()
 
 llm = ChatOpenAI(model="gpt-4o-mini", api_key=os.getenv("OPENAI_API_KEY"), temperature=0)
 
-def synthesize_answer_from_docs(result: dict, user_query: str):
-    
-    sections = result.get("sections") or ["experience","education","skills","summary"]
-    facts = result.get("facts") or []
-    docs = result.get("docs") or []
-
-    system = SystemMessage(content=(
+ANSWER_SYSTEM = (
    """
         You are a recruiter assistant. Use ONLY the provided context when answering resume-related questions.
         When the user greets or asks something irrelevant, respond helpfully without inventing details.
 
         INPUTS YOU WILL RECEIVE
         - question: the user's query.
-        - facts: JSON array of CandidateProfile objects from SQL (authoritative for names, companies, schools, dates, titles, skills, and source_file if present).
+        - facts: JSON array of CandidateProfile objects from SQL, one per candidate, limited to the searched sections (authoritative for names, companies, schools, dates, titles, skills, and source_file if present).
         - snippets: JSON array of vector evidence objects:
         {
-            "page_content": "free-text snippet",
-            "metadata": {
             "candidate_id": "...",
             "candidate_name": "...",
-            "profile": {
-                "full_name": "...",
-                "email": "...",
-                "phone": "...",
-                "location": "...",
-                "summary": "...",
-                "skills": [...],
-                "source_file": "..."    // path or URL to the resume
-            }
-            },
-            "score": { "distance": <float|null> }   // cosine distance; LOWER is better
+            "section": "...",          // only for section-level snippets
+            "source_file": "...",      // path or URL to the resume
+            "distance": <float>,       // cosine distance; LOWER is better
+            "text": "free-text snippet, trimmed to the relevant spans ("…" marks cuts)"
         }
 
         PRIORITIES
@@ -87,18 +77,129 @@ def synthesize_answer_from_docs(result: dict, user_query: str):
         • If nothing is answerable from the provided context, say so briefly.
 
         LINKS
-        - SOURCE_FILE: Prefer facts.source_file; if missing, use snippets.metadata.profile.source_file. If none exist, omit the link (do not invent URLs).
+        - SOURCE_FILE: Prefer facts.source_file; if missing, use snippets.source_file. If none exist, omit the link (do not invent URLs).
 
         STYLE
         - Concise, professional tone. No extra sections beyond the specified formats.
         """
-    ))
+)
+
+def prepare_evidence(result: dict, user_query: str):
+    """Facts and snippets for the prompt, packed into the token budget; sets result["evidence_tokens"]."""
+    facts = result.get("facts") or []
+    docs = result.get("docs") or []
+    if EVIDENCE_PACKING:
+        facts, docs, report = pack_evidence(result, user_query)
+        # Reported back to the caller (AskResponse.evidence_tokens)
+        result["evidence_tokens"] = report
+    return facts, docs
+
+def answer_messages(result: dict, user_query: str, evidence=None):
+    sections = result.get("sections") or ["experience","education","skills","summary"]
+    facts, docs = evidence or prepare_evidence(result, user_query)
+
+    system = SystemMessage(content=ANSWER_SYSTEM)
+
+    ranking_note = ""
+    if result.get("ranking"):
+        # Fused retrieval already ranked and deduplicated the candidates
+        ranking_note = ("facts and snippets are already ranked by relevance, best first, one entry per candidate. "
+                        "Keep this order when listing candidates.\n\n")
 
     human = HumanMessage(content=(
         f"Question: {user_query}\n\n"
         f"Sections searched: {sections}\n\n"
+        f"{ranking_note}"
         f"facts (JSON array of CandidateProfile objects):\n{facts}\n\n"
         f"snippets (JSON array with text, metadata, score):\n{docs}\n"
     ))
+    return [system, human]
 
-    return llm.invoke([system, human]).content
+def synthesize_answer_from_docs(result: dict, user_query: str):
+    return llm.invoke(answer_messages(result, user_query)).content
+
+async def synthesize_answer_from_docs_async(result: dict, user_query: str, evidence=None):
+    res = await llm.ainvoke(answer_messages(result, user_query, evidence))
+    return res.content
+
+
+async def astream_answer_from_docs(result: dict, user_query: str, evidence=None):
+    """Yield the answer text chunk by chunk as the LLM produces it."""
+    async for chunk in llm.astream(answer_messages(result, user_query, evidence)):
+        if chunk.content:
+            yield chunk.content
+
+
+# ---- Cached variants (answers are reused until the next ingest) ----
+
+def _answer_key(result: dict, user_query: str) -> str:
+    return answer_cache_key(user_query, result.get("fact_ids"), result.get("docs"))
+
+async def synthesize_answer_cached_async(db_path: str, result: dict, user_query: str):
+    if not QUERY_CACHE_ENABLED:
+        return await synthesize_answer_from_docs_async(result, user_query)
+    # Packed up front so a cache hit reports evidence_tokens too
+    evidence = prepare_evidence(result, user_query)
+    key = _answer_key(result, user_query)
+    cached = await run_sql(db_path, answer_cache.get, key)
+    if cached is not MISS:
+        return cached
+    answer = await synthesize_answer_from_docs_async(result, user_query, evidence)
+    await run_sql(db_path, answer_cache.set, key, answer)
+    return answer
+
+async def astream_answer_cached(db_path: str, result: dict, user_query: str):
+    """Like astream_answer_from_docs, but a cached answer is sent as a single chunk."""
+    if not QUERY_CACHE_ENABLED:
+        async for token in astream_answer_from_docs(result, user_query):
+            yield token
+        return
+    evidence = prepare_evidence(result, user_query)
+    key = _answer_key(result, user_query)
+    cached = await run_sql(db_path, answer_cache.get, key)
+    if cached is not MISS:
+        yield cached
+        return
+    parts = []
+    async for token in astream_answer_from_docs(result, user_query, evidence):
+        parts.append(token)
+        yield token
+    await run_sql(db_path, answer_cache.set, key, "".join(parts))
+
+
+# ---- Answer mode: LLM or extractive (ranked list rendered locally) ----
+
+async def extractive_answer_async(db_path: str, result: dict) -> str:
+    route = result["route"]
+    ranked = rank_candidates(result, route)
+    source_files = await run_sql(db_path, source_files_for, [r["candidate_id"] for r in ranked])
+    return render_extractive_answer(ranked, route, source_files, result.get("complete_matches"))
+
+def resolve_answer_mode(result: dict, answer_mode: str | None) -> str:
+    # Summaries generated at ingest are served as is unless the LLM is explicitly requested
+    if result.get("precomputed_answer") and answer_mode != "llm":
+        mode = "precomputed"
+    else:
+        mode = select_answer_mode(result, answer_mode)
+    result["answer_mode"] = mode
+    return mode
+
+async def answer_async(db_path: str, result: dict, user_query: str, answer_mode: str | None = None) -> str:
+    """Answer with the per-request / configured mode; records the mode used in result["answer_mode"]."""
+    mode = resolve_answer_mode(result, answer_mode)
+    if mode == "precomputed":
+        return result["precomputed_answer"]
+    if mode == "extractive":
+        return await extractive_answer_async(db_path, result)
+    return await synthesize_answer_cached_async(db_path, result, user_query)
+
+async def astream_answer(db_path: str, result: dict, user_query: str, answer_mode: str | None = None):
+    mode = resolve_answer_mode(result, answer_mode)
+    if mode == "precomputed":
+        yield result["precomputed_answer"]
+        return
+    if mode == "extractive":
+        yield await extractive_answer_async(db_path, result)
+        return
+    async for token in astream_answer_cached(db_path, result, user_query):
+        yield token
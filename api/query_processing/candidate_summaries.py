@@ -0,0 +1,129 @@
+"""
+Candidate summaries generated ahead of time instead of per "summarize <name>"
+request. Each summary is stored with a hash of the profile it was generated
+from; requests are served from the table while the hash still matches, and
+the ingest stage / backfill only regenerate summaries whose profile changed.
+
+Backfill existing candidates (from the api folder):
+    python -m query_processing.candidate_summaries --workers 8
+"""
+import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, List, Optional
+from db.sql_store import (init_db, thread_connection, get_candidate_summary, summary_hashes,
+                          upsert_candidate_summary, source_files_for)
+from db.profile_cache import load_profiles_cached
+from query_processing.answer_generator import llm, answer_messages
+
+PRECOMPUTED_SUMMARIES = os.getenv("PRECOMPUTED_SUMMARIES", "1") == "1"
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "4"))
+SUMMARY_BATCH = 200
+
+
+def profile_hash(profile) -> str:
+    data = profile.model_dump(mode="json")
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def summary_query(profile) -> str:
+    return f"Summarize {profile.full_name or 'this candidate'}'s profile"
+
+
+def generate_summary(candidate_id: str, profile, source_file: Optional[str] = None) -> str:
+    """Same prompt and output format as a request-time summarization, from the SQL profile."""
+    fact = profile.model_dump(exclude_none=True)
+    if source_file:
+        fact["source_file"] = source_file
+    result = {"sections": ["experience", "summary", "education", "skills"], "facts": [fact],
+              "fact_ids": [candidate_id], "docs": []}
+    return llm.invoke(answer_messages(result, summary_query(profile))).content
+
+
+def fresh_summary(con, candidate_id: str) -> Optional[str]:
+    """The stored summary if it was generated from the candidate's current profile."""
+    if not PRECOMPUTED_SUMMARIES:
+        return None
+    row = get_candidate_summary(con, candidate_id)
+    if not row:
+        return None
+    profiles = load_profiles_cached(con, [candidate_id])
+    if not profiles or profile_hash(profiles[0]) != row[0]:
+        return None
+    return row[1]
+
+
+def refresh_summary(db_path: str, candidate_id: str, force: bool = False) -> bool:
+    """(Re)generate one summary if missing or stale. Returns True if the LLM was called."""
+    con = thread_connection(db_path)
+    profiles = load_profiles_cached(con, [candidate_id])
+    if not profiles:
+        return False
+    content_hash = profile_hash(profiles[0])
+    row = get_candidate_summary(con, candidate_id)
+    if row and row[0] == content_hash and not force:
+        return False
+    source_file = source_files_for(con, [candidate_id]).get(candidate_id)
+    summary = generate_summary(candidate_id, profiles[0], source_file)
+    upsert_candidate_summary(con, candidate_id, content_hash, summary, getattr(llm, "model_name", None))
+    return True
+
+
+def stale_candidates(con, candidate_ids: List[str], force: bool = False) -> List[str]:
+    """Candidates whose stored summary is missing or was generated from another profile version."""
+    stale = []
+    for i in range(0, len(candidate_ids), SUMMARY_BATCH):
+        batch = candidate_ids[i:i + SUMMARY_BATCH]
+        # Unknown ids have no profile; drop them so zip() lines up
+        existing = {r[0] for r in con.execute(
+            f"SELECT id FROM candidates WHERE id IN ({','.join('?' * len(batch))})", batch)}
+        ids = [cid for cid in batch if cid in existing]
+        stored = {} if force else summary_hashes(con, ids)
+        for cid, profile in zip(ids, load_profiles_cached(con, ids)):
+            if stored.get(cid) != profile_hash(profile):
+                stale.append(cid)
+    return stale
+
+
+def backfill_summaries(db_path: str, candidate_ids: Optional[Iterable[str]] = None,
+                       workers: int = SUMMARY_WORKERS, force: bool = False) -> dict:
+    """
+    Generate summaries for the given (default: all) candidates whose summary is
+    missing or stale, with at most `workers` LLM calls in flight.
+    """
+    con = init_db(db_path)
+    try:
+        if candidate_ids is None:
+            candidate_ids = [r[0] for r in con.execute("SELECT id FROM candidates ORDER BY rowid")]
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        todo = stale_candidates(con, candidate_ids, force)
+    finally:
+        con.close()
+
+    print(f"Summaries: {len(todo)} of {len(candidate_ids)} candidates need a new summary")
+    t0 = time.perf_counter()
+    generated, failed = 0, 0
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="summary") as pool:
+        futures = {pool.submit(refresh_summary, db_path, cid, force): cid for cid in todo}
+        for fut in as_completed(futures):
+            try:
+                generated += bool(fut.result())
+            except Exception as e:
+                failed += 1
+                print(f"Summary failed for {futures[fut]}: {e}")
+    elapsed = time.perf_counter() - t0
+    print(f"Summaries: generated {generated}, failed {failed} in {elapsed:.1f}s")
+    return {"candidates": len(candidate_ids), "stale": len(todo), "generated": generated, "failed": failed,
+            "seconds": round(elapsed, 1)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="./data/candidates.db")
+    parser.add_argument("--workers", type=int, default=SUMMARY_WORKERS)
+    parser.add_argument("--force", action="store_true", help="regenerate even when the profile is unchanged")
+    args = parser.parse_args()
+    backfill_summaries(args.db, workers=args.workers, force=args.force)
@@ -0,0 +1,206 @@
+import os
+import re
+import json
+from typing import Dict, List, Optional, Tuple
+from query_processing.rule_router import tokenize, STOPWORDS
+
+# Builds the facts/snippets context for the answer LLM: one compact JSON
+# object per candidate limited to the routed sections, snippets trimmed to the
+# spans that mention the query terms, everything fitted into a token budget.
+# Prompt size drives answer latency and cost, so each request reports how
+# many tokens the packing saved against the old repr() interpolation.
+
+EVIDENCE_PACKING = os.getenv("EVIDENCE_PACKING", "1") == "1"
+ANSWER_TOKEN_BUDGET = int(os.getenv("ANSWER_TOKEN_BUDGET", "6000"))
+SNIPPET_MAX_TOKENS = int(os.getenv("SNIPPET_MAX_TOKENS", "160"))
+SNIPPET_BUDGET_SHARE = 0.3   # of the budget kept for snippets when facts would fill it
+TOKENIZER_MODEL = os.getenv("TOKENIZER_MODEL", "gpt-4o-mini")
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+IDENTITY_FIELDS = ("candidate_id", "full_name", "email", "phone", "location", "links", "source_file")
+SECTION_FIELDS = ("summary", "skills", "experience", "education", "certifications")
+
+_SPAN_RE = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed and tiktoken is not None:
+        try:
+            try:
+                _encoding = tiktoken.encoding_for_model(TOKENIZER_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            # tiktoken fetches its BPE files on first use; fall back to an estimate offline
+            print(f"Tokenizer unavailable ({e.__class__.__name__}); estimating tokens from length")
+            _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    enc = _get_encoding()
+    if enc is None:
+        return (len(text) + 3) // 4
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def to_json(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+# ---- Facts ----
+
+def _profile_dict(profile) -> dict:
+    if hasattr(profile, "model_dump"):
+        return profile.model_dump(exclude_none=True)
+    return dict(profile)
+
+
+def compact_profile(profile, sections: List[str], candidate_id: Optional[str] = None) -> dict:
+    """Identity fields plus the targeted sections, empty values dropped."""
+    data = _profile_dict(profile)
+    if candidate_id:
+        data["candidate_id"] = candidate_id
+    keep = set(IDENTITY_FIELDS) | {s for s in SECTION_FIELDS if s in sections}
+    return {k: v for k, v in data.items() if k in keep and v not in (None, "", [], {})}
+
+
+def dedupe_facts(facts: list, fact_ids: Optional[list]) -> Tuple[List[Tuple[Optional[str], object]], int]:
+    """(candidate_id, profile) pairs, first occurrence of each candidate kept."""
+    ids = fact_ids if fact_ids and len(fact_ids) == len(facts) else [None] * len(facts)
+    out, seen = [], set()
+    for cid, profile in zip(ids, facts):
+        data = _profile_dict(profile)
+        key = cid or (data.get("full_name"), data.get("email"))
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append((cid, profile))
+    return out, len(facts) - len(out)
+
+
+# ---- Snippets ----
+
+def query_terms(user_query: str) -> set:
+    return {t for t in tokenize(user_query) if t not in STOPWORDS and len(t) > 1}
+
+
+def trim_snippet(text: str, terms: set, max_tokens: int = SNIPPET_MAX_TOKENS) -> str:
+    """The spans (sentences/lines) that mention the most query terms, in document order."""
+    text = (text or "").strip()
+    if count_tokens(text) <= max_tokens:
+        return text
+    spans = [s.strip() for s in _SPAN_RE.split(text) if s.strip()]
+    scored = sorted(range(len(spans)), key=lambda i: (-len(terms & set(tokenize(spans[i]))), i))
+    picked, used = [], 0
+    for i in scored:
+        n = count_tokens(spans[i])
+        if used + n > max_tokens:
+            continue
+        picked.append(i)
+        used += n
+    if not picked:
+        # A single span longer than the cap: keep its head
+        return spans[scored[0]][: max_tokens * 4] + " …"
+    picked.sort()
+    out = []
+    for j, i in enumerate(picked):
+        if j and i != picked[j - 1] + 1:
+            out.append("…")
+        out.append(spans[i])
+    return " ".join(out)
+
+
+def compact_snippet(doc, score, terms: set) -> dict:
+    meta = doc.metadata or {}
+    snippet = {
+        "candidate_id": meta.get("candidate_id"),
+        "candidate_name": meta.get("candidate_name"),
+        "section": meta.get("section"),
+        "source_file": meta.get("source_file"),
+        "distance": round(float(score), 4) if score is not None else None,
+        "text": trim_snippet(doc.page_content, terms),
+    }
+    return {k: v for k, v in snippet.items() if v not in (None, "")}
+
+
+# ---- Packing ----
+
+def _fill(items: List[str], budget: int) -> Tuple[List[str], int, int]:
+    kept, used = [], 0
+    for item in items:
+        n = count_tokens(item)
+        if used + n > budget:
+            continue
+        kept.append(item)
+        used += n
+    return kept, used, len(items) - len(kept)
+
+
+def pack_evidence(result: dict, user_query: str, budget: int = ANSWER_TOKEN_BUDGET) -> Tuple[str, str, dict]:
+    """
+    Returns (facts_json, snippets_json, report). Facts come first (they are
+    authoritative); snippets always keep a share of the budget if they need it.
+    """
+    sections = result.get("sections") or list(SECTION_FIELDS[:4])
+    facts = result.get("facts") or []
+    docs = result.get("docs") or []
+    terms = query_terms(user_query)
+
+    snippets, seen = [], set()
+    for item in docs:
+        if not (isinstance(item, tuple) and len(item) == 2):
+            continue
+        snippet = compact_snippet(item[0], item[1], terms)
+        key = (snippet.get("candidate_id"), snippet.get("text"))
+        if key in seen:
+            continue
+        seen.add(key)
+        snippets.append(snippet)
+
+    # Facts have no source_file of their own; borrow it from the candidate's snippets
+    source_files: Dict[str, str] = {}
+    for s in snippets:
+        if s.get("candidate_id") and s.get("source_file"):
+            source_files.setdefault(s["candidate_id"], s["source_file"])
+
+    unique_facts, duplicates = dedupe_facts(facts, result.get("fact_ids"))
+    fact_items = []
+    for cid, profile in unique_facts:
+        fact = compact_profile(profile, sections, cid)
+        if cid in source_files:
+            fact["source_file"] = source_files[cid]
+        fact_items.append(to_json(fact))
+    snippet_items = [to_json(s) for s in snippets]
+
+    snippet_need = sum(count_tokens(s) for s in snippet_items)
+    facts_budget = budget - min(snippet_need, int(budget * SNIPPET_BUDGET_SHARE))
+    kept_facts, fact_tokens, facts_dropped = _fill(fact_items, facts_budget)
+    kept_snippets, snippet_tokens, snippets_dropped = _fill(snippet_items, budget - fact_tokens)
+
+    facts_json = "[" + ",".join(kept_facts) + "]"
+    snippets_json = "[" + ",".join(kept_snippets) + "]"
+    raw_tokens = count_tokens(f"{facts}") + count_tokens(f"{docs}")
+    packed_tokens = fact_tokens + snippet_tokens
+    report = {
+        "raw_tokens": raw_tokens,
+        "packed_tokens": packed_tokens,
+        "saved_tokens": max(raw_tokens - packed_tokens, 0),
+        "budget": budget,
+        "duplicate_facts": duplicates,
+        "facts_kept": len(kept_facts),
+        "facts_dropped": facts_dropped,
+        "snippets_kept": len(kept_snippets),
+        "snippets_dropped": snippets_dropped,
+    }
+    return facts_json, snippets_json, report
@@ -0,0 +1,32 @@
+import os
+import asyncio
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from db.sql_store import thread_connection
+
+# Bounded pools for the blocking parts of the query path. SQLite and Chroma
+# calls are synchronous, so they run here instead of on the event loop.
+SQL_MAX_WORKERS = int(os.getenv("SQL_MAX_WORKERS", "8"))
+VECTOR_MAX_WORKERS = int(os.getenv("VECTOR_MAX_WORKERS", "8"))
+
+sql_executor = ThreadPoolExecutor(max_workers=SQL_MAX_WORKERS, thread_name_prefix="sql")
+vector_executor = ThreadPoolExecutor(max_workers=VECTOR_MAX_WORKERS, thread_name_prefix="vector")
+
+
+async def run_sql(db_path: str, fn, *args, **kwargs):
+    """Run fn(con, *args, **kwargs) on the SQL pool with that worker's own connection."""
+    def call():
+        return fn(thread_connection(db_path), *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(sql_executor, call)
+
+
+async def run_vector(fn, *args, **kwargs):
+    """Run a blocking vector store call on the vector pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(vector_executor, partial(fn, *args, **kwargs))
+
+
+def shutdown_executors():
+    sql_executor.shutdown(wait=False, cancel_futures=True)
+    vector_executor.shutdown(wait=False, cancel_futures=True)
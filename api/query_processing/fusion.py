@@ -0,0 +1,97 @@
+import os
+from typing import Dict, List, Optional
+from model.QueryRoute import QueryRoute
+from query_processing.rule_router import tokenize, STOPWORDS
+from db.sql_store import search_resume_text, id_by_name
+from query_processing.shortlist import ranked_for_route
+
+# Hybrid retrieval: structured SQL matches, BM25 over resume text and the
+# Chroma similarity ranking are merged with reciprocal rank fusion into one
+# ranked, deduplicated candidate list. The answer LLM then only sees the
+# top-k candidates, already in order.
+
+HYBRID_FUSION = os.getenv("HYBRID_FUSION", "1") == "1"
+RRF_K = int(os.getenv("RRF_K", "60"))
+FUSION_TOP_K = int(os.getenv("FUSION_TOP_K", "10"))
+FUSION_DEPTH = int(os.getenv("FUSION_DEPTH", "50"))   # candidates taken from each ranking
+
+# Relative trust in each retriever; exact structured matches count most.
+FUSION_WEIGHTS = {"structured": 1.0, "lexical": 0.8, "vector": 0.8}
+
+
+def lexical_query(user_query: str) -> Optional[str]:
+    """FTS5 OR-query over the query's content words."""
+    terms = []
+    for tok in tokenize(user_query):
+        if tok in STOPWORDS or len(tok) < 2:
+            continue
+        term = '"' + tok.replace('"', '""') + '"'
+        if term not in terms:
+            terms.append(term)
+    return " OR ".join(terms) if terms else None
+
+
+def lexical_ranking(con, user_query: str, limit: int = FUSION_DEPTH) -> List[str]:
+    return [cid for cid, _ in search_resume_text(con, lexical_query(user_query), limit)]
+
+
+def structured_ranking(con, route: QueryRoute, limit: int = FUSION_DEPTH) -> List[str]:
+    """Candidates matching the route's precise slots, best SQL shortlist score first."""
+    rows, _total, _complete = ranked_for_route(con, route, limit)
+    ranked = [r["candidate_id"] for r in rows]
+    if route.candidate_name:
+        cid = id_by_name(con, route.candidate_name)
+        if cid:
+            ranked = [cid] + [c for c in ranked if c != cid]
+    return ranked[:limit]
+
+
+def vector_ranking(docs) -> List[str]:
+    """Candidate ids in order of best (lowest distance) hit, deduplicated."""
+    ranked = []
+    seen = set()
+    for doc, _score in sorted(docs, key=lambda t: t[1]):
+        cid = doc.metadata.get("candidate_id")
+        if cid and cid not in seen:
+            seen.add(cid)
+            ranked.append(cid)
+    return ranked
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[str]], top_k: int = FUSION_TOP_K, k: int = RRF_K,
+                           weights: Optional[Dict[str, float]] = None) -> List[dict]:
+    """
+    score(c) = sum over rankings of weight / (k + rank), rank starting at 1.
+    Returns [{"candidate_id", "score", "ranks": {source: rank}}], best first.
+    """
+    weights = weights or FUSION_WEIGHTS
+    fused: Dict[str, dict] = {}
+    for source, ranked in rankings.items():
+        w = weights.get(source, 1.0)
+        for rank, cid in enumerate(ranked, start=1):
+            entry = fused.setdefault(cid, {"candidate_id": cid, "score": 0.0, "ranks": {}})
+            entry["score"] += w / (k + rank)
+            entry["ranks"][source] = rank
+    ordered = sorted(fused.values(), key=lambda e: (-e["score"], e["candidate_id"]))
+    for e in ordered:
+        e["score"] = round(e["score"], 6)
+    return ordered[:top_k]
+
+
+def docs_for_candidates(docs, candidate_ids: List[str], per_candidate: int = 1):
+    """Best vector hits (up to per_candidate each) per fused candidate, in fused order."""
+    best: Dict[str, list] = {}
+    for doc, score in sorted(docs, key=lambda t: t[1]):
+        best.setdefault(doc.metadata.get("candidate_id"), []).append((doc, score))
+    out = []
+    for cid in candidate_ids:
+        out.extend(best.get(cid, [])[:per_candidate])
+    return out
+
+
+def sql_rankings(con, route: QueryRoute, user_query: str) -> Dict[str, List[str]]:
+    """The SQLite-side rankings (structured + lexical), computed in one SQL hop."""
+    return {
+        "structured": structured_ranking(con, route),
+        "lexical": lexical_ranking(con, user_query),
+    }
@@ -0,0 +1,195 @@
+import os
+import datetime
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlparse
+from model.QueryRoute import QueryRoute
+from db.skill_dictionary import canonical_skill, normalize_skill
+
+# Deterministic ranking of the retrieved candidates for SEARCH/FIND questions
+# and an extractive answer that renders the ranked list in the same Markdown
+# the answer prompt asks the LLM for, without calling the LLM.
+
+ANSWER_MODE = os.getenv("ANSWER_MODE", "auto")    # auto | llm | extractive
+EXTRACTIVE_MIN_CONFIDENCE = float(os.getenv("EXTRACTIVE_MIN_CONFIDENCE", "0.8"))
+EXTRACTIVE_TOP_K = 10
+
+RANK_WEIGHTS = {"skills": 3.0, "company": 2.0, "recency": 1.0, "institution": 1.5, "vector": 1.0, "fused": 1.0}
+
+
+def _lower(s: Optional[str]) -> str:
+    return (s or "").strip().lower()
+
+
+def _skill_key(s: str) -> str:
+    return normalize_skill(canonical_skill(s) or s)
+
+
+def _end_year(end: Optional[str]) -> int:
+    if not end:
+        return datetime.date.today().year
+    try:
+        return int(str(end)[:4])
+    except ValueError:
+        return 0
+
+
+def _period(start, end) -> str:
+    if not start and not end:
+        return ""
+    return f" ({start or '?'} – {end or 'Present'})"
+
+
+def match_profile(profile, route: QueryRoute) -> dict:
+    """Which of the route's precise slots this profile satisfies, with the supporting entries."""
+    wanted = {_skill_key(s): s for s in (route.skills or [])}
+    have = {_skill_key(s): s for s in profile.skills or []}
+    matched_skills = [have[k] for k in wanted if k in have]
+
+    company_jobs = []
+    if route.company:
+        company_jobs = [ex for ex in profile.experience or [] if _lower(route.company) in _lower(ex.company)]
+        company_jobs.sort(key=lambda ex: _end_year(ex.end), reverse=True)
+
+    schools = []
+    if route.institution:
+        schools = [ed for ed in profile.education or [] if _lower(route.institution) in _lower(ed.institution)]
+
+    required = len(wanted) + bool(route.company) + bool(route.institution)
+    satisfied = len(matched_skills) + bool(company_jobs) + bool(schools)
+    return {"skills": matched_skills, "skills_wanted": len(wanted), "jobs": company_jobs, "schools": schools,
+            "complete": required > 0 and satisfied == required, "satisfied": satisfied}
+
+
+def best_distances(docs) -> Dict[str, float]:
+    best: Dict[str, float] = {}
+    for item in docs or []:
+        if not (isinstance(item, tuple) and len(item) == 2):
+            continue
+        doc, score = item
+        cid = doc.metadata.get("candidate_id")
+        if cid and (cid not in best or score < best[cid]):
+            best[cid] = score
+    return best
+
+
+def rank_candidates(result: dict, route: QueryRoute, top_k: int = EXTRACTIVE_TOP_K) -> List[dict]:
+    """
+    Score every fact (candidate) from its structured matches, its best vector
+    distance and, when present, its fused RRF score. Candidates that satisfy
+    every precise slot come first; the rest only if nobody satisfies them all.
+    """
+    facts = result.get("facts") or []
+    ids = result.get("fact_ids") or []
+    distances = best_distances(result.get("docs"))
+    fused = {e["candidate_id"]: e["score"] for e in result.get("ranking") or []}
+    max_fused = max(fused.values(), default=0.0) or 1.0
+    this_year = datetime.date.today().year
+    w = RANK_WEIGHTS
+
+    ranked = []
+    for cid, profile in zip(ids, facts):
+        m = match_profile(profile, route)
+        score = 0.0
+        if m["skills_wanted"]:
+            score += w["skills"] * len(m["skills"]) / m["skills_wanted"]
+        if m["jobs"]:
+            years_ago = this_year - _end_year(m["jobs"][0].end)
+            score += w["company"] + w["recency"] * max(0.0, 1.0 - years_ago / 10.0)
+        if m["schools"]:
+            score += w["institution"]
+        if cid in distances:
+            score += w["vector"] / (1.0 + max(distances[cid], 0.0))
+        if cid in fused:
+            score += w["fused"] * fused[cid] / max_fused
+        ranked.append({"candidate_id": cid, "profile": profile, "match": m, "distance": distances.get(cid),
+                       "score": round(score, 4)})
+
+    complete = [r for r in ranked if r["match"]["complete"]]
+    pool = complete or [r for r in ranked if r["match"]["satisfied"]]
+    pool.sort(key=lambda r: (-r["score"], _lower(r["profile"].full_name), r["candidate_id"]))
+    return pool[:top_k]
+
+
+# ---- Extractive answer ----
+
+def why_bullets(entry: dict) -> List[str]:
+    m = entry["match"]
+    bullets = []
+    if m["skills"]:
+        bullets.append("Skills: " + ", ".join(m["skills"]))
+    for ex in m["jobs"][:2]:
+        title = f"{ex.title} at " if ex.title else ""
+        bullets.append(f"Experience: {title}{ex.company}{_period(ex.start, ex.end)}")
+    for ed in m["schools"][:1]:
+        degree = " ".join(x for x in (ed.degree, ed.field) if x)
+        years = f" ({ed.start_year}–{ed.end_year})" if ed.start_year or ed.end_year else ""
+        bullets.append(f"Education: {degree + ', ' if degree else ''}{ed.institution}{years}")
+    if not bullets and entry["distance"] is not None:
+        bullets.append(f"Semantic match on the resume text (dist={entry['distance']:.2f})")
+    return bullets[:3]
+
+
+def _join(items: List[str]) -> str:
+    return items[0] if len(items) == 1 else ", ".join(items[:-1]) + " and " + items[-1]
+
+
+def criteria_text(route: QueryRoute) -> str:
+    parts = []
+    if route.skills:
+        parts.append(_join([canonical_skill(s) or s for s in route.skills]) + " skills")
+    if route.company:
+        parts.append(f"experience at {route.company}")
+    if route.institution:
+        parts.append(f"studies at {route.institution}")
+    return _join(parts) if parts else "the requested criteria"
+
+
+def file_link(source_file: Optional[str]) -> str:
+    if not source_file:
+        return ""
+    name = os.path.basename(unquote(urlparse(source_file).path)) or source_file
+    return f" — [{name}]({source_file})"
+
+
+def render_extractive_answer(ranked: List[dict], route: QueryRoute, source_files: Dict[str, str],
+                             complete_total: Optional[int] = None) -> str:
+    """complete_total: how many candidates satisfy every slot (the list only shows the top ones)."""
+    if not ranked:
+        return f"No candidates in the database have {criteria_text(route)}."
+    complete = ranked[0]["match"]["complete"]
+    if complete:
+        n = complete_total if complete_total and complete_total > len(ranked) else len(ranked)
+        lead = f"Found {n} candidate{'s' if n != 1 else ''} with {criteria_text(route)}"
+        lead += f"; the top {len(ranked)} are listed below." if n > len(ranked) else "."
+    else:
+        lead = f"No candidate has all of {criteria_text(route)}; these are the closest matches."
+    lines = [lead, ""]
+    for i, entry in enumerate(ranked, start=1):
+        name = entry["profile"].full_name or entry["candidate_id"]
+        lines.append(f"{i}. **{name}**{file_link(source_files.get(entry['candidate_id']))}")
+        for j, bullet in enumerate(why_bullets(entry)):
+            lines.append(f"   - {'Why: ' if j == 0 else ''}{bullet}")
+    return "\n".join(lines) + "\n"
+
+
+def is_search_route(route: Optional[QueryRoute]) -> bool:
+    return (route is not None and not route.candidate_name and not route.need_summarization
+            and not route.abstain and route.mode in ("sql", "hybrid")
+            and bool(route.skills or route.company or route.institution))
+
+
+def select_answer_mode(result: dict, requested: Optional[str] = None) -> str:
+    """
+    "extractive" or "llm". An explicit per-request mode wins, except that the
+    extractive mode needs a search route with facts; "auto" also requires
+    the route confidence to reach EXTRACTIVE_MIN_CONFIDENCE.
+    """
+    mode = requested or ANSWER_MODE
+    route = result.get("route")
+    facts, ids = result.get("facts") or [], result.get("fact_ids") or []
+    usable = is_search_route(route) and facts and len(facts) == len(ids)
+    if mode == "extractive":
+        return "extractive" if usable else "llm"
+    if mode == "auto" and usable and route.confidence >= EXTRACTIVE_MIN_CONFIDENCE:
+        return "extractive"
+    return "llm"
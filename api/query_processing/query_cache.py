@@ -0,0 +1,180 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable
+from model.QueryRoute import QueryRoute
+from db.sql_store import data_generation
+
+# Two-tier cache for router and answer results: an in-process LRU with TTL in
+# front of the query_cache SQLite table, so entries survive restarts and are
+# shared by every worker pointing at the same database.
+
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "1") == "1"
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024"))
+ROUTE_CACHE_TTL_SECONDS = float(os.getenv("ROUTE_CACHE_TTL_SECONDS", str(24 * 3600)))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+PURGE_EVERY_N_SETS = 256
+
+MISS = object()
+
+_WS_RE = re.compile(r"\s+")
+_EDGE_PUNCT_RE = re.compile(r"^[\s?.!,;:]+|[\s?.!,;:]+$")
+
+
+def normalize_query(q: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a query."""
+    return _EDGE_PUNCT_RE.sub("", _WS_RE.sub(" ", q.lower())).strip()
+
+
+class QueryCache:
+    """
+    LRU + TTL cache with a SQLite backing table. With generation_aware=True an
+    entry is only valid while data_generation matches the value it was stored
+    with, so any ingest invalidates it. Values are stored encoded (str) and
+    decoded on every read, which keeps callers from mutating cached objects.
+    """
+    def __init__(self, namespace: str, ttl_seconds: float, encode: Callable, decode: Callable,
+                 max_entries: int = QUERY_CACHE_MAX_ENTRIES, generation_aware: bool = False):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.encode = encode
+        self.decode = decode
+        self.max_entries = max_entries
+        self.generation_aware = generation_aware
+        self._entries: OrderedDict = OrderedDict()  # key -> (encoded, expires_at, generation)
+        self._lock = threading.Lock()
+        self._sets = 0
+        self.stats = {"memory_hits": 0, "sqlite_hits": 0, "misses": 0, "expired": 0, "stale": 0, "sets": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _remember(self, key: str, encoded: str, expires_at: float, generation):
+        with self._lock:
+            self._entries[key] = (encoded, expires_at, generation)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _forget(self, con, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        with con:
+            con.execute("DELETE FROM query_cache WHERE namespace=? AND key=?", (self.namespace, key))
+
+    def get(self, con, key: str):
+        """Return the cached value or MISS."""
+        now = time.time()
+        generation = data_generation(con) if self.generation_aware else None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        source = "memory_hits"
+        if entry is None:
+            row = con.execute(
+                "SELECT value, expires_at, generation FROM query_cache WHERE namespace=? AND key=?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                self._count("misses")
+                return MISS
+            entry = tuple(row)
+            source = "sqlite_hits"
+
+        encoded, expires_at, entry_generation = entry
+        if expires_at <= now:
+            self._count("expired")
+            self._forget(con, key)
+            return MISS
+        if self.generation_aware and entry_generation != generation:
+            self._count("stale")
+            self._forget(con, key)
+            return MISS
+
+        if source == "sqlite_hits":
+            self._remember(key, encoded, expires_at, entry_generation)
+        self._count(source)
+        return self.decode(encoded)
+
+    def set(self, con, key: str, value):
+        encoded = self.encode(value)
+        expires_at = time.time() + self.ttl_seconds
+        generation = data_generation(con) if self.generation_aware else None
+        self._remember(key, encoded, expires_at, generation)
+        with con:
+            con.execute("""
+              INSERT INTO query_cache(namespace, key, value, generation, expires_at)
+              VALUES (?,?,?,?,?)
+              ON CONFLICT(namespace, key) DO UPDATE SET
+                value=excluded.value,
+                generation=excluded.generation,
+                expires_at=excluded.expires_at,
+                created_at=CURRENT_TIMESTAMP
+            """, (self.namespace, key, encoded, generation, expires_at))
+        with self._lock:
+            self._sets += 1
+            self.stats["sets"] += 1
+            purge = self._sets % PURGE_EVERY_N_SETS == 0
+        if purge:
+            with con:
+                con.execute("DELETE FROM query_cache WHERE expires_at <= ?", (time.time(),))
+
+    def clear(self, con=None):
+        with self._lock:
+            self._entries.clear()
+        if con is not None:
+            with con:
+                con.execute("DELETE FROM query_cache WHERE namespace=?", (self.namespace,))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        hits = stats["memory_hits"] + stats["sqlite_hits"]
+        lookups = hits + stats["misses"] + stats["expired"] + stats["stale"]
+        stats["hit_ratio"] = round(hits / lookups, 3) if lookups else 0.0
+        return stats
+
+
+route_cache = QueryCache(
+    "route", ROUTE_CACHE_TTL_SECONDS,
+    encode=lambda route: route.model_dump_json(exclude_none=True),
+    decode=QueryRoute.model_validate_json,
+)
+
+answer_cache = QueryCache(
+    "answer", ANSWER_CACHE_TTL_SECONDS,
+    encode=json.dumps,
+    decode=json.loads,
+    generation_aware=True,
+)
+
+
+def route_cache_key(user_query: str) -> str:
+    return normalize_query(user_query)
+
+
+def _doc_key(doc_tuple) -> str:
+    doc = doc_tuple[0] if isinstance(doc_tuple, tuple) else doc_tuple
+    metadata = getattr(doc, "metadata", {}) or {}
+    return getattr(doc, "id", None) or f"{metadata.get('candidate_id')}:{metadata.get('section', '')}"
+
+
+def answer_cache_key(user_query: str, fact_ids: Iterable[str], docs: Iterable) -> str:
+    payload = {
+        "q": normalize_query(user_query),
+        "facts": sorted(set(fact_ids or [])),
+        "docs": sorted({_doc_key(d) for d in docs or []}),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def cache_stats() -> dict:
+    return {"enabled": QUERY_CACHE_ENABLED, "route": route_cache.snapshot(), "answer": answer_cache.snapshot()}
@@ -1,15 +1,28 @@
+import os
+import time
+import asyncio
 from typing import Optional
-from query_processing.query_router import route_query_llm
+from query_processing.query_router import route_query, route_query_async
+from query_processing.executors import run_sql, run_vector
+from query_processing.fusion import (HYBRID_FUSION, FUSION_DEPTH, sql_rankings, vector_ranking,
+                                     reciprocal_rank_fusion, docs_for_candidates)
 from model.QueryRoute import QueryRoute
-from db.chroma_store import store
-from db.sql_store import init_db, resolve_candidate, load_candidate_profiles, ids_by_company, ids_by_institution, ids_by_skills, id_by_name, companies_for, institutions_for
+from db.chroma_store import SECTION_INDEX
+from query_processing.section_search import (SECTION_SEARCH_K, CHUNKS_PER_CANDIDATE, section_clause,
+                                             filter_hits_by_sections, group_chunks_by_candidate)
+from query_processing.shortlist import shortlist_with_profiles
+from db.sql_store import init_db, resolve_candidate, companies_for, institutions_for
+from db.profile_cache import load_profiles_cached
+from query_processing.candidate_summaries import fresh_summary
 
 # ---- Helpers ----
 
-def vsearch(vs, query: str, k=8, cand_ids: Optional[list[str]] = None):
+def vsearch(vs, query: str, k=8, cand_ids: Optional[list[str]] = None, sections: Optional[list[str]] = None):
     clauses = []
     if cand_ids:
         clauses.append({"candidate_id": {"$in": cand_ids}})
+    if SECTION_INDEX and sections:
+        clauses.append(section_clause(sections))
 
     filter = None
     if len(clauses) == 1:
@@ -20,7 +33,7 @@ def vsearch(vs, query: str, k=8, cand_ids: Optional[list[str]] = None):
 
 def experience_text_blocks(vs, candidate_id: str, k: int = 8):
     return vsearch(vs, "summarize the candidate's work experience", k=k,
-                   cand_ids=[candidate_id])
+                   cand_ids=[candidate_id], sections=["experience"])
 
 def profile_summary_blocks(vs, candidate_id: str, k: int = 8):
     return vsearch(vs, "overall resume summary", k=k,
@@ -28,38 +41,46 @@ def profile_summary_blocks(vs, candidate_id: str, k: int = 8):
 
 # ---- Executor ----
 
-def execute_candidate_query(con, vs, route: QueryRoute, user_query: str):
+def candidate_not_found() -> dict:
+    return {"facts": [], "docs": [], "why": "candidate_not_found", "message": "Could not resolve candidate name. Check spelling."}
 
-    cid_name = None
-    if route.candidate_name:
-        cid_name = resolve_candidate(con, route.candidate_name)
+def summarization_result(candidate_id: str, profiles, docs, precomputed: Optional[str] = None) -> dict:
+    result = {
+        "sections": ["experience","summary","education","skills"],
+        "facts": list(profiles),
+        "fact_ids": [candidate_id],
+        "docs": list(docs)
+    }
+    if precomputed:
+        result["precomputed_answer"] = precomputed
+    return result
 
-    if not cid_name:
-        return {"facts": [], "docs": [], "why": "candidate_not_found", "message": "Could not resolve candidate name. Check spelling."}
+def wants_precomputed(answer_mode: Optional[str]) -> bool:
+    # Same rule as answer_generator.resolve_answer_mode: only an explicit "llm" regenerates the summary
+    return answer_mode != "llm"
 
-    candidate_id, canonical_name = cid_name
-    
+def precomputed_summary_result(con, candidate_id: str) -> Optional[dict]:
+    """Summarization result served from candidate_summaries, if the stored one is current."""
+    summary = fresh_summary(con, candidate_id)
+    if summary is None:
+        return None
+    return summarization_result(candidate_id, load_profiles_cached(con, [candidate_id]), [], summary)
+
+def candidate_sections_result(con, route: QueryRoute, candidate_id: str) -> dict:
     default_sections = ["experience","summary","education","skills"]
     sections = route.target_sections or default_sections
     
-    profiles = load_candidate_profiles(con, [candidate_id])
+    profiles = load_profiles_cached(con, [candidate_id])
 
     result = {
         "sections": [],
         "facts": [],
+        "fact_ids": [candidate_id],
         "docs": []
     }
 
-    if route.need_summarization:
-        docs = profile_summary_blocks(vs, candidate_id, k=8)
-        result["facts"].extend(profiles)
-        result["docs"].extend(docs)
-        result["sections"] = default_sections
-        return result
-
     if "experience" in sections:
         comps = companies_for(con, candidate_id)
-        result["facts"].extend(profiles)
         result["companies"] = comps
         result["sections"].append("experience")
 
@@ -67,47 +88,222 @@ def execute_candidate_query(con, vs, route: QueryRoute, user_query: str):
         insts = institutions_for(con, candidate_id)
         result["institutions"] = insts
         result["sections"].append("education")
-        result["facts"].extend(profiles)
 
     if "skills" in sections:
         result["sections"].append("skills")
-        result["facts"].extend(profiles)
+
+    # One copy of the profile, however many sections were asked for
+    if result["sections"]:
+        result["facts"] = list(profiles)
 
     return result
 
-def execute_query(con, vs, q: str):
-    route = route_query_llm(q)
+def execute_candidate_query(con, vs, route: QueryRoute, user_query: str, answer_mode: Optional[str] = None):
+
+    cid_name = None
+    if route.candidate_name:
+        cid_name = resolve_candidate(con, route.candidate_name)
+
+    if not cid_name:
+        return candidate_not_found()
+
+    candidate_id, canonical_name = cid_name
+
+    if route.need_summarization:
+        precomputed = precomputed_summary_result(con, candidate_id) if wants_precomputed(answer_mode) else None
+        if precomputed:
+            return precomputed
+        profiles = load_profiles_cached(con, [candidate_id])
+        docs = profile_summary_blocks(vs, candidate_id, k=8)
+        return summarization_result(candidate_id, profiles, docs)
+
+    return candidate_sections_result(con, route, candidate_id)
+
+DEFAULT_SECTIONS = ["experience", "summary", "skills", "education"]
+VECTOR_K = 8
 
+def vector_depth(fused: bool) -> int:
+    """Hits to fetch: section chunks need a deeper search to cover VECTOR_K candidates."""
+    if SECTION_INDEX:
+        return max(SECTION_SEARCH_K, FUSION_DEPTH) if fused else SECTION_SEARCH_K
+    return FUSION_DEPTH if fused else VECTOR_K
+
+def vector_evidence(hits, sections) -> list:
+    """
+    Vector evidence for the answer: the top VECTOR_K documents, or with the
+    section index the best matching chunks of the top VECTOR_K candidates.
+    """
+    if SECTION_INDEX:
+        return group_chunks_by_candidate(filter_hits_by_sections(hits, sections), VECTOR_K)
+    return list(hits)[:VECTOR_K]
+
+def apply_route_fallback(route: QueryRoute) -> list[str]:
     # fallback if router abstains or low confidence
     if route.abstain or route.confidence < 0.5:
         route.mode = "vector"
-        route.target_sections = ["experience", "summary", "skills", "education"]
+        route.target_sections = list(DEFAULT_SECTIONS)
+
+    return route.target_sections or list(DEFAULT_SECTIONS)
+
+def shortlist_result(sections, page: dict, docs) -> dict:
+    return {"sections": sections, "facts": page["profiles"], "fact_ids": page["ids"], "docs": docs,
+            "total_matches": page["total"], "complete_matches": page["complete"], "next_cursor": page["next_cursor"]}
 
-    sections = route.target_sections or ["experience", "summary", "skills", "education"]
+def fuse_hybrid(con, route: QueryRoute, q: str, sections, docs, rankings: Optional[dict] = None) -> dict:
+    """
+    Merge the structured, lexical and vector rankings with RRF and load only
+    the top-k profiles. facts, fact_ids and docs come back in fused order.
+    """
+    rankings = dict(rankings or sql_rankings(con, route, q))
+    rankings["vector"] = vector_ranking(docs)
+    ranking = reciprocal_rank_fusion(rankings)
+    ids = [e["candidate_id"] for e in ranking]
+    profiles = load_profiles_cached(con, ids) if ids else []
+    per_candidate = CHUNKS_PER_CANDIDATE if SECTION_INDEX else 1
+    return {"sections": sections, "facts": profiles, "fact_ids": ids,
+            "docs": docs_for_candidates(docs, ids, per_candidate), "ranking": ranking}
+
+def execute_query(con, vs, q: str, answer_mode: Optional[str] = None):
+    route = route_query(con, q)
+    sections = apply_route_fallback(route)
 
     if route.candidate_name:
-        return execute_candidate_query(con, vs, route, q)
+        return execute_candidate_query(con, vs, route, q, answer_mode)
 
     if route.mode == "vector":
-        docs = vsearch(vs, q, k=8)
-        result = {"sections": sections, "facts": [], "docs": docs}
+        hits = vsearch(vs, q, k=vector_depth(False), sections=sections)
+        result = {"sections": sections, "facts": [], "docs": vector_evidence(hits, sections)}
         return result
 
+    if route.mode == "hybrid" and HYBRID_FUSION:
+        docs = vsearch(vs, q, k=vector_depth(True), sections=sections)
+        return fuse_hybrid(con, route, q, sections, docs)
+
     if route.mode == "hybrid":
-        # Build shortlist from precise slots (only those provided)
-        ids = set()
-        if getattr(route, "skills", None):
-            ids |= set(ids_by_skills(con, route.skills))
-        if route.company:
-            ids |= set(ids_by_company(con, route.company))
-        if route.institution:
-            ids |= set(ids_by_institution(con, route.institution))
-        if route.candidate_name:
-            cid = id_by_name(con, route.candidate_name)
-            if cid:
-                ids.add(cid)
-
-        profiles = load_candidate_profiles(con, list(ids)) if ids else []
-        docs = vsearch(vs, q, k=8)
-        result = {"sections": sections, "facts": profiles, "docs": docs}
-        return result
\ No newline at end of file
+        page = shortlist_with_profiles(con, route)
+        hits = vsearch(vs, q, k=vector_depth(False), sections=sections)
+        return shortlist_result(sections, page, vector_evidence(hits, sections))
+
+# ---- Async executor ----
+
+# Start the query-text vector search while the router is still running. The
+# vector and hybrid modes search with the original query text, so the routed
+# result does not change the search; candidate routes cancel it.
+SPECULATIVE_VECTOR_SEARCH = os.getenv("SPECULATIVE_VECTOR_SEARCH", "1") == "1"
+
+class StageTimer:
+    """Wall-clock timings (ms) of the pipeline stages for one query."""
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.timings = {}
+
+    async def timed(self, name: str, aw):
+        start = time.perf_counter()
+        try:
+            return await aw
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def finish(self) -> dict:
+        self.timings["total_ms"] = round((time.perf_counter() - self.t0) * 1000, 1)
+        return self.timings
+
+def start_speculative_search(vs, q: str, timer: Optional[StageTimer] = None) -> asyncio.Task:
+    # Deep enough for fusion when hybrid; vector mode trims to VECTOR_K. The
+    # route (and its target sections) is not known yet, so no section filter.
+    aw = run_vector(vsearch, vs, q, k=vector_depth(HYBRID_FUSION))
+    task = asyncio.ensure_future(timer.timed("vector_ms", aw) if timer else aw)
+    # Cancelled on candidate routes; don't warn about a result nobody awaits
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return task
+
+async def execute_query_async(db_path: str, vs, q: str, speculative: Optional[bool] = None,
+                              answer_mode: Optional[str] = None):
+    """
+    Non-blocking counterpart of execute_query for the API. Routing awaits the
+    LLM directly; SQL runs on the bounded SQL pool (one connection per worker)
+    and Chroma searches run on the vector pool. With speculative execution the
+    vector search overlaps routing, so wall time is ~max(router, vector).
+    answer_mode is the requested one: "llm" retrieves evidence for summaries
+    instead of serving the stored summary.
+    """
+    speculative = SPECULATIVE_VECTOR_SEARCH if speculative is None else speculative
+    timer = StageTimer()
+    vector_task = start_speculative_search(vs, q, timer) if speculative else None
+    route = await timer.timed("route_ms", route_query_async(db_path, q))
+    return await execute_route_async(db_path, vs, route, q, vector_task=vector_task, timer=timer,
+                                     answer_mode=answer_mode)
+
+async def execute_candidate_query_async(db_path: str, vs, route: QueryRoute, q: str, timer: StageTimer,
+                                        answer_mode: Optional[str] = None):
+    cid_name = None
+    if route.candidate_name:
+        cid_name = await timer.timed("resolve_ms", run_sql(db_path, resolve_candidate, route.candidate_name))
+    if not cid_name:
+        return candidate_not_found()
+    candidate_id, canonical_name = cid_name
+
+    if route.need_summarization:
+        precomputed = None
+        if wants_precomputed(answer_mode):
+            precomputed = await timer.timed("sql_ms", run_sql(db_path, precomputed_summary_result, candidate_id))
+        if precomputed:
+            return precomputed
+        profiles, docs = await asyncio.gather(
+            timer.timed("sql_ms", run_sql(db_path, load_profiles_cached, [candidate_id])),
+            timer.timed("vector_ms", run_vector(profile_summary_blocks, vs, candidate_id, k=8)),
+        )
+        return summarization_result(candidate_id, profiles, docs)
+
+    return await timer.timed("sql_ms", run_sql(db_path, candidate_sections_result, route, candidate_id))
+
+async def routed_hits(vs, q: str, k: int, sections, vector_task: Optional[asyncio.Task], timer: StageTimer):
+    """Vector hits for the routed query: the speculative result when there is one, else a new search."""
+    if vector_task is None:
+        return await timer.timed("vector_ms", run_vector(vsearch, vs, q, k=k, sections=sections))
+    hits = await vector_task
+    if SECTION_INDEX:
+        # The speculative search ran before the target sections were known
+        hits = filter_hits_by_sections(hits, sections)
+        if not hits:
+            hits = await timer.timed("vector_ms", run_vector(vsearch, vs, q, k=k, sections=sections))
+    return hits
+
+async def execute_route_async(db_path: str, vs, route: QueryRoute, q: str,
+                              vector_task: Optional[asyncio.Task] = None, timer: Optional[StageTimer] = None,
+                              answer_mode: Optional[str] = None):
+    timer = timer or StageTimer()
+    sections = apply_route_fallback(route)
+    result = None
+
+    if route.candidate_name:
+        if vector_task is not None:
+            # The candidate path does its own filtered searches; drop the speculative one
+            vector_task.cancel()
+        result = await execute_candidate_query_async(db_path, vs, route, q, timer, answer_mode)
+
+    elif route.mode in ("vector", "hybrid"):
+        fused = route.mode == "hybrid" and HYBRID_FUSION
+        k = vector_depth(fused)
+        vector_aw = routed_hits(vs, q, k, sections, vector_task, timer)
+        if route.mode == "vector":
+            docs = vector_evidence(await vector_aw, sections)
+            result = {"sections": sections, "facts": [], "docs": docs}
+        elif fused:
+            rankings, docs = await asyncio.gather(
+                timer.timed("sql_ms", run_sql(db_path, sql_rankings, route, q)),
+                vector_aw,
+            )
+            result = await timer.timed("fusion_ms", run_sql(db_path, fuse_hybrid, route, q, sections, docs, rankings))
+        else:
+            page, hits = await asyncio.gather(
+                timer.timed("sql_ms", run_sql(db_path, shortlist_with_profiles, route)),
+                vector_aw,
+            )
+            result = shortlist_result(sections, page, vector_evidence(hits, sections))
+
+    if result is not None:
+        result["route"] = route
+        result["timings"] = timer.finish()
+        result["timings"]["speculative"] = vector_task is not None
+    return result
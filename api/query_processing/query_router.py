@@ -2,6 +2,9 @@ import os
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from model.QueryRoute import QueryRoute
+from query_processing import rule_router
+from query_processing.query_cache import QUERY_CACHE_ENABLED, MISS, route_cache, route_cache_key
+from query_processing.executors import run_sql
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -66,12 +69,68 @@ ROUTER_SYSTEM = (
     """
 )
 
-def route_query_llm(user_query: str) -> QueryRoute:
-    msgs = [
+def router_messages(user_query: str):
+    return [
         SystemMessage(content=ROUTER_SYSTEM),
         HumanMessage(content=f"Query: {user_query}\nReturn the JSON object only."),
     ]
-    res = structured_router.invoke(msgs)
+
+def route_query_llm(user_query: str) -> QueryRoute:
+    res = structured_router.invoke(router_messages(user_query))
+    print("Routed query:", res.model_dump())
+    return res
+
+async def route_query_llm_async(user_query: str) -> QueryRoute:
+    res = await structured_router.ainvoke(router_messages(user_query))
     print("Routed query:", res.model_dump())
     return res
 
+
+
+# ---- Rule fast path with LLM fallback ----
+
+def _accept_rule_route(route) -> bool:
+    return route is not None and route.confidence >= rule_router.RULE_ROUTER_MIN_CONFIDENCE
+
+def route_query(con, user_query: str) -> QueryRoute:
+    if rule_router.RULE_ROUTER_ENABLED:
+        route = rule_router.route_query_rules(rule_router.get_vocabulary(con), user_query)
+        if _accept_rule_route(route):
+            rule_router.count_route("rule")
+            print("Rule-routed query:", route.model_dump())
+            return route
+        rule_router.count_route("rule_ambiguous" if route else "rule_no_match")
+    if QUERY_CACHE_ENABLED:
+        key = route_cache_key(user_query)
+        cached = route_cache.get(con, key)
+        if cached is not MISS:
+            rule_router.count_route("cache")
+            return cached
+    rule_router.count_route("llm")
+    route = route_query_llm(user_query)
+    if QUERY_CACHE_ENABLED:
+        route_cache.set(con, key, route)
+    return route
+
+async def route_query_async(db_path: str, user_query: str) -> QueryRoute:
+    if rule_router.RULE_ROUTER_ENABLED:
+        vocab = rule_router.cached_vocabulary()
+        if not rule_router.vocabulary_is_fresh():
+            vocab = await run_sql(db_path, rule_router.get_vocabulary)
+        route = rule_router.route_query_rules(vocab, user_query)
+        if _accept_rule_route(route):
+            rule_router.count_route("rule")
+            print("Rule-routed query:", route.model_dump())
+            return route
+        rule_router.count_route("rule_ambiguous" if route else "rule_no_match")
+    if QUERY_CACHE_ENABLED:
+        key = route_cache_key(user_query)
+        cached = await run_sql(db_path, route_cache.get, key)
+        if cached is not MISS:
+            rule_router.count_route("cache")
+            return cached
+    rule_router.count_route("llm")
+    route = await route_query_llm_async(user_query)
+    if QUERY_CACHE_ENABLED:
+        await run_sql(db_path, route_cache.set, key, route)
+    return route
@@ -0,0 +1,228 @@
+import os
+import re
+import time
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from model.QueryRoute import QueryRoute
+
+# Deterministic pre-router: matches query n-grams against vocabularies built
+# from the candidate tables and only hands the query to the LLM router when
+# the match is ambiguous or leaves content words unexplained.
+
+RULE_ROUTER_ENABLED = os.getenv("RULE_ROUTER_ENABLED", "1") == "1"
+RULE_ROUTER_MIN_CONFIDENCE = float(os.getenv("RULE_ROUTER_MIN_CONFIDENCE", "0.85"))
+VOCAB_REFRESH_SECONDS = float(os.getenv("RULE_ROUTER_REFRESH_SECONDS", "300"))
+MAX_NGRAM = 5
+
+ALL_SECTIONS = ["summary", "experience", "education", "skills"]
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+# Words that carry no slot information. Everything else in the query must be
+# explained by a vocabulary match or an intent cue for the rule route to win.
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "in", "on", "at", "for", "with", "to", "from", "by", "as", "is", "are",
+    "was", "were", "be", "been", "has", "have", "had", "do", "does", "did", "who", "whom", "which", "what",
+    "any", "all", "some", "me", "show", "find", "list", "give", "get", "search", "looking", "look", "need",
+    "want", "i", "we", "us", "our", "their", "them", "they", "he", "she", "his", "her", "that", "this", "these",
+    "those", "there", "can", "could", "please", "someone", "anyone", "people", "person", "candidate",
+    "candidates", "profiles", "profile", "resume", "resumes", "cv", "cvs", "engineers", "engineer",
+    "developers", "developer", "both", "also", "either", "but", "not", "about", "tell", "whose",
+}
+SKILL_CUES = {"knows", "know", "knowing", "skills", "skill", "skilled", "proficient", "using", "uses", "use",
+              "familiar", "expertise", "expert", "stack", "technologies", "technology", "programming", "languages"}
+APPLIED_CUES = {"projects", "project", "hands-on", "production", "built", "building", "applied", "experience"}
+COMPANY_CUES = {"worked", "work", "works", "working", "employed", "employee", "employees", "ex", "former",
+                "formerly", "company", "companies", "employer", "job", "jobs", "role", "roles", "experience"}
+EDUCATION_CUES = {"studied", "study", "studying", "graduated", "graduate", "graduates", "alumni", "alumnus",
+                  "degree", "degrees", "university", "college", "school", "education", "educated", "attended"}
+SUMMARY_CUES = {"summarize", "summarise", "summary", "overview", "describe", "background", "bio"}
+
+ROUTER_STATS = Counter()
+_stats_lock = threading.Lock()
+
+
+def count_route(path: str):
+    with _stats_lock:
+        ROUTER_STATS[path] += 1
+
+
+def router_stats() -> dict:
+    with _stats_lock:
+        stats = dict(ROUTER_STATS)
+    total = sum(stats.get(k, 0) for k in ("rule", "cache", "llm"))
+    stats["rule_ratio"] = round(stats.get("rule", 0) / total, 3) if total else 0.0
+    return stats
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+@dataclass
+class RouterVocabulary:
+    # normalized phrase -> canonical value as stored in SQL
+    skills: Dict[str, str] = field(default_factory=dict)
+    companies: Dict[str, str] = field(default_factory=dict)
+    institutions: Dict[str, str] = field(default_factory=dict)
+    names: Dict[str, str] = field(default_factory=dict)
+    loaded_at: float = 0.0
+
+    def kinds_for(self, phrase: str) -> List[Tuple[str, str]]:
+        hits = []
+        for kind, table in (("skill", self.skills), ("company", self.companies),
+                            ("institution", self.institutions), ("name", self.names)):
+            if phrase in table:
+                hits.append((kind, table[phrase]))
+        return hits
+
+
+def _phrase(value: str) -> str:
+    return " ".join(tokenize(value))
+
+
+def load_vocabulary(con) -> RouterVocabulary:
+    vocab = RouterVocabulary(loaded_at=time.monotonic())
+    for (skill,) in con.execute("SELECT DISTINCT skill FROM skills WHERE skill IS NOT NULL AND skill<>''"):
+        vocab.skills.setdefault(_phrase(skill), skill.lower().strip())
+    # Known aliases of skills that candidates actually have ("k8s" -> kubernetes)
+    for alias, name in con.execute("""
+        SELECT a.alias, d.name FROM skill_aliases a JOIN skill_dict d ON d.id = a.skill_id
+        WHERE EXISTS (SELECT 1 FROM candidate_skills cs WHERE cs.skill_id = a.skill_id)
+    """):
+        vocab.skills.setdefault(_phrase(alias), name.lower())
+    for (company,) in con.execute("SELECT DISTINCT company FROM experience WHERE company IS NOT NULL AND company<>''"):
+        vocab.companies.setdefault(_phrase(company), company)
+    for (inst,) in con.execute("SELECT DISTINCT institution FROM education WHERE institution IS NOT NULL AND institution<>''"):
+        vocab.institutions.setdefault(_phrase(inst), inst)
+    for (name,) in con.execute("SELECT DISTINCT full_name FROM candidates WHERE full_name IS NOT NULL AND full_name<>''"):
+        # Only full names: a bare first name is too ambiguous to route on
+        if len(tokenize(name)) >= 2:
+            vocab.names.setdefault(_phrase(name), name)
+    vocab.skills.pop("", None)
+    vocab.companies.pop("", None)
+    vocab.institutions.pop("", None)
+    return vocab
+
+
+_vocab: Optional[RouterVocabulary] = None
+_vocab_lock = threading.Lock()
+
+
+def vocabulary_is_fresh() -> bool:
+    return _vocab is not None and time.monotonic() - _vocab.loaded_at < VOCAB_REFRESH_SECONDS
+
+
+def get_vocabulary(con) -> RouterVocabulary:
+    global _vocab
+    if vocabulary_is_fresh():
+        return _vocab
+    with _vocab_lock:
+        if not vocabulary_is_fresh():
+            _vocab = load_vocabulary(con)
+    return _vocab
+
+
+def cached_vocabulary() -> Optional[RouterVocabulary]:
+    return _vocab
+
+
+def invalidate_vocabulary():
+    global _vocab
+    _vocab = None
+
+
+def match_query(vocab: RouterVocabulary, tokens: List[str]):
+    """
+    Greedy longest-match over the query tokens. Returns (matches, ambiguous)
+    where matches is a list of (kind, canonical, start, end) and ambiguous
+    counts spans that hit more than one vocabulary.
+    """
+    matches = []
+    ambiguous = 0
+    i = 0
+    while i < len(tokens):
+        hit = None
+        for n in range(min(MAX_NGRAM, len(tokens) - i), 0, -1):
+            phrase = " ".join(tokens[i:i + n])
+            kinds = vocab.kinds_for(phrase)
+            if kinds:
+                hit = (n, kinds)
+                break
+        if not hit:
+            i += 1
+            continue
+        n, kinds = hit
+        if len(kinds) > 1:
+            ambiguous += 1
+        # A single stopword like "go" or "r" matched as a skill is not evidence
+        if n == 1 and tokens[i] in STOPWORDS:
+            ambiguous += 1
+        for kind, canonical in kinds:
+            matches.append((kind, canonical, i, i + n))
+        i += n
+    return matches, ambiguous
+
+
+def route_query_rules(vocab: RouterVocabulary, user_query: str) -> Optional[QueryRoute]:
+    """
+    Build a QueryRoute from vocabulary matches, or return None when nothing
+    matched. The route's confidence reflects how much of the query the match
+    explains; callers compare it with RULE_ROUTER_MIN_CONFIDENCE.
+    """
+    tokens = tokenize(user_query)
+    if not tokens:
+        return None
+
+    matches, ambiguous = match_query(vocab, tokens)
+    if not matches:
+        return None
+
+    covered = set()
+    for _, _, start, end in matches:
+        covered.update(range(start, end))
+    cues = set(tokens) & (SKILL_CUES | APPLIED_CUES | COMPANY_CUES | EDUCATION_CUES | SUMMARY_CUES)
+    content = [i for i, t in enumerate(tokens) if t not in STOPWORDS and t not in cues]
+    unexplained = [i for i in content if i not in covered]
+    coverage = 1.0 - len(unexplained) / len(content) if content else 1.0
+
+    by_kind: Dict[str, List[str]] = {}
+    for kind, canonical, _, _ in matches:
+        values = by_kind.setdefault(kind, [])
+        if canonical not in values:
+            values.append(canonical)
+
+    confidence = 0.5 + 0.5 * coverage - 0.2 * ambiguous
+    # One company/institution/name per route; more than one needs the LLM to decide
+    for kind in ("company", "institution", "name"):
+        if len(by_kind.get(kind, [])) > 1:
+            confidence -= 0.3
+    # A skill-only match with company/education wording is probably mis-slotted
+    if set(by_kind) == {"skill"} and cues & (COMPANY_CUES - APPLIED_CUES | EDUCATION_CUES):
+        confidence -= 0.2
+    confidence = max(0.0, min(1.0, round(confidence, 3)))
+
+    name = (by_kind.get("name") or [None])[0]
+    if name and cues & SUMMARY_CUES:
+        return QueryRoute(mode="vector", target_sections=list(ALL_SECTIONS), candidate_name=name,
+                          need_summarization=True, confidence=confidence)
+
+    sections = []
+    skills = by_kind.get("skill") or []
+    if skills:
+        sections.append("skills")
+        if cues & APPLIED_CUES:
+            sections.append("experience")
+    company = (by_kind.get("company") or [None])[0]
+    if company and "experience" not in sections:
+        sections.append("experience")
+    institution = (by_kind.get("institution") or [None])[0]
+    if institution:
+        sections.append("education")
+    if name and not sections:
+        sections = list(ALL_SECTIONS)
+
+    return QueryRoute(mode="hybrid", target_sections=sections, skills=skills, company=company,
+                      institution=institution, candidate_name=name, confidence=confidence)
@@ -0,0 +1,55 @@
+import os
+from typing import Dict, List, Optional
+
+# Helpers for the section-level vector index (VECTOR_INDEX_MODE=sections):
+# every hit is one resume section or experience/education entry, so hits are
+# filtered by the routed target sections, grouped per candidate, and only the
+# matching chunks are sent on as evidence.
+
+SECTION_AGGREGATION = os.getenv("SECTION_AGGREGATION", "max")   # max | sum
+CHUNKS_PER_CANDIDATE = int(os.getenv("CHUNKS_PER_CANDIDATE", "3"))
+SECTION_SEARCH_K = int(os.getenv("SECTION_SEARCH_K", "40"))     # chunks fetched per search
+
+
+def section_clause(sections: Optional[List[str]]) -> Optional[dict]:
+    if not sections:
+        return None
+    return {"section": {"$in": list(sections)}}
+
+
+def filter_hits_by_sections(hits, sections: Optional[List[str]]):
+    """Apply the section filter to hits fetched without one (speculative search)."""
+    if not sections:
+        return list(hits)
+    wanted = set(sections)
+    return [(doc, score) for doc, score in hits if doc.metadata.get("section") in wanted]
+
+
+def similarity(distance: float) -> float:
+    return 1.0 / (1.0 + max(distance, 0.0))
+
+
+def group_chunks_by_candidate(hits, top_k: int, per_candidate: int = CHUNKS_PER_CANDIDATE,
+                              agg: str = SECTION_AGGREGATION):
+    """
+    Chunk hits grouped by candidate. Candidates are ordered by their best chunk
+    (agg="max") or by the summed similarity of their chunks (agg="sum"); each
+    keeps its best `per_candidate` chunks, best first. Returns a flat
+    [(doc, distance)] list, candidate by candidate.
+    """
+    groups: Dict[str, list] = {}
+    for doc, score in sorted(hits, key=lambda t: t[1]):
+        cid = doc.metadata.get("candidate_id")
+        if cid:
+            groups.setdefault(cid, []).append((doc, score))
+
+    def rank_key(cid):
+        chunks = groups[cid]
+        if agg == "sum":
+            return (-sum(similarity(s) for _, s in chunks), cid)
+        return (chunks[0][1], cid)
+
+    out = []
+    for cid in sorted(groups, key=rank_key)[:top_k]:
+        out.extend(groups[cid][:per_candidate])
+    return out
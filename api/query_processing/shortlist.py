@@ -0,0 +1,67 @@
+import os
+import json
+import base64
+from typing import Optional
+from model.QueryRoute import QueryRoute
+from db.sql_store import ranked_shortlist
+from db.skill_index import ids_by_skills
+from db.profile_cache import load_profiles_cached
+
+# Hybrid queries no longer load every candidate matching a slot: SQLite scores
+# the matches (skills matched, company, institution, recency of the matching
+# job) and returns one bounded page. The rest is reachable with a cursor.
+
+SHORTLIST_TOP_N = int(os.getenv("SHORTLIST_TOP_N", "20"))
+SHORTLIST_MAX_PAGE = int(os.getenv("SHORTLIST_MAX_PAGE", "100"))
+# "and": the skills slot takes candidates with every requested skill; "or": any of them, ranked by how many
+SHORTLIST_SKILL_MODE = os.getenv("SHORTLIST_SKILL_MODE", "and")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(score: float, candidate_id: str) -> str:
+    raw = json.dumps([score, candidate_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[float, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, candidate_id = json.loads(raw)
+        return float(score), str(candidate_id)
+    except Exception:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+
+
+def ranked_for_route(con, route: QueryRoute, limit: int, after: Optional[tuple[float, str]] = None):
+    """ranked_shortlist over the route's slots, its skill match taken from the in-memory skill index."""
+    matches = ids_by_skills(con, route.skills, SHORTLIST_SKILL_MODE) if route.skills else None
+    return ranked_shortlist(con, route.skills, route.company, route.institution, limit=limit, after=after,
+                            skill_mode=SHORTLIST_SKILL_MODE, skill_matches=matches)
+
+
+def shortlist_page(con, route: QueryRoute, cursor: Optional[str] = None, limit: int = SHORTLIST_TOP_N) -> dict:
+    """
+    One page of the scored structured shortlist:
+    {"candidates": [{candidate_id, score, ...}], "total": int, "complete": int, "next_cursor": str | None}
+    total counts candidates matching any slot (the skills slot as SHORTLIST_SKILL_MODE),
+    complete those matching all of them.
+    """
+    limit = max(1, min(limit, SHORTLIST_MAX_PAGE))
+    after = decode_cursor(cursor) if cursor else None
+    rows, total, complete = ranked_for_route(con, route, limit, after)
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_cursor(last["score"], last["candidate_id"])
+    return {"candidates": rows, "total": total, "complete": complete, "next_cursor": next_cursor}
+
+
+def shortlist_with_profiles(con, route: QueryRoute, cursor: Optional[str] = None, limit: int = SHORTLIST_TOP_N) -> dict:
+    page = shortlist_page(con, route, cursor, limit)
+    ids = [r["candidate_id"] for r in page["candidates"]]
+    page["ids"] = ids
+    page["profiles"] = load_profiles_cached(con, ids) if ids else []
+    return page
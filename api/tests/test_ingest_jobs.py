@@ -0,0 +1,62 @@
+import asyncio
+
+from cv_processing.ingest_jobs import JobJournal, create_job, finish_run, prepare_run
+from cv_processing.ingest_manifest import file_sha256, manifest_path
+from db.sql_store import init_db, upsert_manifest
+from db.sql_writer import SqlWriter
+from model.CandidateProfile import CandidateProfile
+
+
+def file_states(con, job_id):
+    return {p: (s, cid) for p, s, cid in con.execute(
+        "SELECT path, state, candidate_id FROM ingest_job_files WHERE job_id=?", (job_id,))}
+
+
+def test_interrupted_changed_file_stays_unfinished(tmp_path):
+    pdf_dir = tmp_path / "pdf"
+    pdf_dir.mkdir()
+    pdf = pdf_dir / "a.pdf"
+    pdf.write_bytes(b"old resume")
+    db_path = str(tmp_path / "candidates.db")
+    con = init_db(db_path)
+    try:
+        path = manifest_path(str(pdf))
+        with con:
+            con.execute("INSERT INTO candidates(id, full_name) VALUES ('a', 'A')")
+            st = pdf.stat()
+            upsert_manifest(con, path, st.st_size, st.st_mtime, file_sha256(path), "a", "1")
+        pdf.write_bytes(b"new resume, edited")
+
+        job_id = create_job(con, str(pdf_dir))
+        todo = prepare_run(con, job_id, version="1")
+        assert [t["manifest_path"] for t in todo] == [path]
+        finish_run(con, job_id, "interrupted")      # killed before the file was recorded
+
+        assert file_states(con, job_id)[path][0] == "pending"
+        assert [t["manifest_path"] for t in prepare_run(con, job_id, version="1")] == [path]
+    finally:
+        con.close()
+
+
+def test_copies_share_the_recorded_file_progress(tmp_path):
+    pdf_dir = tmp_path / "pdf"
+    pdf_dir.mkdir()
+    for name in ("a.pdf", "copy.pdf"):
+        (pdf_dir / name).write_bytes(b"same resume")
+    db_path = str(tmp_path / "candidates.db")
+    con = init_db(db_path)
+    writer = SqlWriter(db_path).start()
+    try:
+        job_id = create_job(con, str(pdf_dir))
+        [task] = prepare_run(con, job_id, version="1")
+        assert len(task["aliases"]) == 1
+        cid = writer.submit(CandidateProfile(full_name="A"), candidate_id="a").result()
+        journal = JobJournal(job_id, writer)
+        journal.mark(task, "embedded", candidate_id=cid)
+        asyncio.run(journal.flush())
+        finish_run(con, job_id, "completed")
+
+        assert set(file_states(con, job_id).values()) == {("embedded", "a")}
+    finally:
+        writer.close()
+        con.close()
@@ -0,0 +1,41 @@
+from db.sql_store import init_db, store_profile
+from model.CandidateProfile import CandidateProfile
+from model.QueryRoute import QueryRoute
+from query_processing.local_ranker import rank_candidates, render_extractive_answer
+from query_processing.shortlist import shortlist_with_profiles
+
+
+def extractive_answer(db_path: str, route: QueryRoute, limit: int) -> str:
+    con = init_db(db_path)
+    try:
+        page = shortlist_with_profiles(con, route, limit=limit)
+    finally:
+        con.close()
+    ranked = rank_candidates({"facts": page["profiles"], "fact_ids": page["ids"]}, route)
+    return render_extractive_answer(ranked, route, {}, page["complete"])
+
+
+def test_lead_counts_only_complete_matches(tmp_path):
+    db_path = str(tmp_path / "candidates.db")
+    skills = {"both": ["Python", "k8s"], "py": ["python3"], "kube": ["Kubernetes"], "py2": ["Python", "Go"]}
+    for cid, have in skills.items():
+        store_profile(db_path, CandidateProfile(full_name=cid.title(), skills=have), candidate_id=cid)
+    route = QueryRoute(mode="sql", target_sections=["skills"], skills=["Python", "Kubernetes"], confidence=0.9)
+
+    answer = extractive_answer(db_path, route, limit=10)
+    assert answer.startswith("Found 1 candidate with ")
+    assert "the top" not in answer
+    assert "**Both**" in answer and "**Py**" not in answer
+
+
+def test_lead_mentions_more_complete_matches_than_listed(tmp_path):
+    db_path = str(tmp_path / "candidates.db")
+    for i in range(3):
+        store_profile(db_path, CandidateProfile(full_name=f"Full {i}", skills=["Python", "Kubernetes"]),
+                      candidate_id=f"full-{i}")
+    store_profile(db_path, CandidateProfile(full_name="Partial", skills=["Python"]), candidate_id="partial")
+    route = QueryRoute(mode="sql", target_sections=["skills"], skills=["Python", "Kubernetes"], confidence=0.9)
+
+    answer = extractive_answer(db_path, route, limit=2)
+    assert answer.startswith("Found 3 candidates with ")
+    assert "the top 2 are listed below." in answer.splitlines()[0]
@@ -0,0 +1,46 @@
+from db.sql_store import init_db, store_profile
+from model.CandidateProfile import CandidateProfile, ExperienceItem
+from model.QueryRoute import QueryRoute
+from query_processing import shortlist
+
+ROUTE = QueryRoute(mode="hybrid", target_sections=["skills"], skills=["Python", "Kubernetes"], confidence=0.9)
+
+
+def build(tmp_path):
+    db_path = str(tmp_path / "candidates.db")
+    profiles = {
+        "both": CandidateProfile(full_name="Both", skills=["python3", "k8s"]),
+        "python": CandidateProfile(full_name="Python Only", skills=["Python"]),
+        "acme": CandidateProfile(full_name="Acme", skills=["Kubernetes"],
+                                 experience=[ExperienceItem(company="Acme", title="SRE", start="2020", end="2024")]),
+    }
+    for cid, profile in profiles.items():
+        store_profile(db_path, profile, candidate_id=cid)
+    return init_db(db_path)
+
+
+def test_skills_slot_requires_every_skill(tmp_path):
+    con = build(tmp_path)
+    try:
+        page = shortlist.shortlist_page(con, ROUTE)
+        assert [r["candidate_id"] for r in page["candidates"]] == ["both"]
+        assert (page["total"], page["complete"]) == (1, 1)
+
+        # Company matches still join the shortlist, ranked by what they match
+        route = ROUTE.model_copy(update={"company": "Acme"})
+        page = shortlist.shortlist_page(con, route)
+        assert sorted(r["candidate_id"] for r in page["candidates"]) == ["acme", "both"]
+        assert page["complete"] == 0
+    finally:
+        con.close()
+
+
+def test_or_mode_ranks_partial_matches(tmp_path, monkeypatch):
+    monkeypatch.setattr(shortlist, "SHORTLIST_SKILL_MODE", "or")
+    con = build(tmp_path)
+    try:
+        page = shortlist.shortlist_page(con, ROUTE)
+        assert [r["candidate_id"] for r in page["candidates"]][0] == "both"
+        assert (page["total"], page["complete"]) == (3, 1)
+    finally:
+        con.close()
@@ -0,0 +1,46 @@
+import sqlite3
+
+from db.skill_dictionary import canonical_skill, resolve_skill_id, resolve_skill_ids
+from db.sql_store import init_db, store_profile, ranked_shortlist
+from model.CandidateProfile import CandidateProfile
+
+
+def test_canonical_skill_strips_versions_of_seeded_skills():
+    assert canonical_skill("Java 17") == "Java"
+    assert canonical_skill("python3.11") == "Python"
+    assert canonical_skill("Elixir 1.15") == "Elixir 1.15"
+
+
+def test_versions_of_known_skills_share_an_id(tmp_path):
+    db_path = str(tmp_path / "candidates.db")
+    store_profile(db_path, CandidateProfile(full_name="A", skills=["Elixir"]), candidate_id="a")
+    store_profile(db_path, CandidateProfile(full_name="B", skills=["Elixir 1.15", "Java 17"]), candidate_id="b")
+    con = init_db(db_path)
+    try:
+        assert resolve_skill_id(con, "elixir 1.15", create=False) == resolve_skill_id(con, "Elixir", create=False)
+        assert ranked_shortlist(con, ["elixir", "java"])[1:] == (1, 1)
+        assert ranked_shortlist(con, ["elixir", "java"], skill_mode="or")[1:] == (2, 1)
+    finally:
+        con.close()
+
+
+def test_existing_databases_are_remapped(tmp_path):
+    db_path = str(tmp_path / "candidates.db")
+    store_profile(db_path, CandidateProfile(full_name="A", skills=["Java 17"]), candidate_id="a")
+    con = sqlite3.connect(db_path)
+    with con:
+        # What the previous dictionary stored: "Java 17" as a skill of its own
+        con.execute("DELETE FROM candidate_skills")
+        con.execute("DELETE FROM skill_aliases WHERE alias = 'java 17'")
+        con.execute("INSERT INTO skill_dict(name) VALUES ('Java 17')")
+        con.execute("INSERT INTO skill_aliases(alias, skill_id) SELECT 'java 17', id FROM skill_dict WHERE name = 'Java 17'")
+        con.execute("INSERT INTO candidate_skills SELECT 'a', id FROM skill_dict WHERE name = 'Java 17'")
+        con.execute("UPDATE schema_meta SET value = '1' WHERE key = 'skill_dict_version'")
+    con.close()
+
+    con = init_db(db_path)
+    try:
+        assert resolve_skill_ids(con, ["Java 17"]) == resolve_skill_ids(con, ["Java"])
+        assert ranked_shortlist(con, ["Java"])[1] == 1
+    finally:
+        con.close()
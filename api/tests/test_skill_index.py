@@ -0,0 +1,37 @@
+from db.skill_index import ids_by_skills as ids_by_skills_index
+from db.sql_store import init_db, store_profile, ids_by_skills as ids_by_skills_sql, ranked_shortlist
+from model.CandidateProfile import CandidateProfile
+
+SKILLS = {"a": ["Python", "k8s"], "b": ["python3"], "c": ["Kubernetes", "Go"], "d": ["Java 17"]}
+
+
+def build(tmp_path, name, skills):
+    db_path = str(tmp_path / name)
+    for cid, have in skills.items():
+        store_profile(db_path, CandidateProfile(full_name=cid.upper(), skills=have), candidate_id=cid)
+    return init_db(db_path)
+
+
+def test_index_matches_sql(tmp_path):
+    con = build(tmp_path, "candidates.db", SKILLS)
+    try:
+        for query in (["Python", "Kubernetes"], ["py", "golang"], ["Java"], ["Python", "Rust"], ["Elixir"]):
+            for mode in ("and", "or"):
+                assert sorted(ids_by_skills_index(con, query, mode)) == sorted(ids_by_skills_sql(con, query, mode))
+        query = ["Python", "Kubernetes"]
+        for mode in ("and", "or"):
+            from_index = ranked_shortlist(con, query, skill_mode=mode, skill_matches=ids_by_skills_index(con, query, mode))
+            assert from_index == ranked_shortlist(con, query, skill_mode=mode)
+    finally:
+        con.close()
+
+
+def test_each_database_has_its_own_index(tmp_path):
+    first = build(tmp_path, "first.db", SKILLS)
+    second = build(tmp_path, "second.db", {"x": ["Python"]})
+    try:
+        assert sorted(ids_by_skills_index(first, ["Python"])) == ["a", "b"]
+        assert ids_by_skills_index(second, ["Python"]) == ["x"]
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,49 @@
+import sqlite3
+
+from db import snapshot
+from db.sql_store import init_db, store_profiles_bulk
+from db.sql_writer import SqlWriter
+from cv_processing.ingest_manifest import record_ingested
+from model.CandidateProfile import CandidateProfile
+
+VERSIONS = {"pipeline_version": "1", "parser_version": "1", "embedding_model": "test", "vector_index_mode": "resume"}
+
+
+def snapshot_ids(db_path, out_dir, monkeypatch):
+    monkeypatch.setattr(snapshot, "_versions", lambda: VERSIONS)
+    manifest = snapshot.create_snapshot(db_path, str(out_dir), stores=[])
+    con = sqlite3.connect(str(out_dir / snapshot.SNAPSHOT_DB))
+    try:
+        return manifest, {r[0] for r in con.execute("SELECT id FROM candidates")}
+    finally:
+        con.close()
+
+
+def test_bulk_loaded_candidates_are_kept(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "candidates.db")
+    con = init_db(db_path)
+    try:
+        store_profiles_bulk(con, [(f"json-{i}", CandidateProfile(full_name=f"Json {i}"), None, None) for i in range(3)])
+    finally:
+        con.close()
+
+    manifest, ids = snapshot_ids(db_path, tmp_path / "snap", monkeypatch)
+    assert ids == {"json-0", "json-1", "json-2"}
+    assert (manifest["candidates"], manifest["skipped_in_flight"]) == (3, 0)
+
+
+def test_pdf_ingestion_in_flight_is_dropped(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "candidates.db")
+    writer = SqlWriter(db_path).start()
+    try:
+        done = writer.submit(CandidateProfile(full_name="Done"), candidate_id="done", in_flight=True).result()
+        writer.submit(CandidateProfile(full_name="Embedding"), candidate_id="embedding", in_flight=True).result()
+        writer.submit(CandidateProfile(full_name="Json"), candidate_id="json").result()
+        task = {"manifest_path": "/pdf/done.pdf", "size": 1, "mtime": 1.0, "sha256": "x", "aliases": []}
+        writer.call(record_ingested, task, done).result()
+    finally:
+        writer.close()
+
+    manifest, ids = snapshot_ids(db_path, tmp_path / "snap", monkeypatch)
+    assert ids == {"done", "json"}
+    assert manifest["skipped_in_flight"] == 1
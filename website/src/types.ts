@@ -60,6 +60,7 @@ export type AskResponse = {
   docs: CandidateProfile[];
   answer?: string;
   why?: string;
+  timings?: Record<string, number | boolean> | null;
 };
 
 export type HistoryItem = {